@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+MemoryCache 并发基准测试
+
+对比旧实现（读写共用一把全局锁）与当前实现（读不加锁、写按键分段加锁）
+在 1、10、100 个并发会话下的吞吐量和读延迟。两种实现都执行真实的 get()/set()，
+不在锁内插入额外的让出点：
+
+- none: 只有本地缓存。get/set 不包含 await，全局锁不会产生竞争，差异只来自加锁本身的开销；
+- l2: 接入每次访问都等待一段延迟的二级缓存（模拟 SQLite 线程池或 Redis 往返），
+  本地缓存只容纳部分键，读未命中时读穿二级缓存，写操作写穿二级缓存。
+  旧实现在整个二级缓存访问期间持有全局锁，当前实现只在写穿期间持有所在分段的锁。
+
+每个会话循环执行读多写少的操作序列。
+
+用法:
+    python benchmarks/cache_concurrency.py [--ops 2000] [--write-ratio 0.1] [--l2-latency 0.0002]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.infrastructure.cache.backend import CacheBackend  # noqa: E402
+from src.infrastructure.cache.memory_cache import MemoryCache  # noqa: E402
+
+KEY_SPACE = 1000
+
+
+class LatencyBackend(CacheBackend):
+    """字典实现的二级缓存，每次访问等待固定延迟"""
+
+    name = "latency"
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.data = {}
+
+    async def get(self, key):
+        await asyncio.sleep(self.latency)
+        return self.data.get(key)
+
+    async def set(self, key, value, expires_at):
+        await asyncio.sleep(self.latency)
+        self.data[key] = (value, expires_at)
+
+    async def set_many(self, items):
+        await asyncio.sleep(self.latency)
+        for key, value, expires_at in items:
+            self.data[key] = (value, expires_at)
+
+    async def delete(self, key):
+        await asyncio.sleep(self.latency)
+        self.data.pop(key, None)
+
+    async def clear(self):
+        self.data.clear()
+
+    def get_stats(self):
+        return {"backend": self.name}
+
+
+class GlobalLockCache(MemoryCache):
+    """复现旧实现：读写（包括二级缓存访问）都经过同一把 asyncio.Lock"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._global_lock = asyncio.Lock()
+
+    async def get(self, key):
+        async with self._global_lock:
+            return await super().get(key)
+
+    async def set(self, key, value, ttl=None, tags=()):
+        async with self._global_lock:
+            await super().set(key, value, ttl, tags)
+
+
+async def run_session(cache, ops, write_ratio, latencies, rng):
+    """单个会话的操作序列"""
+    for _ in range(ops):
+        key = f"key{rng.randrange(KEY_SPACE)}"
+        if rng.random() < write_ratio:
+            await cache.set(key, key)
+        else:
+            start = time.perf_counter()
+            await cache.get(key)
+            latencies.append(time.perf_counter() - start)
+        # 模拟会话在两次缓存访问之间处理其他逻辑
+        await asyncio.sleep(0)
+
+
+async def bench(cache_cls, sessions, ops, write_ratio, l2_latency):
+    """运行一组基准测试，l2_latency 为 None 时不接入二级缓存"""
+    l2 = LatencyBackend(l2_latency) if l2_latency is not None else None
+    cache = cache_cls(
+        enabled=True,
+        default_ttl=3600,
+        # 接入二级缓存时本地只容纳四分之一的键，其余读取需要读穿
+        max_entries=KEY_SPACE // 4 if l2 is not None else 0,
+        max_bytes=0,
+        lock_stripes=16,
+        l2=l2,
+    )
+    await cache.set_many({f"key{index}": index for index in range(KEY_SPACE)})
+
+    latencies = []
+    rngs = [random.Random(seed) for seed in range(sessions)]
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_session(cache, ops, write_ratio, latencies, rngs[index])
+            for index in range(sessions)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "ops_per_sec": sessions * ops / elapsed,
+        "get_p50_us": statistics.median(latencies) * 1e6,
+        "get_p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="MemoryCache 并发基准测试")
+    parser.add_argument("--ops", type=int, default=2000, help="每个会话的操作次数")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="写操作比例")
+    parser.add_argument(
+        "--l2-latency", type=float, default=0.0002, help="二级缓存单次访问延迟（秒）"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"每个会话 {args.ops} 次操作，写比例 {args.write_ratio:.0%}，"
+        f"二级缓存延迟 {args.l2_latency * 1e6:.0f}us"
+    )
+    print(
+        f"{'二级缓存':>8} {'会话数':>6} {'实现':<12} {'ops/s':>12} "
+        f"{'get p50(us)':>12} {'get p99(us)':>12}"
+    )
+    for l2_label, l2_latency in (("none", None), ("l2", args.l2_latency)):
+        # 二级缓存每次访问都要等待，减少操作次数以控制运行时间
+        ops = args.ops if l2_latency is None else max(1, args.ops // 10)
+        for sessions in (1, 10, 100):
+            for label, cache_cls in (
+                ("global-lock", GlobalLockCache),
+                ("striped", MemoryCache),
+            ):
+                result = await bench(
+                    cache_cls, sessions, ops, args.write_ratio, l2_latency
+                )
+                print(
+                    f"{l2_label:>8} {sessions:>6} {label:<12} "
+                    f"{result['ops_per_sec']:>12.0f} "
+                    f"{result['get_p50_us']:>12.1f} {result['get_p99_us']:>12.1f}"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+performance_tracked 记录开销基准测试
+
+对比三种情况下调用一个空协程的单次耗时：
+- 未装饰
+- 旧实现：每次调用创建 PerformanceMetric 对象，并在全局 asyncio.Lock 下追加到 deque
+- 当前实现：无 await、无记录对象，直接更新预分配的直方图计数
+
+两种装饰实现与未装饰调用的耗时差即为每次调用的记录开销。
+
+用法:
+    python benchmarks/metric_recording.py [--calls 200000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Optional
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.infrastructure.monitoring.performance_monitor import (  # noqa: E402
+    PerformanceMonitor,
+)
+import src.infrastructure.monitoring.performance_monitor as performance_monitor  # noqa: E402
+
+
+@dataclass
+class PerformanceMetric:
+    """旧实现的单次调用记录"""
+
+    name: str
+    duration: float
+    timestamp: float
+    success: bool
+    error_message: Optional[str] = None
+
+
+class LegacyMonitor:
+    """复现旧实现：deque 历史记录 + 全局 asyncio.Lock"""
+
+    def __init__(self, max_history: int = 1000):
+        self.metrics = defaultdict(lambda: deque(maxlen=max_history))
+        self._lock = asyncio.Lock()
+
+    async def record_metric(self, name, duration, success=True, error_message=None):
+        metric = PerformanceMetric(
+            name=name,
+            duration=duration,
+            timestamp=time.time(),
+            success=success,
+            error_message=error_message,
+        )
+        async with self._lock:
+            self.metrics[name].append(metric)
+
+
+def legacy_tracked(monitor, name):
+    """旧实现的装饰器"""
+
+    def decorator(func):
+        async def wrapper(*args, **kwargs):
+            start_time = time.time()
+            success = True
+            error_message = None
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                success = False
+                error_message = str(e)
+                raise
+            finally:
+                await monitor.record_metric(
+                    name, time.time() - start_time, success, error_message
+                )
+
+        return wrapper
+
+    return decorator
+
+
+async def noop():
+    return None
+
+
+async def measure(func, calls):
+    """返回单次调用的平均耗时（纳秒）"""
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        await func()
+    return (time.perf_counter_ns() - start) / calls
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="performance_tracked 记录开销基准测试")
+    parser.add_argument("--calls", type=int, default=200000, help="每轮调用次数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复轮数，取最小值")
+    args = parser.parse_args()
+
+    # 当前实现使用独立的监控器实例，避免污染全局统计
+    performance_monitor._monitor = PerformanceMonitor()
+    variants = {
+        "未装饰": noop,
+        "旧实现": legacy_tracked(LegacyMonitor(), "noop")(noop),
+        "当前实现": performance_monitor.performance_tracked("noop")(noop),
+    }
+
+    results = {}
+    for label, func in variants.items():
+        await measure(func, 1000)  # 预热
+        results[label] = min(
+            [await measure(func, args.calls) for _ in range(args.repeat)]
+        )
+
+    baseline = results["未装饰"]
+    print(f"每轮 {args.calls} 次调用，取 {args.repeat} 轮最小值")
+    print(f"{'实现':<10} {'ns/call':>10} {'记录开销(ns)':>14}")
+    for label, elapsed in results.items():
+        print(f"{label:<10} {elapsed:>10.0f} {elapsed - baseline:>14.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
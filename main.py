@@ -7,6 +7,7 @@ HowToCook Python MCP 服务器
 import asyncio
 import logging
 from src.core import app, get_config
+from src.core.lifespan import http_middleware
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +37,7 @@ async def main():
             port=server_config.port,
             log_level=config.logging.level.lower(),
             path=server_config.path,
+            middleware=http_middleware(),
             uvicorn_config=uvicorn_config,
         )
     except KeyboardInterrupt:
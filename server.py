@@ -17,6 +17,7 @@ mcp = app
 if __name__ == "__main__":
     import asyncio
     from src.core.config import get_config
+    from src.core.lifespan import http_middleware
 
     async def main():
         config = get_config()
@@ -31,6 +32,7 @@ if __name__ == "__main__":
             host=server_config.host,
             port=server_config.port,
             path=server_config.path,
+            middleware=http_middleware(),
         )
 
     asyncio.run(main())
@@ -7,14 +7,23 @@ from typing import Optional
 from fastmcp import FastMCP
 from fastmcp.server.middleware.timing import TimingMiddleware
 from fastmcp.server.middleware.logging import LoggingMiddleware
-from fastmcp.server.middleware.rate_limiting import RateLimitingMiddleware
 from fastmcp.server.middleware.error_handling import ErrorHandlingMiddleware
 from .config import get_config
+from .lifespan import app_lifespan
+from ..infrastructure.middleware import (
+    AdmissionControlMiddleware,
+    ClientRateLimitMiddleware,
+    DeadlineMiddleware,
+    PayloadSizeMiddleware,
+    ResponseCacheMiddleware,
+)
 from ..mcp import (
     register_recipe_tools,
     register_meal_tools,
     register_recommendation_tools,
+    register_admin_tools,
     register_api_resources,
+    register_http_routes,
 )
 from ..mcp import meal_planning_prompt, recipe_recommendation_prompt
 
@@ -36,22 +45,34 @@ def create_app() -> FastMCP:
         name=config.server.name,
         version=config.server.version,
         instructions=f"{config.server.description}。支持按分类查询菜谱、智能推荐菜品组合、制定膳食计划等功能。",
+        lifespan=app_lifespan,
     )
 
     # 注册内置中间件
     app.add_middleware(ErrorHandlingMiddleware(include_traceback=True))
-    app.add_middleware(RateLimitingMiddleware(max_requests_per_second=50))
+    app.add_middleware(DeadlineMiddleware())
+    if config.performance.admission_control_enabled:
+        app.add_middleware(AdmissionControlMiddleware())
+    app.add_middleware(ClientRateLimitMiddleware())
     app.add_middleware(TimingMiddleware())
     app.add_middleware(LoggingMiddleware(include_payloads=False))
+    if config.monitoring.payload_metrics_enabled:
+        app.add_middleware(PayloadSizeMiddleware())
+    if config.cache.enabled and config.cache.response_cache_enabled:
+        app.add_middleware(ResponseCacheMiddleware())
 
     # 注册工具
     register_recipe_tools(app)
     register_meal_tools(app)
     register_recommendation_tools(app)
+    register_admin_tools(app)
 
     # 注册资源
     register_api_resources(app)
 
+    # 注册HTTP路由
+    register_http_routes(app)
+
     # 注册提示模板
     @app.prompt("meal_planning_assistant")
     async def meal_planning_assistant_prompt(
@@ -4,10 +4,39 @@ HowToCook MCP 服务器配置
 """
 
 import os
+import tempfile
 from dataclasses import dataclass, field
 from typing import Dict, List, Any
 
 
+def _env_list(name: str, default: str) -> List[str]:
+    """读取逗号分隔的环境变量"""
+    items = os.getenv(name, default).split(",")
+    return [item.strip() for item in items if item.strip()]
+
+
+def _env_costs(name: str, default: str) -> Dict[str, float]:
+    """读取逗号分隔的 名称=数值 环境变量"""
+    costs = {}
+    for item in _env_list(name, default):
+        key, _, value = item.partition("=")
+        costs[key.strip()] = float(value)
+    return costs
+
+
+def private_data_dir() -> str:
+    """
+    获取默认的共享文件目录
+
+    临时目录通常所有用户可写，因此按用户区分子目录，由服务创建为仅当前用户可访问
+
+    Returns:
+        str: 目录路径
+    """
+    owner = os.getuid() if hasattr(os, "getuid") else os.getenv("USERNAME", "user")
+    return os.path.join(tempfile.gettempdir(), f"howtocook-mcp-{owner}")
+
+
 @dataclass(frozen=True)
 class ServerInfo:
     """服务器基本信息配置"""
@@ -34,6 +63,74 @@ class CacheConfig:
     ttl: int = field(
         default_factory=lambda: int(os.getenv("CACHE_TTL", "3600"))
     )  # 默认1小时
+    max_entries: int = field(
+        default_factory=lambda: int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    )  # 0 表示不限制
+    max_bytes: int = field(
+        default_factory=lambda: int(
+            os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+        )
+    )  # 估算内存上限，默认256MB，0 表示不限制
+    eviction_policy: str = field(
+        default_factory=lambda: os.getenv("CACHE_EVICTION_POLICY", "lru").lower()
+    )  # lru 或 lfu
+    lock_stripes: int = field(
+        default_factory=lambda: int(os.getenv("CACHE_LOCK_STRIPES", "16"))
+    )  # 写锁分段数量
+    sweep_interval: float = field(
+        default_factory=lambda: float(os.getenv("CACHE_SWEEP_INTERVAL", "60"))
+    )  # 过期清理周期（秒），0 表示不启动后台清理
+    sweep_batch_size: int = field(
+        default_factory=lambda: int(os.getenv("CACHE_SWEEP_BATCH_SIZE", "500"))
+    )
+    xfetch_beta: float = field(
+        default_factory=lambda: float(os.getenv("CACHE_XFETCH_BETA", "1.0"))
+    )  # 过期前提前刷新的系数，0 表示关闭
+    l2_backend: str = field(
+        default_factory=lambda: os.getenv("CACHE_L2_BACKEND", "none").lower()
+    )  # none、sqlite 或 redis
+    l2_path: str = field(
+        default_factory=lambda: os.getenv(
+            "CACHE_L2_PATH",
+            os.path.join(private_data_dir(), "cache.sqlite3"),
+        )
+    )  # 同一主机上所有工作进程共享的缓存文件，只使用当前用户所有的文件
+    redis_url: str = field(
+        default_factory=lambda: os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    )  # 多台主机共享的 Redis 协议服务，必须是本服务独占的可信实例
+    redis_max_connections: int = field(
+        default_factory=lambda: int(os.getenv("CACHE_REDIS_MAX_CONNECTIONS", "8"))
+    )
+    redis_timeout: float = field(
+        default_factory=lambda: float(os.getenv("CACHE_REDIS_TIMEOUT", "0.5"))
+    )  # 单次操作超时（秒）
+    redis_retry_interval: float = field(
+        default_factory=lambda: float(os.getenv("CACHE_REDIS_RETRY_INTERVAL", "30"))
+    )  # 服务不可达后仅使用本地缓存的时长（秒）
+    result_cache_max_bytes: int = field(
+        default_factory=lambda: int(
+            os.getenv("RESULT_CACHE_MAX_BYTES", str(16 * 1024 * 1024))
+        )
+    )  # 工具结果缓存默认上限16MB
+    response_cache_enabled: bool = field(
+        default_factory=lambda: os.getenv("RESPONSE_CACHE_ENABLED", "true").lower()
+        == "true"
+    )
+    response_cache_tools: List[str] = field(
+        default_factory=lambda: _env_list(
+            "RESPONSE_CACHE_TOOLS",
+            "get_all_recipes,get_recipes_by_category,get_recipe_details,"
+            "search_recipes_by_ingredients,filter_recipes_by_difficulty,"
+            "search_recipes_by_time,generate_shopping_list,"
+            "search_recipes_by_cuisine,get_ingredient_substitutes,"
+            "search_recipes_by_tags,analyze_recipe_nutrition",
+        )
+    )  # 结果只取决于参数和数据集版本的工具
+    response_cache_resources: List[str] = field(
+        default_factory=lambda: _env_list(
+            "RESPONSE_CACHE_RESOURCES", "howtocook://categories,howtocook://stats"
+        )
+    )  # 内容只取决于数据集版本的资源
 
 
 @dataclass(frozen=True)
@@ -53,7 +150,131 @@ class PerformanceConfig:
     )
     request_timeout: int = field(
         default_factory=lambda: int(os.getenv("REQUEST_TIMEOUT", "30"))
+    )  # 工具调用和资源读取的截止时间（秒），0 表示不限制
+    rate_limit_per_second: float = field(
+        default_factory=lambda: float(os.getenv("RATE_LIMIT_PER_SECOND", "10"))
+    )  # 每个客户端每秒补充的令牌数，0 表示不限速
+    rate_limit_burst: float = field(
+        default_factory=lambda: float(os.getenv("RATE_LIMIT_BURST", "20"))
+    )  # 每个客户端令牌桶的容量
+    rate_limit_tool_costs: Dict[str, float] = field(
+        default_factory=lambda: _env_costs(
+            "RATE_LIMIT_TOOL_COSTS",
+            "recommend_meals=5,what_to_eat=3,get_all_recipes=3,"
+            "generate_shopping_list=2,get_seasonal_recommendations=2",
+        )
+    )  # 各工具每次调用消耗的令牌数，未列出的请求消耗 1 个
+    admission_control_enabled: bool = field(
+        default_factory=lambda: os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower()
+        == "true"
+    )  # 过载时按优先级拒绝请求
+    admission_lag_threshold: float = field(
+        default_factory=lambda: float(os.getenv("ADMISSION_LAG_THRESHOLD", "0.1"))
+    )  # 事件循环延迟达到该值（秒）时拒绝低优先级请求，达到两倍时拒绝普通请求
+    admission_max_in_flight: int = field(
+        default_factory=lambda: int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "40"))
+    )  # 进行中（含排队）请求达到一半时拒绝低优先级请求，达到该值时拒绝普通请求
+    admission_low_priority: List[str] = field(
+        default_factory=lambda: _env_list(
+            "ADMISSION_LOW_PRIORITY",
+            "recommend_meals,get_all_recipes,what_to_eat,get_seasonal_recommendations",
+        )
+    )  # 开销大、最先被拒绝的工具或资源 URI
+    admission_high_priority: List[str] = field(
+        default_factory=lambda: _env_list(
+            "ADMISSION_HIGH_PRIORITY",
+            "get_recipe_details,get_recipes_by_category,get_ingredient_substitutes",
+        )
+    )  # 开销小、从不被拒绝的工具或资源 URI
+
+
+@dataclass(frozen=True)
+class MonitoringConfig:
+    """监控指标配置"""
+
+    metrics_enabled: bool = field(
+        default_factory=lambda: os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    )
+    metrics_path: str = field(
+        default_factory=lambda: os.getenv("METRICS_PATH", "/metrics")
+    )  # OpenMetrics 格式指标的 HTTP 路径
+    metrics_aggregation_path: str = field(
+        default_factory=lambda: os.getenv(
+            "METRICS_AGGREGATION_PATH",
+            os.path.join(private_data_dir(), "metrics.sqlite3"),
+        )
+    )  # MCP_WORKERS 大于 1 时各工作进程发布指标快照的共享 SQLite 文件
+    metrics_aggregation_interval: float = field(
+        default_factory=lambda: float(os.getenv("METRICS_AGGREGATION_INTERVAL", "5"))
+    )  # 发布和读取指标快照的周期（秒），0 表示不汇总
+    loop_lag_interval: float = field(
+        default_factory=lambda: float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+    )  # 事件循环延迟采样周期（秒），0 表示关闭
+    loop_lag_threshold: float = field(
+        default_factory=lambda: float(os.getenv("LOOP_LAG_THRESHOLD", "0.1"))
+    )  # 超过该延迟（秒）时采集阻塞调用栈，0 表示不采集
+    memory_accounting_interval: float = field(
+        default_factory=lambda: float(os.getenv("MEMORY_ACCOUNTING_INTERVAL", "300"))
+    )  # 后台统计各子系统内存占用的周期（秒），0 表示关闭
+    slow_call_log_enabled: bool = field(
+        default_factory=lambda: os.getenv("SLOW_CALL_LOG_ENABLED", "true").lower()
+        == "true"
+    )
+    slow_call_percentile: float = field(
+        default_factory=lambda: float(os.getenv("SLOW_CALL_PERCENTILE", "0.99"))
+    )  # 耗时不低于该工具此分位数的调用记入慢调用日志
+    slow_call_min_samples: int = field(
+        default_factory=lambda: int(os.getenv("SLOW_CALL_MIN_SAMPLES", "100"))
+    )  # 工具调用次数达到该值后才开始判定慢调用
+    slow_call_log_size: int = field(
+        default_factory=lambda: int(os.getenv("SLOW_CALL_LOG_SIZE", "200"))
+    )  # 慢调用日志保留的最近记录数
+    slow_call_sample_rate: float = field(
+        default_factory=lambda: float(os.getenv("SLOW_CALL_SAMPLE_RATE", "0.1"))
+    )  # 未开启追踪时按该比例采样调用以收集阶段耗时
+    payload_metrics_enabled: bool = field(
+        default_factory=lambda: os.getenv("PAYLOAD_METRICS_ENABLED", "true").lower()
+        == "true"
+    )
+    payload_item_sample_rate: float = field(
+        default_factory=lambda: float(os.getenv("PAYLOAD_ITEM_SAMPLE_RATE", "0.1"))
+    )  # 按该比例采样调用解析结果 JSON 统计条目数
+    tracing_enabled: bool = field(
+        default_factory=lambda: os.getenv("TRACING_ENABLED", "false").lower() == "true"
     )
+    tracing_otlp_endpoint: str = field(
+        default_factory=lambda: os.getenv("TRACING_OTLP_ENDPOINT", "")
+    )  # OTLP/HTTP 收集器地址，如 http://localhost:4318，为空时不导出
+    tracing_export_interval: float = field(
+        default_factory=lambda: float(os.getenv("TRACING_EXPORT_INTERVAL", "5"))
+    )  # 批量导出周期（秒）
+    tracing_max_queue: int = field(
+        default_factory=lambda: int(os.getenv("TRACING_MAX_QUEUE", "2048"))
+    )  # 待导出 span 的队列上限，超出时丢弃
+    health_live_path: str = field(
+        default_factory=lambda: os.getenv("HEALTH_LIVE_PATH", "/healthz")
+    )  # 存活检查的 HTTP 路径
+    health_ready_path: str = field(
+        default_factory=lambda: os.getenv("HEALTH_READY_PATH", "/readyz")
+    )  # 就绪检查的 HTTP 路径
+    readiness_max_dataset_age: float = field(
+        default_factory=lambda: float(os.getenv("READINESS_MAX_DATASET_AGE", "7200"))
+    )  # 数据集超过该时长（秒）未刷新时视为未就绪，0 表示不限制
+    readiness_warmup_interval: float = field(
+        default_factory=lambda: float(os.getenv("READINESS_WARMUP_INTERVAL", "30"))
+    )  # 就绪检查触发后台加载的最小间隔（秒），连续失败时逐次加倍
+
+
+@dataclass(frozen=True)
+class AdminConfig:
+    """管理工具配置"""
+
+    enabled: bool = field(
+        default_factory=lambda: os.getenv("ADMIN_ENABLED", "false").lower() == "true"
+    )  # 关闭时不注册任何管理工具
+    token: str = field(
+        default_factory=lambda: os.getenv("ADMIN_TOKEN", "")
+    )  # 调用管理工具时需要提供的令牌，开启管理工具时必须设置
 
 
 @dataclass(frozen=True)
@@ -122,6 +343,8 @@ class AppConfig:
     cache: CacheConfig = field(default_factory=CacheConfig)
     logging: LoggingConfig = field(default_factory=LoggingConfig)
     performance: PerformanceConfig = field(default_factory=PerformanceConfig)
+    monitoring: MonitoringConfig = field(default_factory=MonitoringConfig)
+    admin: AdminConfig = field(default_factory=AdminConfig)
     recommendation: RecommendationConfig = field(default_factory=RecommendationConfig)
     meal_plan: MealPlanConfig = field(default_factory=MealPlanConfig)
     resources: ResourceConfig = field(default_factory=ResourceConfig)
@@ -144,6 +367,19 @@ class AppConfig:
             "cache": {
                 "enabled": self.cache.enabled,
                 "ttl": self.cache.ttl,
+                "max_entries": self.cache.max_entries,
+                "max_bytes": self.cache.max_bytes,
+                "eviction_policy": self.cache.eviction_policy,
+                "lock_stripes": self.cache.lock_stripes,
+                "sweep_interval": self.cache.sweep_interval,
+                "sweep_batch_size": self.cache.sweep_batch_size,
+                "xfetch_beta": self.cache.xfetch_beta,
+                "l2_backend": self.cache.l2_backend,
+                "l2_path": self.cache.l2_path,
+                "result_cache_max_bytes": self.cache.result_cache_max_bytes,
+                "response_cache_enabled": self.cache.response_cache_enabled,
+                "response_cache_tools": self.cache.response_cache_tools,
+                "response_cache_resources": self.cache.response_cache_resources,
             },
             "logging": {
                 "level": self.logging.level,
@@ -152,6 +388,41 @@ class AppConfig:
             "performance": {
                 "max_concurrent_requests": self.performance.max_concurrent_requests,
                 "request_timeout": self.performance.request_timeout,
+                "rate_limit_per_second": self.performance.rate_limit_per_second,
+                "rate_limit_burst": self.performance.rate_limit_burst,
+                "rate_limit_tool_costs": self.performance.rate_limit_tool_costs,
+                "admission_control_enabled": (
+                    self.performance.admission_control_enabled
+                ),
+                "admission_lag_threshold": self.performance.admission_lag_threshold,
+                "admission_max_in_flight": self.performance.admission_max_in_flight,
+                "admission_low_priority": self.performance.admission_low_priority,
+                "admission_high_priority": self.performance.admission_high_priority,
+            },
+            "monitoring": {
+                "metrics_enabled": self.monitoring.metrics_enabled,
+                "metrics_path": self.monitoring.metrics_path,
+                "metrics_aggregation_path": self.monitoring.metrics_aggregation_path,
+                "metrics_aggregation_interval": (
+                    self.monitoring.metrics_aggregation_interval
+                ),
+                "loop_lag_interval": self.monitoring.loop_lag_interval,
+                "loop_lag_threshold": self.monitoring.loop_lag_threshold,
+                "memory_accounting_interval": self.monitoring.memory_accounting_interval,
+                "slow_call_log_enabled": self.monitoring.slow_call_log_enabled,
+                "slow_call_percentile": self.monitoring.slow_call_percentile,
+                "slow_call_sample_rate": self.monitoring.slow_call_sample_rate,
+                "payload_metrics_enabled": self.monitoring.payload_metrics_enabled,
+                "payload_item_sample_rate": self.monitoring.payload_item_sample_rate,
+                "tracing_enabled": self.monitoring.tracing_enabled,
+                "tracing_otlp_endpoint": self.monitoring.tracing_otlp_endpoint,
+                "health_live_path": self.monitoring.health_live_path,
+                "health_ready_path": self.monitoring.health_ready_path,
+                "readiness_max_dataset_age": self.monitoring.readiness_max_dataset_age,
+                "readiness_warmup_interval": self.monitoring.readiness_warmup_interval,
+            },
+            "admin": {
+                "enabled": self.admin.enabled,
             },
             "recommendation": {
                 "max_people_count": self.recommendation.max_people_count,
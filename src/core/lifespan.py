@@ -0,0 +1,119 @@
+"""
+应用生命周期管理
+
+缓存清理、事件循环延迟监控、追踪导出、内存统计和指标汇总等后台任务按进程运行。
+FastMCP 的生命周期按 MCP 会话进入和退出，HTTP 传输下会话之间没有会话时任务会被停止，
+因此 HTTP 服务通过 BackgroundTasksMiddleware 在 HTTP 应用的生命周期中启停后台任务，
+每个工作进程只启动一次；stdio 等单会话传输仍由会话生命周期启停。
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List
+from fastmcp import FastMCP
+from starlette.middleware import Middleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..infrastructure.cache import get_cache, get_result_cache, get_sweeper
+from ..infrastructure.monitoring import (
+    get_aggregator,
+    get_loop_lag_monitor,
+    get_memory_accountant,
+    get_tracer,
+)
+
+logger = logging.getLogger(__name__)
+
+# 由 HTTP 应用的生命周期管理后台任务时，会话生命周期不再启停后台任务
+_process_lifespan = False
+
+# 未由 HTTP 应用管理时，后台任务只在第一个会话进入时启动、最后一个会话退出时停止
+_active_sessions = 0
+
+
+async def start_background_tasks() -> None:
+    """启动后台任务"""
+    get_sweeper().start()
+    get_loop_lag_monitor().start()
+    get_tracer().start()
+    get_memory_accountant().start()
+    get_aggregator().start()
+    logger.info("后台任务已启动")
+
+
+async def stop_background_tasks() -> None:
+    """停止后台任务"""
+    await get_sweeper().stop()
+    await get_loop_lag_monitor().stop()
+    await get_tracer().stop()
+    await get_memory_accountant().stop()
+    await get_aggregator().stop()
+    await get_cache().close()
+    await get_result_cache().close()
+    logger.info("后台任务已停止")
+
+
+@asynccontextmanager
+async def app_lifespan(server: FastMCP) -> AsyncIterator[Any]:
+    """
+    应用生命周期上下文
+
+    Args:
+        server: FastMCP 服务器实例
+    """
+    global _active_sessions
+
+    if _process_lifespan:
+        yield {}
+        return
+
+    if _active_sessions == 0:
+        await start_background_tasks()
+    _active_sessions += 1
+    try:
+        yield {}
+    finally:
+        _active_sessions -= 1
+        if _active_sessions == 0:
+            await stop_background_tasks()
+
+
+class BackgroundTasksMiddleware:
+    """在 HTTP 应用启动时启动后台任务、停止时停止后台任务的 ASGI 中间件"""
+
+    def __init__(self, app: ASGIApp):
+        """
+        初始化中间件
+
+        Args:
+            app: 被包装的 ASGI 应用
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "lifespan":
+            await self.app(scope, receive, send)
+            return
+
+        async def receive_lifespan() -> Message:
+            global _process_lifespan
+
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                _process_lifespan = True
+                await start_background_tasks()
+            elif message["type"] == "lifespan.shutdown":
+                await stop_background_tasks()
+                _process_lifespan = False
+            return message
+
+        await self.app(scope, receive_lifespan, send)
+
+
+def http_middleware() -> List[Middleware]:
+    """
+    获取运行 HTTP 服务时需要的 ASGI 中间件
+
+    Returns:
+        List[Middleware]: 传给 run_http_async / http_app 的中间件列表
+    """
+    return [Middleware(BackgroundTasksMiddleware)]
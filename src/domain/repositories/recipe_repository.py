@@ -2,17 +2,73 @@
 菜谱数据访问层
 """
 
+import time
 import httpx
-from typing import List
+from typing import List, NamedTuple, Optional
 from ..models import Recipe
-from ...infrastructure.cache import cached
+from ...infrastructure.cache import (
+    cached,
+    estimate_size_async,
+    invalidate_dataset,
+    register_size_hint,
+    register_type,
+)
+from ...infrastructure.dataset import DatasetState, get_dataset_state
+from ...infrastructure.monitoring.memory import get_memory_accountant
 from ...core.config import get_config
 
 
+class DatasetSnapshot(NamedTuple):
+    """一次成功拉取的数据集快照，随缓存在工作进程之间共享"""
+
+    version: str
+    fetched_at: float
+    recipes: List[Recipe]
+    size: int = 0  # 拉取时估算一次的占用字节数，0 表示未知
+
+
+# 快照会写入二级缓存，注册后才能在工作进程之间共享
+register_type(Recipe, "recipe")
+register_type(DatasetSnapshot, "recipes.snapshot")
+# 缓存写入、二级缓存回填和内存统计直接使用快照中的大小，不再遍历全部菜谱
+register_size_hint(DatasetSnapshot, lambda snapshot: snapshot.size)
+
+
+# 最近一次使用的数据集快照，供后台内存统计
+_latest_snapshot: Optional[DatasetSnapshot] = None
+get_memory_accountant().register("dataset", lambda: _latest_snapshot)
+
+
 class RecipeRepository:
     """菜谱数据仓库"""
 
     @cached(ttl=3600, key_prefix="recipes")  # 缓存1小时
+    async def _fetch_dataset(self) -> DatasetSnapshot:
+        """
+        从远程数据源拉取数据集快照，失败时抛出异常，失败结果不会被缓存
+
+        Returns:
+            DatasetSnapshot: 数据集快照
+        """
+        config = get_config()
+        async with httpx.AsyncClient() as client:
+            response = await client.get(config.data_source.recipes_url)
+
+            if response.status_code != 200:
+                raise Exception(f"HTTP 请求失败! 状态码: {response.status_code}")
+
+            # 解析 JSON 数据并验证模型
+            data = response.json()
+            recipes = [Recipe.model_validate(recipe) for recipe in data]
+
+            # 以数据内容摘要作为数据集版本
+            return DatasetSnapshot(
+                version=DatasetState.compute_version(response.content),
+                fetched_at=time.time(),
+                recipes=recipes,
+                size=await estimate_size_async(recipes),
+            )
+
     async def fetch_all_recipes(self) -> List[Recipe]:
         """
         异步获取所有菜谱数据
@@ -21,20 +77,25 @@ class RecipeRepository:
             List[Recipe]: 菜谱列表，如果获取失败则返回空列表
         """
         try:
-            config = get_config()
-            async with httpx.AsyncClient() as client:
-                response = await client.get(config.data_source.recipes_url)
-
-                if response.status_code != 200:
-                    raise Exception(f"HTTP 请求失败! 状态码: {response.status_code}")
-
-                # 解析 JSON 数据并验证模型
-                data = response.json()
-                return [Recipe.model_validate(recipe) for recipe in data]
+            snapshot = await self._fetch_dataset()
         except Exception as error:
             print(f"获取远程菜谱数据失败: {error}")
+            get_dataset_state().mark_failed(str(error))
             return []
 
+        global _latest_snapshot
+        _latest_snapshot = snapshot
+
+        # 快照可能来自共享缓存中其他工作进程的拉取结果，以快照中的版本和拉取时间为准。
+        # 每次成功拉取都要记录，上游数据未变化时版本不变，但数据集年龄应从最近一次拉取算起
+        previous = get_dataset_state().mark_loaded(
+            snapshot.version, len(snapshot.recipes), loaded_at=snapshot.fetched_at
+        )
+        # 数据集版本变化时，精确删除由旧版本派生的缓存项
+        if previous is not None:
+            await invalidate_dataset(previous)
+        return snapshot.recipes
+
     def get_all_categories(self, recipes: List[Recipe]) -> List[str]:
         """
         从菜谱列表中提取所有分类
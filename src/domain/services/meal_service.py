@@ -8,6 +8,7 @@ from typing import List, Optional
 from ..models import Recipe, MealPlan, DayPlan
 from ..repositories import RecipeRepository
 from ...infrastructure.monitoring.performance_monitor import performance_tracked
+from ...infrastructure.monitoring.tracing import span
 from ...shared.utils import simplify_recipe
 from ...core.config import get_config
 
@@ -51,17 +52,19 @@ class MealService:
         if avoid_items is None:
             avoid_items = []
 
-        recipes = await self.repository.fetch_all_recipes()
+        with span("fetch"):
+            recipes = await self.repository.fetch_all_recipes()
         if not recipes:
             return "未能获取菜谱数据"
 
-        # 过滤掉含有忌口和过敏原的菜谱
-        filtered_recipes = self._filter_recipes_by_restrictions(
-            recipes, allergies, avoid_items
-        )
+        with span("filter", recipes=len(recipes)):
+            # 过滤掉含有忌口和过敏原的菜谱
+            filtered_recipes = self._filter_recipes_by_restrictions(
+                recipes, allergies, avoid_items
+            )
 
-        # 将菜谱按分类分组
-        recipes_by_category = self._group_recipes_by_category(filtered_recipes)
+            # 将菜谱按分类分组
+            recipes_by_category = self._group_recipes_by_category(filtered_recipes)
 
         # 创建每周膳食计划
         meal_plan = MealPlan()
@@ -90,7 +93,8 @@ class MealService:
             meal_plan.weekdays.append(day_plan)
 
         # 返回JSON字符串
-        return json.dumps(meal_plan.model_dump(), ensure_ascii=False, indent=2)
+        with span("serialize"):
+            return json.dumps(meal_plan.model_dump(), ensure_ascii=False, indent=2)
 
     def _filter_recipes_by_restrictions(
         self, recipes: List[Recipe], allergies: List[str], avoid_items: List[str]
@@ -6,6 +6,9 @@ import json
 from typing import List
 from ..repositories import RecipeRepository
 from ...infrastructure.monitoring.performance_monitor import performance_tracked
+from ...infrastructure.monitoring.tracing import span
+from ...infrastructure.deadline import DeadlineScan
+from ...infrastructure.cache.result_cache import result_cached, normalize_terms
 from ...shared.utils import simplify_recipe, simplify_recipe_name_only
 
 
@@ -16,6 +19,7 @@ class RecipeService:
         self.repository = RecipeRepository()
 
     @performance_tracked("get_all_recipes")
+    @result_cached("get_all_recipes")
     async def get_all_recipes(self) -> str:
         """
         获取所有菜谱
@@ -38,6 +42,7 @@ class RecipeService:
         )
 
     @performance_tracked("get_recipes_by_category")
+    @result_cached("get_recipes_by_category")
     async def get_recipes_by_category(self, category: str) -> str:
         """
         根据分类获取菜谱
@@ -78,6 +83,7 @@ class RecipeService:
         return self.repository.get_all_categories(recipes)
 
     @performance_tracked("get_recipe_details")
+    @result_cached("get_recipe_details")
     async def get_recipe_details(self, recipe_name: str) -> str:
         """
         获取指定菜谱的详细做法
@@ -120,6 +126,9 @@ class RecipeService:
         )
 
     @performance_tracked("search_recipes_by_ingredients")
+    @result_cached(
+        "search_recipes_by_ingredients", normalizers={"ingredients": normalize_terms}
+    )
     async def search_recipes_by_ingredients(self, ingredients: List[str]) -> str:
         """
         根据现有食材搜索可以制作的菜谱
@@ -130,70 +139,82 @@ class RecipeService:
         Returns:
             包含指定食材的菜谱列表，按匹配度排序
         """
-        recipes = await self.repository.fetch_all_recipes()
+        with span("fetch"):
+            recipes = await self.repository.fetch_all_recipes()
         if not recipes:
             return "未能获取菜谱数据"
 
         if not ingredients:
             return "请提供至少一种食材"
 
-        # 搜索包含指定食材的菜谱
-        matching_recipes = []
-        for recipe in recipes:
-            match_count = 0
-            recipe_ingredients = [ing.name.lower() for ing in recipe.ingredients]
-
-            for ingredient in ingredients:
-                ingredient_lower = ingredient.lower()
-                # 检查是否有食材名称包含搜索的食材
-                for recipe_ing in recipe_ingredients:
-                    if ingredient_lower in recipe_ing or recipe_ing in ingredient_lower:
-                        match_count += 1
-                        break
-
-            if match_count > 0:
-                # 计算匹配度
-                match_ratio = match_count / len(ingredients)
-                matching_recipes.append(
-                    {
-                        "recipe": recipe,
-                        "match_count": match_count,
-                        "match_ratio": match_ratio,
-                    }
-                )
+        with span("filter", recipes=len(recipes)):
+            # 搜索包含指定食材的菜谱，临近截止时间时提前停止
+            scan = DeadlineScan(recipes)
+            matching_recipes = []
+            for recipe in scan:
+                match_count = 0
+                recipe_ingredients = [ing.name.lower() for ing in recipe.ingredients]
+
+                for ingredient in ingredients:
+                    ingredient_lower = ingredient.lower()
+                    # 检查是否有食材名称包含搜索的食材
+                    for recipe_ing in recipe_ingredients:
+                        if (
+                            ingredient_lower in recipe_ing
+                            or recipe_ing in ingredient_lower
+                        ):
+                            match_count += 1
+                            break
+
+                if match_count > 0:
+                    # 计算匹配度
+                    match_ratio = match_count / len(ingredients)
+                    matching_recipes.append(
+                        {
+                            "recipe": recipe,
+                            "match_count": match_count,
+                            "match_ratio": match_ratio,
+                        }
+                    )
 
         if not matching_recipes:
+            scan.raise_if_truncated()
             return f"未找到包含食材 {', '.join(ingredients)} 的菜谱"
 
-        # 按匹配度排序
-        matching_recipes.sort(
-            key=lambda x: (x["match_count"], x["match_ratio"]), reverse=True
-        )
-
-        # 简化菜谱信息并添加匹配信息
-        result_recipes = []
-        for item in matching_recipes[:20]:  # 限制返回前20个结果
-            recipe = item["recipe"]
-            simplified = simplify_recipe(recipe)
-            simplified_dict = simplified.model_dump()
-            simplified_dict["match_info"] = {
-                "matched_ingredients": item["match_count"],
-                "total_searched": len(ingredients),
-                "match_ratio": f"{item['match_ratio']:.1%}",
-            }
-            result_recipes.append(simplified_dict)
+        with span("score", matches=len(matching_recipes)):
+            # 按匹配度排序
+            matching_recipes.sort(
+                key=lambda x: (x["match_count"], x["match_ratio"]), reverse=True
+            )
 
-        return json.dumps(
-            {
-                "searched_ingredients": ingredients,
-                "total_found": len(matching_recipes),
-                "recipes": result_recipes,
-            },
-            ensure_ascii=False,
-            indent=2,
-        )
+        with span("serialize"):
+            # 简化菜谱信息并添加匹配信息
+            result_recipes = []
+            for item in matching_recipes[:20]:  # 限制返回前20个结果
+                recipe = item["recipe"]
+                simplified = simplify_recipe(recipe)
+                simplified_dict = simplified.model_dump()
+                simplified_dict["match_info"] = {
+                    "matched_ingredients": item["match_count"],
+                    "total_searched": len(ingredients),
+                    "match_ratio": f"{item['match_ratio']:.1%}",
+                }
+                result_recipes.append(simplified_dict)
+
+            return json.dumps(
+                scan.annotate(
+                    {
+                        "searched_ingredients": ingredients,
+                        "total_found": len(matching_recipes),
+                        "recipes": result_recipes,
+                    }
+                ),
+                ensure_ascii=False,
+                indent=2,
+            )
 
     @performance_tracked("filter_recipes_by_difficulty")
+    @result_cached("filter_recipes_by_difficulty")
     async def filter_recipes_by_difficulty(self, difficulty: int) -> str:
         """
         按烹饪难度筛选菜谱
@@ -236,6 +257,7 @@ class RecipeService:
         )
 
     @performance_tracked("search_recipes_by_time")
+    @result_cached("search_recipes_by_time")
     async def search_recipes_by_time(self, max_time_minutes: int) -> str:
         """
         按制作时间筛选菜谱
@@ -246,52 +268,57 @@ class RecipeService:
         Returns:
             在指定时间内能完成的菜谱列表
         """
-        recipes = await self.repository.fetch_all_recipes()
+        with span("fetch"):
+            recipes = await self.repository.fetch_all_recipes()
         if not recipes:
             return "未能获取菜谱数据"
 
         if max_time_minutes <= 0:
             return "制作时间必须大于0分钟"
 
-        # 筛选在指定时间内能完成的菜谱
-        quick_recipes = []
-        for recipe in recipes:
-            # 如果有总时间信息，使用总时间；否则使用烹饪时间；都没有则跳过
-            recipe_time = recipe.total_time_minutes or recipe.cook_time_minutes
-            if recipe_time and recipe_time <= max_time_minutes:
-                quick_recipes.append(recipe)
+        with span("filter", recipes=len(recipes)):
+            # 筛选在指定时间内能完成的菜谱
+            quick_recipes = []
+            for recipe in recipes:
+                # 如果有总时间信息，使用总时间；否则使用烹饪时间；都没有则跳过
+                recipe_time = recipe.total_time_minutes or recipe.cook_time_minutes
+                if recipe_time and recipe_time <= max_time_minutes:
+                    quick_recipes.append(recipe)
 
         if not quick_recipes:
             return f"未找到在 {max_time_minutes} 分钟内能完成的菜谱"
 
-        # 按时间排序（从短到长）
-        quick_recipes.sort(
-            key=lambda x: x.total_time_minutes or x.cook_time_minutes or 0
-        )
-
-        # 简化菜谱信息并添加时间信息
-        result_recipes = []
-        for recipe in quick_recipes:
-            simplified = simplify_recipe(recipe)
-            simplified_dict = simplified.model_dump()
-            simplified_dict["time_info"] = {
-                "total_time_minutes": recipe.total_time_minutes,
-                "cook_time_minutes": recipe.cook_time_minutes,
-                "prep_time_minutes": recipe.prep_time_minutes,
-            }
-            result_recipes.append(simplified_dict)
+        with span("score", matches=len(quick_recipes)):
+            # 按时间排序（从短到长）
+            quick_recipes.sort(
+                key=lambda x: x.total_time_minutes or x.cook_time_minutes or 0
+            )
 
-        return json.dumps(
-            {
-                "max_time_minutes": max_time_minutes,
-                "total_found": len(quick_recipes),
-                "recipes": result_recipes,
-            },
-            ensure_ascii=False,
-            indent=2,
-        )
+        with span("serialize"):
+            # 简化菜谱信息并添加时间信息
+            result_recipes = []
+            for recipe in quick_recipes:
+                simplified = simplify_recipe(recipe)
+                simplified_dict = simplified.model_dump()
+                simplified_dict["time_info"] = {
+                    "total_time_minutes": recipe.total_time_minutes,
+                    "cook_time_minutes": recipe.cook_time_minutes,
+                    "prep_time_minutes": recipe.prep_time_minutes,
+                }
+                result_recipes.append(simplified_dict)
+
+            return json.dumps(
+                {
+                    "max_time_minutes": max_time_minutes,
+                    "total_found": len(quick_recipes),
+                    "recipes": result_recipes,
+                },
+                ensure_ascii=False,
+                indent=2,
+            )
 
     @performance_tracked("generate_shopping_list")
+    @result_cached("generate_shopping_list")
     async def generate_shopping_list(
         self, recipe_names: List[str], people_count: int = 1
     ) -> str:
@@ -414,6 +441,7 @@ class RecipeService:
         return json.dumps(result, ensure_ascii=False, indent=2)
 
     @performance_tracked("search_recipes_by_cuisine")
+    @result_cached("search_recipes_by_cuisine")
     async def search_recipes_by_cuisine(self, cuisine_type: str) -> str:
         """
         按菜系搜索菜谱
@@ -462,6 +490,7 @@ class RecipeService:
         )
 
     @performance_tracked("get_ingredient_substitutes")
+    @result_cached("get_ingredient_substitutes")
     async def get_ingredient_substitutes(self, ingredient_name: str) -> str:
         """
         获取食材的替代建议
@@ -504,6 +533,7 @@ class RecipeService:
         )
 
     @performance_tracked("search_recipes_by_tags")
+    @result_cached("search_recipes_by_tags", normalizers={"tags": normalize_terms})
     async def search_recipes_by_tags(self, tags: List[str]) -> str:
         """
         按标签搜索菜谱
@@ -514,65 +544,73 @@ class RecipeService:
         Returns:
             包含指定标签的菜谱列表
         """
-        recipes = await self.repository.fetch_all_recipes()
+        with span("fetch"):
+            recipes = await self.repository.fetch_all_recipes()
         if not recipes:
             return "未能获取菜谱数据"
 
         if not tags:
             return "请提供至少一个标签"
 
-        # 搜索包含指定标签的菜谱
-        matching_recipes = []
-        for recipe in recipes:
-            recipe_tags = [tag.lower() for tag in recipe.tags]
-            recipe_text = f"{recipe.name} {recipe.description}".lower()
-
-            match_count = 0
-            for tag in tags:
-                tag_lower = tag.lower()
-                # 检查标签是否在菜谱标签中或描述中
-                if tag_lower in recipe_tags or tag_lower in recipe_text:
-                    match_count += 1
+        with span("filter", recipes=len(recipes)):
+            # 搜索包含指定标签的菜谱，临近截止时间时提前停止
+            scan = DeadlineScan(recipes)
+            matching_recipes = []
+            for recipe in scan:
+                recipe_tags = [tag.lower() for tag in recipe.tags]
+                recipe_text = f"{recipe.name} {recipe.description}".lower()
+
+                match_count = 0
+                for tag in tags:
+                    tag_lower = tag.lower()
+                    # 检查标签是否在菜谱标签中或描述中
+                    if tag_lower in recipe_tags or tag_lower in recipe_text:
+                        match_count += 1
 
-            if match_count > 0:
-                matching_recipes.append(
-                    {
-                        "recipe": recipe,
-                        "match_count": match_count,
-                        "match_ratio": match_count / len(tags),
-                    }
-                )
+                if match_count > 0:
+                    matching_recipes.append(
+                        {
+                            "recipe": recipe,
+                            "match_count": match_count,
+                            "match_ratio": match_count / len(tags),
+                        }
+                    )
 
         if not matching_recipes:
+            scan.raise_if_truncated()
             return f"未找到包含标签 {', '.join(tags)} 的菜谱"
 
-        # 按匹配度排序
-        matching_recipes.sort(
-            key=lambda x: (x["match_count"], x["match_ratio"]), reverse=True
-        )
-
-        # 简化菜谱信息
-        result_recipes = []
-        for item in matching_recipes[:20]:  # 限制返回前20个结果
-            recipe = item["recipe"]
-            simplified = simplify_recipe(recipe)
-            simplified_dict = simplified.model_dump()
-            simplified_dict["match_info"] = {
-                "matched_tags": item["match_count"],
-                "total_searched": len(tags),
-                "recipe_tags": recipe.tags,
-            }
-            result_recipes.append(simplified_dict)
+        with span("score", matches=len(matching_recipes)):
+            # 按匹配度排序
+            matching_recipes.sort(
+                key=lambda x: (x["match_count"], x["match_ratio"]), reverse=True
+            )
 
-        return json.dumps(
-            {
-                "searched_tags": tags,
-                "total_found": len(matching_recipes),
-                "recipes": result_recipes,
-            },
-            ensure_ascii=False,
-            indent=2,
-        )
+        with span("serialize"):
+            # 简化菜谱信息
+            result_recipes = []
+            for item in matching_recipes[:20]:  # 限制返回前20个结果
+                recipe = item["recipe"]
+                simplified = simplify_recipe(recipe)
+                simplified_dict = simplified.model_dump()
+                simplified_dict["match_info"] = {
+                    "matched_tags": item["match_count"],
+                    "total_searched": len(tags),
+                    "recipe_tags": recipe.tags,
+                }
+                result_recipes.append(simplified_dict)
+
+            return json.dumps(
+                scan.annotate(
+                    {
+                        "searched_tags": tags,
+                        "total_found": len(matching_recipes),
+                        "recipes": result_recipes,
+                    }
+                ),
+                ensure_ascii=False,
+                indent=2,
+            )
 
     @performance_tracked("get_seasonal_recommendations")
     async def get_seasonal_recommendations(self, season: str = "current") -> str:
@@ -616,9 +654,10 @@ class RecipeService:
         if not recipes:
             return "未能获取菜谱数据"
 
-        # 搜索包含时令食材的菜谱
+        # 搜索包含时令食材的菜谱，临近截止时间时提前停止
+        scan = DeadlineScan(recipes)
         seasonal_recipes = []
-        for recipe in recipes:
+        for recipe in scan:
             ingredient_names = [ing.name.lower() for ing in recipe.ingredients]
             recipe_text = f"{recipe.name} {recipe.description}".lower()
 
@@ -649,6 +688,7 @@ class RecipeService:
                 )
 
         if not seasonal_recipes:
+            scan.raise_if_truncated()
             return f"未找到适合{season_map.get(season, season)}的菜谱"
 
         # 按时令食材数量排序
@@ -667,17 +707,20 @@ class RecipeService:
             result_recipes.append(simplified_dict)
 
         return json.dumps(
-            {
-                "season": season_map.get(season, season),
-                "seasonal_ingredients": seasonal_ingredients,
-                "total_found": len(seasonal_recipes),
-                "recipes": result_recipes,
-            },
+            scan.annotate(
+                {
+                    "season": season_map.get(season, season),
+                    "seasonal_ingredients": seasonal_ingredients,
+                    "total_found": len(seasonal_recipes),
+                    "recipes": result_recipes,
+                }
+            ),
             ensure_ascii=False,
             indent=2,
         )
 
     @performance_tracked("analyze_recipe_nutrition")
+    @result_cached("analyze_recipe_nutrition")
     async def analyze_recipe_nutrition(self, recipe_name: str) -> str:
         """
         分析菜谱营养成分
@@ -8,6 +8,7 @@ from typing import List, Optional
 from ..models import Recipe, DishRecommendation
 from ..repositories import RecipeRepository
 from ...infrastructure.monitoring.performance_monitor import performance_tracked
+from ...infrastructure.monitoring.tracing import span
 from ...shared.utils import simplify_recipe
 from ...core.config import get_config
 
@@ -39,7 +40,8 @@ class RecommendationService:
                 f"用餐人数必须在{self.config.recommendation.min_people_count}-{self.config.recommendation.max_people_count}之间"
             )
 
-        recipes = await self.repository.fetch_all_recipes()
+        with span("fetch"):
+            recipes = await self.repository.fetch_all_recipes()
         if not recipes:
             return "未能获取菜谱数据"
 
@@ -125,6 +127,7 @@ class RecommendationService:
         )
 
         # 返回JSON字符串
-        return json.dumps(
-            dish_recommendation.model_dump(), ensure_ascii=False, indent=2
-        )
+        with span("serialize"):
+            return json.dumps(
+                dish_recommendation.model_dump(), ensure_ascii=False, indent=2
+            )
@@ -2,7 +2,14 @@
 基础设施层模块
 """
 
-from .cache import MemoryCache, cached, get_cache
+from .cache import (
+    MemoryCache,
+    cached,
+    get_cache,
+    ResultCache,
+    result_cached,
+    get_result_cache,
+)
 from .monitoring import (
     HealthChecker,
     get_health_checker,
@@ -15,6 +22,9 @@ __all__ = [
     "MemoryCache",
     "cached",
     "get_cache",
+    "ResultCache",
+    "result_cached",
+    "get_result_cache",
     "HealthChecker",
     "get_health_checker",
     "PerformanceMonitor",
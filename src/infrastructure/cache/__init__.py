@@ -3,5 +3,44 @@
 """
 
 from .memory_cache import MemoryCache, cached, get_cache
+from .result_cache import ResultCache, result_cached, get_result_cache, normalize_terms
+from .keys import (
+    CacheKeyBuilder,
+    canonical_json,
+    dataset_tag,
+    dataset_version_namespace,
+    tool_tag,
+)
+from .backend import CacheBackend
+from .sqlite_cache import SQLiteCache
+from .redis_cache import RedisCache
+from .serialization import register_type
+from .sizing import estimate_size_async, register_size_hint
+from .invalidation import invalidate_tag, invalidate_dataset, invalidate_tool
+from .sweeper import CacheSweeper, get_sweeper
 
-__all__ = ["MemoryCache", "cached", "get_cache"]
+__all__ = [
+    "MemoryCache",
+    "cached",
+    "get_cache",
+    "ResultCache",
+    "result_cached",
+    "get_result_cache",
+    "normalize_terms",
+    "CacheKeyBuilder",
+    "canonical_json",
+    "dataset_version_namespace",
+    "dataset_tag",
+    "tool_tag",
+    "invalidate_tag",
+    "invalidate_dataset",
+    "invalidate_tool",
+    "CacheBackend",
+    "SQLiteCache",
+    "RedisCache",
+    "register_type",
+    "estimate_size_async",
+    "register_size_hint",
+    "CacheSweeper",
+    "get_sweeper",
+]
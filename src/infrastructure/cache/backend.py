@@ -0,0 +1,100 @@
+"""
+二级缓存后端接口
+
+MemoryCache 通过该接口访问共享缓存层。后端只负责存取 (值, 过期时间)，
+不参与本地缓存的淘汰和统计；任何后端错误都应在内部记录并表现为未命中。
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class CacheBackend(ABC):
+    """二级缓存后端基类"""
+
+    #: 后端名称，用于统计信息
+    name = "backend"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        获取缓存值
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Tuple[Any, float]]: (缓存值, 过期时间)，不存在、已过期或读取失败时返回 None
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, expires_at: float) -> None:
+        """
+        写入缓存值
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            expires_at: 过期时间戳
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """
+        删除缓存值
+
+        Args:
+            key: 缓存键
+        """
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """清空当前命名空间下的所有缓存"""
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Tuple[Any, float]]:
+        """
+        批量获取缓存值，默认逐个读取，支持批量协议的后端应覆盖此方法
+
+        Args:
+            keys: 缓存键列表
+
+        Returns:
+            Dict[str, Tuple[Any, float]]: 命中的键到 (缓存值, 过期时间) 的映射
+        """
+        found = {}
+        for key in keys:
+            result = await self.get(key)
+            if result is not None:
+                found[key] = result
+        return found
+
+    async def set_many(self, items: Iterable[Tuple[str, Any, float]]) -> None:
+        """
+        批量写入缓存值，默认逐个写入，支持批量协议的后端应覆盖此方法
+
+        Args:
+            items: (缓存键, 缓存值, 过期时间戳) 序列
+        """
+        for key, value, expires_at in items:
+            await self.set(key, value, expires_at)
+
+    async def cleanup_expired(self) -> int:
+        """
+        删除已过期的缓存项，由服务端自行过期的后端无需处理
+
+        Returns:
+            int: 删除的项目数量
+        """
+        return 0
+
+    async def close(self) -> None:
+        """释放后端持有的连接等资源"""
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取后端统计信息
+
+        Returns:
+            Dict[str, Any]: 后端统计信息
+        """
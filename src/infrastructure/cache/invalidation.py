@@ -0,0 +1,63 @@
+"""
+按标签失效缓存
+
+数据集刷新后，由旧版本数据派生的查询结果、序列化片段和统计信息都带有 dataset:<旧版本>
+标签，按标签删除即可精确清理，不影响其他缓存项。
+"""
+
+import logging
+from typing import Dict
+from .keys import dataset_tag, tool_tag
+from .memory_cache import MemoryCache, get_cache
+from .result_cache import get_result_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _caches() -> Dict[str, MemoryCache]:
+    """参与按标签失效的全局缓存"""
+    return {"default": get_cache(), "result": get_result_cache()}
+
+
+async def invalidate_tag(tag: str) -> Dict[str, int]:
+    """
+    在所有全局缓存中删除带指定标签的缓存项
+
+    Args:
+        tag: 标签
+
+    Returns:
+        Dict[str, int]: 每个缓存删除的项目数量
+    """
+    removed = {
+        name: await cache.invalidate_tag(tag) for name, cache in _caches().items()
+    }
+    if any(removed.values()):
+        logger.info(f"缓存标签 {tag} 已失效: {removed}")
+    return removed
+
+
+async def invalidate_dataset(version: str) -> Dict[str, int]:
+    """
+    删除由指定数据集版本派生的所有缓存项
+
+    Args:
+        version: 数据集版本
+
+    Returns:
+        Dict[str, int]: 每个缓存删除的项目数量
+    """
+    return await invalidate_tag(dataset_tag(version))
+
+
+async def invalidate_tool(tool_name: str) -> Dict[str, int]:
+    """
+    删除指定工具的所有缓存结果
+
+    Args:
+        tool_name: 工具名称
+
+    Returns:
+        Dict[str, int]: 每个缓存删除的项目数量
+    """
+    return await invalidate_tag(tool_tag(tool_name))
@@ -0,0 +1,205 @@
+"""
+缓存键生成
+
+将函数参数规范化为稳定的 JSON 表示并计算摘要，生成的缓存键不依赖对象地址和进程级的
+字符串哈希盐值，可以在多个工作进程或共享缓存之间复用。
+"""
+
+import json
+import hashlib
+import inspect
+import dataclasses
+from typing import Any, Callable, Dict, Optional
+from ..dataset import get_dataset_state
+
+
+def canonicalize(value: Any) -> Any:
+    """
+    将参数值转换为可稳定序列化的结构
+
+    Args:
+        value: 参数值
+
+    Returns:
+        Any: 仅包含 JSON 基本类型的等价结构
+
+    Raises:
+        TypeError: 无法为该类型生成稳定表示
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        return {str(key): canonicalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(
+            (canonicalize(item) for item in value),
+            key=lambda item: json.dumps(item, sort_keys=True, ensure_ascii=False),
+        )
+    if isinstance(value, bytes):
+        return value.hex()
+    if hasattr(value, "model_dump"):
+        return canonicalize(value.model_dump(mode="json"))
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return canonicalize(dataclasses.asdict(value))
+
+    raise TypeError(
+        f"无法为 {type(value).__name__} 类型的参数生成稳定的缓存键，请提供 key_func"
+    )
+
+
+def canonical_json(value: Any) -> str:
+    """
+    生成参数的规范化 JSON 字符串
+
+    Args:
+        value: 参数值
+
+    Returns:
+        str: 键有序、无多余空白的 JSON 字符串
+    """
+    return json.dumps(
+        canonicalize(value), sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+
+
+def digest(value: Any) -> str:
+    """
+    计算参数的稳定摘要
+
+    Args:
+        value: 参数值
+
+    Returns:
+        str: SHA-256 摘要的前 32 位十六进制字符
+    """
+    return hashlib.sha256(canonical_json(value).encode("utf-8")).hexdigest()[:32]
+
+
+def dataset_tag(version: str) -> str:
+    """
+    生成数据集版本标签
+
+    Args:
+        version: 数据集版本
+
+    Returns:
+        str: 形如 dataset:<版本> 的标签
+    """
+    return f"dataset:{version}"
+
+
+def tool_tag(tool_name: str) -> str:
+    """
+    生成工具标签
+
+    Args:
+        tool_name: 工具名称
+
+    Returns:
+        str: 形如 tool:<工具名> 的标签
+    """
+    return f"tool:{tool_name}"
+
+
+def dataset_version_namespace() -> Optional[str]:
+    """
+    以当前数据集版本作为缓存键命名空间，同时作为缓存项的数据集标签
+
+    Returns:
+        Optional[str]: 命名空间，数据集未加载时返回 None
+    """
+    version = get_dataset_state().version
+    return dataset_tag(version) if version else None
+
+
+class CacheKeyBuilder:
+    """为指定函数生成缓存键"""
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        key_prefix: str = "",
+        key_func: Optional[Callable[..., Any]] = None,
+        namespace: Optional[Callable[[], Optional[str]]] = None,
+    ):
+        """
+        初始化缓存键生成器
+
+        Args:
+            func: 被缓存的函数
+            key_prefix: 缓存键前缀
+            key_func: 自定义键函数，接收除 self/cls 外的原始参数，返回值会被规范化后参与摘要
+            namespace: 返回命名空间的函数，如数据集版本；返回 None 表示当前不可缓存
+        """
+        self.key_prefix = key_prefix
+        self.key_func = key_func
+        self.namespace = namespace
+        self.signature = inspect.signature(func)
+        self.qualified_name = f"{func.__module__}.{func.__qualname__}"
+
+        parameters = list(self.signature.parameters)
+        self.skip_first = bool(parameters) and parameters[0] in ("self", "cls")
+
+    def bind(self, args: tuple, kwargs: Dict[str, Any]) -> inspect.BoundArguments:
+        """
+        绑定调用参数并补全默认值
+
+        Args:
+            args: 位置参数
+            kwargs: 关键字参数
+
+        Returns:
+            inspect.BoundArguments: 绑定后的参数
+        """
+        bound = self.signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return bound
+
+    def key_arguments(self, bound: inspect.BoundArguments) -> Dict[str, Any]:
+        """
+        获取参与缓存键计算的参数映射，跳过 self/cls
+
+        Args:
+            bound: 绑定后的参数
+
+        Returns:
+            Dict[str, Any]: 参数名到值的映射
+        """
+        arguments = dict(bound.arguments)
+        if self.skip_first:
+            arguments.pop(next(iter(self.signature.parameters)), None)
+        return arguments
+
+    def build(
+        self, args: tuple, kwargs: Dict[str, Any], namespace: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        生成缓存键
+
+        Args:
+            args: 位置参数
+            kwargs: 关键字参数
+            namespace: 调用方已获取的命名空间，如果为 None 则由命名空间函数获取
+
+        Returns:
+            Optional[str]: 缓存键，命名空间不可用时返回 None
+        """
+        parts = [self.key_prefix] if self.key_prefix else []
+        parts.append(self.qualified_name)
+        if self.namespace is not None:
+            if namespace is None:
+                namespace = self.namespace()
+            if namespace is None:
+                return None
+            parts.append(namespace)
+
+        if self.key_func is not None:
+            call_args = args[1:] if self.skip_first else args
+            key_material = self.key_func(*call_args, **kwargs)
+        else:
+            key_material = self.key_arguments(self.bind(args, kwargs))
+
+        parts.append(digest(key_material))
+        return ":".join(parts)
@@ -2,28 +2,267 @@
 内存缓存实现
 """
 
+import math
 import time
+import heapq
+import random
+import logging
 import asyncio
-from typing import Any, Dict, Optional, Callable, Awaitable
+import functools
+import contextlib
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Callable,
+    Awaitable,
+    Tuple,
+    Iterable,
+    NamedTuple,
+    Set,
+)
 from ...core.config import get_config
+from .sizing import estimate_size
+from .keys import CacheKeyBuilder
+from .backend import CacheBackend
+from .sqlite_cache import SQLiteCache
+from .serialization import register_type
+from .redis_cache import RedisCache
+
+logger = logging.getLogger(__name__)
+
+EVICTION_POLICIES = ("lru", "lfu")
+
+
+class _Computed(NamedTuple):
+    """get_or_compute 写入的缓存值，附带计算耗时用于提前刷新"""
+
+    value: Any
+    delta: float
+
+
+class _Tagged(NamedTuple):
+    """写入二级缓存的带标签值，回填本地缓存时恢复标签"""
+
+    value: Any
+    tags: Tuple[str, ...]
+
+
+register_type(_Computed, "cache.computed")
+register_type(_Tagged, "cache.tagged")
+
+
+class _CacheEntry:
+    """缓存项"""
+
+    __slots__ = ("value", "expires_at", "created_at", "size", "tags")
+
+    def __init__(
+        self,
+        value: Any,
+        expires_at: float,
+        created_at: float,
+        size: int,
+        tags: Tuple[str, ...] = (),
+    ):
+        self.value = value
+        self.expires_at = expires_at
+        self.created_at = created_at
+        self.size = size
+        self.tags = tags
+
+
+class _LRUPolicy:
+    """最近最少使用淘汰策略，所有操作均为 O(1)"""
+
+    def __init__(self):
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+
+    def add(self, key: str) -> None:
+        self._order[key] = None
+
+    def touch(self, key: str) -> None:
+        self._order.move_to_end(key)
+
+    def remove(self, key: str) -> None:
+        self._order.pop(key, None)
+
+    def victim(self) -> Optional[str]:
+        return next(iter(self._order), None)
+
+    def clear(self) -> None:
+        self._order.clear()
+
+
+class _LFUPolicy:
+    """最不经常使用淘汰策略，同频次按最近最少使用淘汰
+
+    读写为 O(1)；显式删除清空最低频次桶后，下一次淘汰需要重新确定最低频次。
+    """
+
+    def __init__(self):
+        self._frequencies: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._min_frequency = 0
+
+    def add(self, key: str) -> None:
+        self._frequencies[key] = 1
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_frequency = 1
+
+    def touch(self, key: str) -> None:
+        frequency = self._frequencies[key]
+        bucket = self._buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[frequency]
+            if self._min_frequency == frequency:
+                self._min_frequency = frequency + 1
+
+        self._frequencies[key] = frequency + 1
+        self._buckets.setdefault(frequency + 1, OrderedDict())[key] = None
+
+    def remove(self, key: str) -> None:
+        frequency = self._frequencies.pop(key, None)
+        if frequency is None:
+            return
+
+        bucket = self._buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            # 最低频次桶被删空时，下一个最低频次延迟到淘汰时再确定
+            del self._buckets[frequency]
+
+    def victim(self) -> Optional[str]:
+        bucket = self._buckets.get(self._min_frequency)
+        if not bucket:
+            if not self._buckets:
+                return None
+            self._min_frequency = min(self._buckets)
+            bucket = self._buckets[self._min_frequency]
+        return next(iter(bucket))
+
+    def clear(self) -> None:
+        self._frequencies.clear()
+        self._buckets.clear()
+        self._min_frequency = 0
 
 
 class MemoryCache:
-    """简单的内存缓存实现"""
+    """
+    支持容量限制和 LRU/LFU 淘汰的内存缓存实现
+
+    所有结构修改（查找、淘汰、过期删除）都不包含 await，在事件循环线程内原子执行，
+    因此读操作不加锁；写操作按键分段加锁，保证同一键的本地写入和二级缓存写穿按顺序完成。
+    从二级缓存回填本地缓存同样不加锁，读取期间同一分段有写入或删除时放弃回填。
+    """
 
-    def __init__(self, enabled: bool = None, default_ttl: int = None):
+    def __init__(
+        self,
+        enabled: bool = None,
+        default_ttl: int = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        eviction_policy: Optional[str] = None,
+        lock_stripes: Optional[int] = None,
+        l2: Optional[CacheBackend] = None,
+    ):
         """
         初始化缓存
 
         Args:
             enabled: 是否启用缓存，如果为 None 则使用配置文件设置
             default_ttl: 默认过期时间（秒），如果为 None 则使用配置文件设置
+            max_entries: 最大缓存项数量，如果为 None 则使用配置文件设置，0 表示不限制
+            max_bytes: 估算的最大内存占用（字节），如果为 None 则使用配置文件设置，0 表示不限制
+            eviction_policy: 淘汰策略，"lru" 或 "lfu"，如果为 None 则使用配置文件设置
+            lock_stripes: 写锁分段数量，如果为 None 则使用配置文件设置
+            l2: 可选的二级缓存，读未命中时回源读取，写入时同步写穿
         """
         config = get_config()
         self.enabled = enabled if enabled is not None else config.cache.enabled
         self.default_ttl = default_ttl if default_ttl is not None else config.cache.ttl
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._lock = asyncio.Lock()
+        self.max_entries = (
+            max_entries if max_entries is not None else config.cache.max_entries
+        )
+        self.max_bytes = max_bytes if max_bytes is not None else config.cache.max_bytes
+        self.eviction_policy = (eviction_policy or config.cache.eviction_policy).lower()
+        if self.eviction_policy not in EVICTION_POLICIES:
+            raise ValueError(
+                f"不支持的缓存淘汰策略: {self.eviction_policy}，可选值: {', '.join(EVICTION_POLICIES)}"
+            )
+
+        self._cache: Dict[str, _CacheEntry] = {}
+        # 过期时间小顶堆，覆盖写入和删除留下的旧记录在出堆时跳过
+        self._expiry_heap: List[Tuple[float, str]] = []
+        # 标签到缓存键集合的反向索引，按标签失效时只访问带该标签的缓存项
+        self._tags: Dict[str, Set[str]] = {}
+        self._policy = _LFUPolicy() if self.eviction_policy == "lfu" else _LRUPolicy()
+        self._total_bytes = 0
+        stripes = (
+            lock_stripes if lock_stripes is not None else config.cache.lock_stripes
+        )
+        self._write_locks = [asyncio.Lock() for _ in range(max(1, stripes))]
+        # 各分段的写入次数，从二级缓存回填前检查读取期间是否有写入或删除
+        self._generations = [0] * len(self._write_locks)
+        self._l2 = l2
+        self.xfetch_beta = config.cache.xfetch_beta
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self.early_refreshes = 0
+        self.invalidations = 0
+
+    def _remove_entry(self, key: str) -> Optional[_CacheEntry]:
+        """移除缓存项并更新内存统计，不包含 await"""
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._policy.remove(key)
+            self._total_bytes -= entry.size
+            for tag in entry.tags:
+                keys = self._tags.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tags[tag]
+        return entry
+
+    def _make_room(self, incoming_size: int) -> None:
+        """为即将写入的缓存项淘汰旧项直到满足容量限制，不包含 await"""
+        while self._cache and (
+            (self.max_entries and len(self._cache) + 1 > self.max_entries)
+            or (self.max_bytes and self._total_bytes + incoming_size > self.max_bytes)
+        ):
+            victim = self._policy.victim()
+            if victim is None:
+                break
+            self._remove_entry(victim)
+            self.evictions += 1
+
+    def _rebuild_expiry_heap(self) -> None:
+        """丢弃过期堆中的失效记录，不包含 await"""
+        self._expiry_heap = [
+            (entry.expires_at, key) for key, entry in self._cache.items()
+        ]
+        heapq.heapify(self._expiry_heap)
+
+    def _stripe(self, key: str) -> int:
+        """获取键所在的分段"""
+        return hash(key) % len(self._write_locks)
+
+    def _write_lock(self, key: str) -> asyncio.Lock:
+        """获取键所在分段的写锁"""
+        return self._write_locks[self._stripe(key)]
+
+    def _mark_written(self, key: str) -> None:
+        """记录键所在分段发生了写入或删除，不包含 await"""
+        self._generations[self._stripe(key)] += 1
 
     async def get(self, key: str) -> Optional[Any]:
         """
@@ -35,41 +274,204 @@ class MemoryCache:
         Returns:
             Optional[Any]: 缓存值，如果不存在或已过期则返回 None
         """
+        entry = await self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    async def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        获取缓存值及其过期时间
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Tuple[Any, float]]: (缓存值, 过期时间)，如果不存在或已过期则返回 None
+        """
         if not self.enabled:
             return None
 
-        async with self._lock:
-            if key not in self._cache:
-                return None
+        cache_item = self._cache.get(key)
+        if cache_item is not None and time.time() > cache_item.expires_at:
+            self._remove_entry(key)
+            self.expirations += 1
+            cache_item = None
 
-            cache_item = self._cache[key]
-            if time.time() > cache_item["expires_at"]:
-                del self._cache[key]
-                return None
+        if cache_item is None:
+            self.misses += 1
+            return await self._read_through(key)
+
+        self._policy.touch(key)
+        self.hits += 1
+        return cache_item.value, cache_item.expires_at
+
+    async def _read_through(self, key: str) -> Optional[Tuple[Any, float]]:
+        """本地未命中时从二级缓存读取，并按剩余有效期回填本地缓存"""
+        if self._l2 is None:
+            return None
+
+        generation = self._generations[self._stripe(key)]
+        result = await self._l2.get(key)
+        if result is None:
+            return None
+
+        value, expires_at = result
+        value, tags = self._unwrap_l2(value)
+        # 读取期间同一分段有写入或删除时不回填，避免旧值覆盖新值或恢复已删除的键
+        if self._generations[self._stripe(key)] == generation:
+            self._store_local(key, value, expires_at, estimate_size(value), tags)
+        return value, expires_at
+
+    @staticmethod
+    def _wrap_l2(value: Any, tags: Tuple[str, ...]) -> Any:
+        """带标签的值写入二级缓存时连同标签一起保存"""
+        return _Tagged(value, tags) if tags else value
+
+    @staticmethod
+    def _unwrap_l2(value: Any) -> Tuple[Any, Tuple[str, ...]]:
+        """拆分二级缓存中保存的值和标签"""
+        if isinstance(value, _Tagged):
+            return value.value, value.tags
+        return value, ()
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        批量获取缓存值，本地未命中的键通过一次批量请求从二级缓存读取
+
+        Args:
+            keys: 缓存键序列
 
-            return cache_item["value"]
+        Returns:
+            Dict[str, Any]: 命中的键到缓存值的映射
+        """
+        if not self.enabled:
+            return {}
+
+        found = {}
+        missing = []
+        current_time = time.time()
+        for key in keys:
+            cache_item = self._cache.get(key)
+            if cache_item is not None and current_time > cache_item.expires_at:
+                self._remove_entry(key)
+                self.expirations += 1
+                cache_item = None
+
+            if cache_item is None:
+                self.misses += 1
+                missing.append(key)
+            else:
+                self._policy.touch(key)
+                self.hits += 1
+                found[key] = cache_item.value
+
+        if missing and self._l2 is not None:
+            generations = list(self._generations)
+            for key, (value, expires_at) in (await self._l2.get_many(missing)).items():
+                value, tags = self._unwrap_l2(value)
+                stripe = self._stripe(key)
+                if self._generations[stripe] == generations[stripe]:
+                    self._store_local(
+                        key, value, expires_at, estimate_size(value), tags
+                    )
+                found[key] = value
+        return found
+
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: Optional[int] = None,
+        tags: Iterable[str] = (),
+    ) -> None:
+        """
+        批量设置缓存值，二级缓存通过一次批量请求写入
+
+        Args:
+            items: 缓存键到缓存值的映射
+            ttl: 过期时间（秒），如果为 None 则使用默认值
+            tags: 所有缓存项共用的标签
+        """
+        if not self.enabled or not items:
+            return
 
-    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        tags = tuple(dict.fromkeys(tags))
+
+        expires_at = time.time() + (ttl or self.default_ttl)
+        # 按固定顺序获取涉及的分段锁，避免与其他批量写入互相等待
+        locks = sorted(
+            {id(lock): lock for lock in map(self._write_lock, items)}.items()
+        )
+        async with contextlib.AsyncExitStack() as stack:
+            for _, lock in locks:
+                await stack.enter_async_context(lock)
+            for key, value in items.items():
+                self._mark_written(key)
+                self._store_local(key, value, expires_at, estimate_size(value), tags)
+            if self._l2 is not None:
+                await self._l2.set_many(
+                    (key, self._wrap_l2(value, tags), expires_at)
+                    for key, value in items.items()
+                )
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Iterable[str] = (),
+    ) -> None:
         """
-        设置缓存值
+        设置缓存值，超出容量限制时按淘汰策略移除缓存项
 
         Args:
             key: 缓存键
             value: 缓存值
             ttl: 过期时间（秒），如果为 None 则使用默认值
+            tags: 缓存项标签，如 dataset:<版本>、tool:<工具名>，用于 invalidate_tag
         """
         if not self.enabled:
             return
 
         ttl = ttl or self.default_ttl
-        expires_at = time.time() + ttl
+        now = time.time()
+        size = estimate_size(value)
+        tags = tuple(dict.fromkeys(tags))
+
+        async with self._write_lock(key):
+            self._mark_written(key)
+            self._store_local(key, value, now + ttl, size, tags)
+            if self._l2 is not None:
+                await self._l2.set(key, self._wrap_l2(value, tags), now + ttl)
+
+    def _store_local(
+        self,
+        key: str,
+        value: Any,
+        expires_at: float,
+        size: int,
+        tags: Tuple[str, ...] = (),
+    ) -> None:
+        """写入本地缓存，不包含 await"""
+        self._remove_entry(key)
+
+        # 单个值超过内存上限时不缓存
+        if self.max_bytes and size > self.max_bytes:
+            return
 
-        async with self._lock:
-            self._cache[key] = {
-                "value": value,
-                "expires_at": expires_at,
-                "created_at": time.time(),
-            }
+        self._make_room(size)
+        self._cache[key] = _CacheEntry(
+            value=value,
+            expires_at=expires_at,
+            created_at=time.time(),
+            size=size,
+            tags=tags,
+        )
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        self._policy.add(key)
+        self._total_bytes += size
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+        if len(self._expiry_heap) > 2 * len(self._cache) + 1024:
+            self._rebuild_expiry_heap()
 
     async def delete(self, key: str) -> None:
         """
@@ -81,20 +483,61 @@ class MemoryCache:
         if not self.enabled:
             return
 
-        async with self._lock:
-            self._cache.pop(key, None)
+        async with self._write_lock(key):
+            self._mark_written(key)
+            self._remove_entry(key)
+            if self._l2 is not None:
+                await self._l2.delete(key)
+
+    async def invalidate_tag(self, tag: str) -> int:
+        """
+        删除带指定标签的所有缓存项，耗时只与带该标签的缓存项数量有关
+
+        二级缓存中的对应项不逐个删除：其他进程按标签写入的键同样带有版本等区分信息，
+        失效后不会再被读取，到期后由二级缓存自行清理。
+
+        Args:
+            tag: 标签
+
+        Returns:
+            int: 删除的缓存项数量
+        """
+        if not self.enabled:
+            return 0
+
+        keys = self._tags.pop(tag, None)
+        if not keys:
+            return 0
+
+        for key in keys:
+            self._mark_written(key)
+            self._remove_entry(key)
+        self.invalidations += len(keys)
+        return len(keys)
 
     async def clear(self) -> None:
         """清空所有缓存"""
         if not self.enabled:
             return
 
-        async with self._lock:
-            self._cache.clear()
+        self._generations = [generation + 1 for generation in self._generations]
+        self._cache.clear()
+        self._expiry_heap.clear()
+        self._tags.clear()
+        self._policy.clear()
+        self._total_bytes = 0
+        if self._l2 is not None:
+            await self._l2.clear()
 
-    async def cleanup_expired(self) -> int:
+    async def cleanup_expired(self, batch_size: int = 500) -> int:
         """
-        清理过期的缓存项
+        增量清理过期的缓存项
+
+        按过期时间从堆顶依次出堆，每批最多处理 batch_size 条记录后让出事件循环，
+        避免长时间阻塞其他会话。
+
+        Args:
+            batch_size: 每批最多处理的堆记录数
 
         Returns:
             int: 清理的项目数量
@@ -103,17 +546,134 @@ class MemoryCache:
             return 0
 
         current_time = time.time()
-        expired_keys = []
+        reclaimed = 0
+
+        while True:
+            processed = 0
+            while (
+                self._expiry_heap
+                and self._expiry_heap[0][0] < current_time
+                and processed < batch_size
+            ):
+                expires_at, key = heapq.heappop(self._expiry_heap)
+                processed += 1
+
+                entry = self._cache.get(key)
+                if entry is not None and entry.expires_at == expires_at:
+                    self._remove_entry(key)
+                    reclaimed += 1
+
+            has_more = self._expiry_heap and self._expiry_heap[0][0] < current_time
+
+            if not has_more:
+                break
+            await asyncio.sleep(0)
+
+        self.expirations += reclaimed
+        if self._l2 is not None:
+            await self._l2.cleanup_expired()
+        return reclaimed
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        beta: Optional[float] = None,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """
+        获取缓存值，未命中时计算并写入，带击穿保护
 
-        async with self._lock:
-            for key, cache_item in self._cache.items():
-                if current_time > cache_item["expires_at"]:
-                    expired_keys.append(key)
+        - 同一键同时只有一个计算在进行，其余调用方等待同一个结果
+        - 按 XFetch 算法在过期前以递增概率提前刷新：计算越慢、越接近过期越容易触发，
+          触发刷新的调用方等待新值，其余调用方继续拿到当前值
 
-            for key in expired_keys:
-                del self._cache[key]
+        Args:
+            key: 缓存键
+            compute: 计算函数，返回 None 时不写入缓存
+            ttl: 过期时间（秒），如果为 None 则使用默认值
+            beta: 提前刷新系数，越大越早刷新，0 表示关闭，如果为 None 则使用配置文件设置
+            tags: 缓存项标签
+
+        Returns:
+            Any: 缓存值或计算结果
+        """
+        if not self.enabled:
+            return await compute()
+
+        beta = self.xfetch_beta if beta is None else beta
+        entry = await self.get_entry(key)
+        if entry is not None and isinstance(entry[0], _Computed):
+            (value, delta), expires_at = entry
+            # XFetch: now - delta * beta * ln(rand) >= expires_at 时提前刷新
+            early = beta > 0 and (
+                time.time() - delta * beta * math.log(1.0 - random.random())
+                >= expires_at
+            )
+            if not early or key in self._inflight:
+                return value
+
+            self.early_refreshes += 1
+            try:
+                return await self._compute_once(key, compute, ttl, tags)
+            except Exception as e:
+                logger.warning(f"提前刷新缓存失败，继续使用当前值: {e}")
+                return value
+
+        if key in self._inflight:
+            self.coalesced += 1
+        return await self._compute_once(key, compute, ttl, tags)
+
+    async def _compute_once(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int],
+        tags: Iterable[str],
+    ) -> Any:
+        """合并同一键的并发计算，发起方被取消时计算继续为其他等待方完成"""
+        task = self._inflight.get(key)
+        if task is None:
+
+            async def run() -> Any:
+                start_time = time.perf_counter()
+                value = await compute()
+                if value is not None:
+                    delta = time.perf_counter() - start_time
+                    await self.set(key, _Computed(value, delta), ttl, tags)
+                return value
+
+            task = asyncio.ensure_future(run())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish_compute(key, done))
+
+        return await asyncio.shield(task)
+
+    def _finish_compute(self, key: str, task: asyncio.Future) -> None:
+        """计算结束后移出进行中列表"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 所有等待方都已取消时，避免异常未被读取的警告
+        if not task.cancelled():
+            task.exception()
+
+    async def close(self) -> None:
+        """释放二级缓存持有的连接"""
+        if self._l2 is not None:
+            await self._l2.close()
+
+    def memory_sources(self) -> Dict[str, Any]:
+        """
+        获取需要统计内存占用的内部结构，供后台内存统计使用
 
-        return len(expired_keys)
+        Returns:
+            Dict[str, Any]: index 为过期堆、标签反向索引和淘汰策略结构，entries 为缓存项
+        """
+        return {
+            "index": (self._expiry_heap, self._tags, self._policy),
+            "entries": self._cache,
+        }
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -125,41 +685,104 @@ class MemoryCache:
         if not self.enabled:
             return {"enabled": False}
 
+        lookups = self.hits + self.misses
         return {
             "enabled": True,
             "total_items": len(self._cache),
+            "total_bytes": self._total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "eviction_policy": self.eviction_policy,
             "default_ttl": self.default_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups * 100 if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+            "early_refreshes": self.early_refreshes,
+            "tags": len(self._tags),
+            "invalidations": self.invalidations,
+            "inflight": len(self._inflight),
+            "l2": self._l2.get_stats() if self._l2 is not None else None,
         }
 
 
+def create_l2_backend(namespace: str) -> Optional[CacheBackend]:
+    """
+    根据配置创建二级缓存
+
+    Args:
+        namespace: 键命名空间
+
+    Returns:
+        Optional[CacheBackend]: 二级缓存实例，未配置时返回 None
+    """
+    config = get_config()
+    backend = config.cache.l2_backend
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        return SQLiteCache(config.cache.l2_path, namespace=namespace)
+    if backend == "redis":
+        return RedisCache(
+            config.cache.redis_url,
+            namespace=namespace,
+            max_connections=config.cache.redis_max_connections,
+            timeout=config.cache.redis_timeout,
+            retry_interval=config.cache.redis_retry_interval,
+        )
+    raise ValueError(f"不支持的二级缓存类型: {backend}，可选值: none, sqlite, redis")
+
+
 # 全局缓存实例
-_cache = MemoryCache()
+_cache = MemoryCache(l2=create_l2_backend("default"))
 
 
-def cached(ttl: Optional[int] = None, key_prefix: str = ""):
+def cached(
+    ttl: Optional[int] = None,
+    key_prefix: str = "",
+    key_func: Optional[Callable[..., Any]] = None,
+    namespace: Optional[Callable[[], Optional[str]]] = None,
+    beta: Optional[float] = None,
+    tags: Iterable[str] = (),
+):
     """
     缓存装饰器
 
+    缓存键由前缀、函数限定名、可选命名空间和规范化参数的摘要组成，实例方法会跳过 self，
+    因此同一类的不同实例共享缓存项。并发未命中的调用只执行一次被装饰函数，
+    热点缓存项会在过期前由单个调用方提前刷新，详见 MemoryCache.get_or_compute。
+
     Args:
         ttl: 缓存过期时间（秒）
         key_prefix: 缓存键前缀
+        key_func: 自定义键函数，接收除 self/cls 外的原始参数
+        namespace: 返回命名空间的函数，如 dataset_version_namespace；返回 None 时不使用缓存，
+            命名空间同时作为缓存项的标签
+        beta: 提前刷新系数，0 表示关闭，如果为 None 则使用配置文件设置
+        tags: 额外的缓存项标签
     """
+    static_tags = tuple(tags)
 
     def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
-        async def wrapper(*args, **kwargs) -> Any:
-            # 生成缓存键
-            cache_key = f"{key_prefix}:{func.__name__}:{hash(str(args) + str(sorted(kwargs.items())))}"
+        key_builder = CacheKeyBuilder(func, key_prefix, key_func, namespace)
 
-            # 尝试从缓存获取
-            cached_result = await _cache.get(cache_key)
-            if cached_result is not None:
-                return cached_result
-
-            # 执行函数并缓存结果
-            result = await func(*args, **kwargs)
-            await _cache.set(cache_key, result, ttl)
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            entry_tags = static_tags
+            current_namespace = None
+            if namespace is not None:
+                current_namespace = namespace()
+                if current_namespace is None:
+                    return await func(*args, **kwargs)
+                entry_tags = static_tags + (current_namespace,)
 
-            return result
+            # 生成缓存键
+            cache_key = key_builder.build(args, kwargs, current_namespace)
+            return await _cache.get_or_compute(
+                cache_key, lambda: func(*args, **kwargs), ttl, beta, entry_tags
+            )
 
         return wrapper
 
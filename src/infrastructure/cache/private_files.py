@@ -0,0 +1,49 @@
+"""
+工作进程共享文件的权限检查
+
+二级缓存和指标汇总的 SQLite 文件由同一用户的多个工作进程共享。默认目录位于临时目录下，
+按用户区分并创建为仅当前用户可访问；文件以 0600 权限创建，不跟随符号链接，
+不属于当前用户的目录或文件会被拒绝，避免读取其他用户写入的数据。
+"""
+
+import os
+import stat
+from ...core.config import private_data_dir
+
+
+def prepare_private_file(path: str) -> None:
+    """
+    确保共享文件只能被当前用户访问，文件不存在时创建
+
+    默认目录不存在时以 0700 权限创建，自定义路径的目录需要事先存在
+
+    Args:
+        path: 文件路径
+
+    Raises:
+        PermissionError: 目录或文件不属于当前用户，或为符号链接
+        OSError: 无法创建目录或文件
+    """
+    # 非 POSIX 系统没有属主和权限位，依赖目录本身的访问控制
+    if not hasattr(os, "getuid"):
+        return
+    uid = os.getuid()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    if directory == os.path.abspath(private_data_dir()):
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        status = os.lstat(directory)
+        if not stat.S_ISDIR(status.st_mode) or status.st_uid != uid:
+            raise PermissionError(f"目录 {directory} 不属于当前用户，拒绝使用")
+        if stat.S_IMODE(status.st_mode) & 0o077:
+            os.chmod(directory, 0o700)
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+    try:
+        status = os.fstat(fd)
+        if status.st_uid != uid:
+            raise PermissionError(f"文件 {path} 不属于当前用户，拒绝使用")
+        if stat.S_IMODE(status.st_mode) & 0o077:
+            os.fchmod(fd, 0o600)
+    finally:
+        os.close(fd)
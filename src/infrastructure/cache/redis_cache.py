@@ -0,0 +1,508 @@
+"""
+Redis 协议二级缓存实现
+
+多台主机上的副本共享同一个 Redis 兼容服务（Redis、Valkey、KeyDB 等）。
+客户端直接实现 RESP2 协议，不依赖第三方库：
+- 连接池复用 TCP 连接，限制单个进程的并发连接数
+- 批量读写通过一次往返的 MGET / 管道化 SET 完成
+- 服务不可达时在重试间隔内直接跳过远程访问，仅使用本地缓存
+
+缓存值与 SQLite 二级缓存一样编码为 JSON（见 serialization），读取时不会执行代码；
+但服务中的数据会直接作为工具结果返回，只应连接由本服务独占、需要认证的可信实例。
+"""
+
+import time
+import asyncio
+import logging
+from urllib.parse import urlsplit
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from .backend import CacheBackend
+from . import serialization
+
+logger = logging.getLogger(__name__)
+
+
+class RedisError(Exception):
+    """服务端返回的错误响应"""
+
+
+class RedisUnavailableError(Exception):
+    """服务不可达，当前处于本地降级状态"""
+
+
+class RedisPoolTimeoutError(Exception):
+    """等待空闲连接超时"""
+
+
+def encode_command(*args: Any) -> bytes:
+    """
+    将命令编码为 RESP 数组
+
+    Args:
+        *args: 命令及参数
+
+    Returns:
+        bytes: 编码后的请求
+    """
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        else:
+            data = str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """
+    读取一个 RESP 响应
+
+    Args:
+        reader: 连接读取端
+
+    Returns:
+        Any: 解析后的响应，错误响应以 RedisError 实例返回而不是抛出，便于管道中继续读取
+    """
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("连接已关闭")
+
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b"+":
+        return payload.decode("utf-8")
+    if prefix == b"-":
+        return RedisError(payload.decode("utf-8"))
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"无法解析的响应: {line[:32]!r}")
+
+
+class RedisConnection:
+    """单个 RESP 连接"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def execute_many(self, commands: Sequence[Tuple[Any, ...]]) -> List[Any]:
+        """
+        以管道方式发送多条命令并按顺序读取响应
+
+        Args:
+            commands: 命令列表
+
+        Returns:
+            List[Any]: 与命令一一对应的响应
+        """
+        self.writer.write(b"".join(encode_command(*command) for command in commands))
+        await self.writer.drain()
+        return [await read_reply(self.reader) for _ in commands]
+
+    async def close(self) -> None:
+        """关闭连接"""
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except Exception:
+            pass
+
+
+class RedisConnectionPool:
+    """RESP 连接池"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        db: int = 0,
+        password: Optional[str] = None,
+        max_connections: int = 8,
+        timeout: float = 0.5,
+    ):
+        """
+        初始化连接池
+
+        Args:
+            host: 服务地址
+            port: 服务端口
+            db: 数据库编号
+            password: 认证密码
+            max_connections: 最大连接数
+            timeout: 建立连接和等待空闲连接的超时（秒）
+        """
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.max_connections = max(1, max_connections)
+        self.timeout = timeout
+        self._idle: List[RedisConnection] = []
+        self._in_use = 0
+        self._semaphore = asyncio.Semaphore(self.max_connections)
+        self.created = 0
+
+    async def _open(self) -> RedisConnection:
+        """建立新连接并完成认证和选库"""
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        connection = RedisConnection(reader, writer)
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            for reply in await connection.execute_many(setup):
+                if isinstance(reply, RedisError):
+                    await connection.close()
+                    raise reply
+        self.created += 1
+        return connection
+
+    async def acquire(self) -> RedisConnection:
+        """
+        获取连接，连接数达到上限时等待其他请求归还
+
+        Returns:
+            RedisConnection: 可用连接
+
+        Raises:
+            RedisPoolTimeoutError: 超时仍没有空闲连接
+        """
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise RedisPoolTimeoutError(
+                f"等待连接超时，连接池已满 ({self.max_connections})"
+            ) from None
+        try:
+            connection = self._idle.pop() if self._idle else await self._open()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        self._in_use += 1
+        return connection
+
+    async def release(self, connection: RedisConnection, broken: bool = False) -> None:
+        """
+        归还连接
+
+        Args:
+            connection: 连接
+            broken: 连接是否已不可用，不可用的连接直接关闭
+        """
+        self._in_use -= 1
+        self._semaphore.release()
+        if broken:
+            await connection.close()
+        else:
+            self._idle.append(connection)
+
+    async def close(self) -> None:
+        """关闭所有空闲连接"""
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await connection.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取连接池统计信息
+
+        Returns:
+            Dict[str, Any]: 连接池统计信息
+        """
+        return {
+            "max_connections": self.max_connections,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "created": self.created,
+        }
+
+
+class RedisCache(CacheBackend):
+    """基于 Redis 协议服务的共享缓存"""
+
+    name = "redis"
+
+    def __init__(
+        self,
+        url: str,
+        namespace: str = "default",
+        max_connections: int = 8,
+        timeout: float = 0.5,
+        retry_interval: float = 30.0,
+    ):
+        """
+        初始化 Redis 缓存
+
+        Args:
+            url: 服务地址，格式为 redis://[:password@]host[:port][/db]
+            namespace: 键命名空间，同一服务中的不同缓存互不影响
+            max_connections: 连接池最大连接数
+            timeout: 单次操作超时（秒）
+            retry_interval: 服务不可达后重新尝试连接的间隔（秒）
+        """
+        parsed = urlsplit(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"不支持的缓存服务地址: {url}，仅支持 redis://")
+
+        self.address = f"{parsed.hostname or 'localhost'}:{parsed.port or 6379}"
+        self.namespace = namespace
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self._pool = RedisConnectionPool(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(parsed.path.lstrip("/") or 0),
+            password=parsed.password,
+            max_connections=max_connections,
+            timeout=timeout,
+        )
+        self._unavailable_until = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.fallbacks = 0
+        self.pool_timeouts = 0
+
+    @property
+    def available(self) -> bool:
+        """服务当前是否被视为可用"""
+        return time.monotonic() >= self._unavailable_until
+
+    def _full_key(self, key: str) -> str:
+        """生成带命名空间的键"""
+        return f"{self.namespace}:{key}"
+
+    async def _execute(self, commands: Sequence[Tuple[Any, ...]]) -> List[Any]:
+        """
+        在一个连接上管道化执行命令
+
+        Args:
+            commands: 命令列表
+
+        Returns:
+            List[Any]: 响应列表
+
+        Raises:
+            RedisUnavailableError: 服务不可达或处于降级状态
+        """
+        if not self.available:
+            self.fallbacks += 1
+            raise RedisUnavailableError(self.address)
+
+        try:
+            connection = await self._pool.acquire()
+        except RedisPoolTimeoutError as e:
+            # 连接池繁忙不代表服务不可用，本次按未命中处理
+            self.pool_timeouts += 1
+            raise RedisUnavailableError(self.address) from e
+        except (OSError, asyncio.TimeoutError, RedisError) as e:
+            self._mark_unavailable(e)
+            raise RedisUnavailableError(self.address) from e
+
+        try:
+            replies = await asyncio.wait_for(
+                connection.execute_many(commands), self.timeout
+            )
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            # 超时或断开后连接中可能残留未读取的响应，不能再复用
+            await self._pool.release(connection, broken=True)
+            self._mark_unavailable(e)
+            raise RedisUnavailableError(self.address) from e
+        except BaseException:
+            await self._pool.release(connection, broken=True)
+            raise
+
+        await self._pool.release(connection)
+        return replies
+
+    def _mark_unavailable(self, error: BaseException) -> None:
+        """记录连接失败并进入本地降级状态"""
+        self.errors += 1
+        if self.available:
+            logger.warning(
+                f"缓存服务 {self.address} 不可用，{self.retry_interval} 秒内仅使用本地缓存: "
+                f"{error!r}"
+            )
+        self._unavailable_until = time.monotonic() + self.retry_interval
+
+    def _decode(self, payload: Optional[bytes]) -> Optional[Tuple[Any, float]]:
+        """反序列化缓存值，未命中或已过期时返回 None"""
+        if payload is None or isinstance(payload, RedisError):
+            self.misses += 1
+            return None
+        try:
+            value, expires_at = serialization.loads(payload)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"解析共享缓存数据失败: {e}")
+            return None
+        if expires_at < time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value, expires_at
+
+    def _set_command(self, key: str, value: Any, expires_at: float) -> Optional[tuple]:
+        """生成写入命令，已过期的值返回 None"""
+        ttl_ms = int((expires_at - time.time()) * 1000)
+        if ttl_ms <= 0:
+            return None
+        payload = serialization.dumps((value, expires_at))
+        return ("SET", self._full_key(key), payload, "PX", ttl_ms)
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        获取缓存值
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Tuple[Any, float]]: (缓存值, 过期时间)，不存在、已过期或读取失败时返回 None
+        """
+        try:
+            (payload,) = await self._execute([("GET", self._full_key(key))])
+        except RedisUnavailableError:
+            return None
+        return self._decode(payload)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Tuple[Any, float]]:
+        """
+        通过一次 MGET 批量获取缓存值
+
+        Args:
+            keys: 缓存键列表
+
+        Returns:
+            Dict[str, Tuple[Any, float]]: 命中的键到 (缓存值, 过期时间) 的映射
+        """
+        if not keys:
+            return {}
+        try:
+            (payloads,) = await self._execute(
+                [("MGET", *(self._full_key(key) for key in keys))]
+            )
+        except RedisUnavailableError:
+            return {}
+        if isinstance(payloads, RedisError):
+            self.errors += 1
+            logger.warning(f"批量读取共享缓存失败: {payloads}")
+            return {}
+
+        found = {}
+        for key, payload in zip(keys, payloads):
+            result = self._decode(payload)
+            if result is not None:
+                found[key] = result
+        return found
+
+    async def set(self, key: str, value: Any, expires_at: float) -> None:
+        """
+        写入缓存值，由服务端按剩余有效期自动过期
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            expires_at: 过期时间戳
+        """
+        await self.set_many([(key, value, expires_at)])
+
+    async def set_many(self, items: Iterable[Tuple[str, Any, float]]) -> None:
+        """
+        以管道方式批量写入缓存值
+
+        Args:
+            items: (缓存键, 缓存值, 过期时间戳) 序列
+        """
+        try:
+            commands = [self._set_command(*item) for item in items]
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"序列化共享缓存数据失败: {e}")
+            return
+        commands = [command for command in commands if command is not None]
+        if not commands:
+            return
+
+        try:
+            replies = await self._execute(commands)
+        except RedisUnavailableError:
+            return
+        failed = [reply for reply in replies if isinstance(reply, RedisError)]
+        if failed:
+            self.errors += len(failed)
+            logger.warning(f"写入共享缓存失败: {failed[0]}")
+
+    async def delete(self, key: str) -> None:
+        """
+        删除缓存值
+
+        Args:
+            key: 缓存键
+        """
+        try:
+            await self._execute([("DEL", self._full_key(key))])
+        except RedisUnavailableError:
+            pass
+
+    async def clear(self) -> None:
+        """通过 SCAN 增量删除当前命名空间下的所有缓存"""
+        pattern = self._full_key("*")
+        cursor = b"0"
+        try:
+            while True:
+                (reply,) = await self._execute(
+                    [("SCAN", cursor, "MATCH", pattern, "COUNT", 500)]
+                )
+                if isinstance(reply, RedisError):
+                    raise reply
+                cursor, keys = reply
+                if keys:
+                    await self._execute([("DEL", *keys)])
+                if cursor in (b"0", "0"):
+                    break
+        except RedisUnavailableError:
+            pass
+        except RedisError as e:
+            self.errors += 1
+            logger.warning(f"清空共享缓存失败: {e}")
+
+    async def close(self) -> None:
+        """关闭连接池中的空闲连接"""
+        await self._pool.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取共享缓存统计信息
+
+        Returns:
+            Dict[str, Any]: 共享缓存统计信息
+        """
+        return {
+            "backend": self.name,
+            "address": self.address,
+            "namespace": self.namespace,
+            "available": self.available,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "fallbacks": self.fallbacks,
+            "pool_timeouts": self.pool_timeouts,
+            "pool": self._pool.get_stats(),
+        }
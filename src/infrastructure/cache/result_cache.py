@@ -0,0 +1,138 @@
+"""
+工具结果缓存实现
+
+缓存只读、确定性工具的序列化结果，缓存键由工具名称、规范化后的参数和数据集版本组成，
+按估算内存占用做 LRU 淘汰。因请求截止时间返回的部分结果不会被缓存。
+"""
+
+import functools
+from typing import Any, Awaitable, Callable, Dict, Optional
+from ...core.config import get_config
+from ..dataset import get_dataset_state
+from ..deadline import is_partial
+from .memory_cache import MemoryCache, create_l2_backend
+from .keys import CacheKeyBuilder, dataset_tag, digest, tool_tag
+
+
+def normalize_terms(terms: Optional[Any]) -> Optional[Any]:
+    """
+    规范化食材/标签列表：转为小写并排序
+
+    Args:
+        terms: 原始列表
+
+    Returns:
+        规范化后的列表，非列表参数原样返回
+    """
+    if not isinstance(terms, (list, tuple)):
+        return terms
+    return sorted(str(term).lower() for term in terms)
+
+
+class ResultCache(MemoryCache):
+    """按估算内存占用限制容量的 LRU 结果缓存"""
+
+    def __init__(
+        self,
+        enabled: bool = None,
+        max_bytes: int = None,
+        default_ttl: int = None,
+    ):
+        """
+        初始化结果缓存
+
+        Args:
+            enabled: 是否启用缓存，如果为 None 则使用配置文件设置
+            max_bytes: 缓存结果的最大总字节数，如果为 None 则使用配置文件设置
+            default_ttl: 默认过期时间（秒），如果为 None 则使用配置文件设置
+        """
+        config = get_config()
+        super().__init__(
+            enabled=enabled,
+            default_ttl=default_ttl,
+            max_entries=0,
+            max_bytes=(
+                max_bytes
+                if max_bytes is not None
+                else config.cache.result_cache_max_bytes
+            ),
+            eviction_policy="lru",
+            l2=create_l2_backend("result"),
+        )
+
+    @staticmethod
+    def build_key(tool_name: str, arguments: Dict[str, Any], version: str) -> str:
+        """
+        生成缓存键
+
+        Args:
+            tool_name: 工具名称
+            arguments: 规范化后的参数
+            version: 数据集版本
+
+        Returns:
+            str: 缓存键
+        """
+        return f"{tool_name}:{version}:{digest(arguments)}"
+
+
+# 全局结果缓存实例
+_result_cache = ResultCache()
+
+
+def result_cached(
+    tool_name: str, normalizers: Optional[Dict[str, Callable[[Any], Any]]] = None
+):
+    """
+    工具结果缓存装饰器，仅用于只读且结果确定的方法
+
+    规范化只作用于缓存键，被装饰的方法收到调用方传入的原始参数，结果中回显的参数与请求一致。
+    规范化后相同的参数共享同一个缓存结果，因此只应合并不影响结果的差异（如大小写、顺序），
+    命中时回显的是首次计算时的参数。数据集尚未加载成功时不缓存，部分结果不缓存。
+
+    Args:
+        tool_name: 工具名称
+        normalizers: 参数名到规范化函数的映射，只用于生成缓存键
+    """
+    normalizers = normalizers or {}
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        key_builder = CacheKeyBuilder(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            bound = key_builder.bind(args, kwargs)
+            arguments = key_builder.key_arguments(bound)
+            for arg_name, normalize in normalizers.items():
+                if arg_name in arguments:
+                    arguments[arg_name] = normalize(arguments[arg_name])
+
+            # 尝试从缓存获取
+            version = get_dataset_state().version
+            if version is not None:
+                cached_result = await _result_cache.get(
+                    _result_cache.build_key(tool_name, arguments, version)
+                )
+                if cached_result is not None:
+                    return cached_result
+
+            # 执行方法并按执行后的数据集版本缓存结果
+            result = await func(*args, **kwargs)
+            version = get_dataset_state().version
+            if version is not None and result is not None and not is_partial():
+                await _result_cache.set(
+                    _result_cache.build_key(tool_name, arguments, version),
+                    result,
+                    tags=(dataset_tag(version), tool_tag(tool_name)),
+                )
+
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def get_result_cache() -> ResultCache:
+    """获取全局结果缓存实例"""
+    return _result_cache
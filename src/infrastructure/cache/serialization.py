@@ -0,0 +1,126 @@
+"""
+二级缓存值的序列化
+
+二级缓存的数据存放在共享文件或网络上的缓存服务中，可能被本服务以外的进程写入，
+因此不使用 pickle：值编码为 JSON，读取时只还原 JSON 基本类型、元组、字节串和
+通过 register_type 显式注册的 NamedTuple 或 pydantic 模型，解析数据不会执行任意代码。
+无法编码的值抛出 TypeError，由后端记录为写入失败，只保留在本地缓存中。
+"""
+
+import json
+import base64
+from typing import Any, Dict, TypeVar
+from pydantic import BaseModel
+
+# 标记非 JSON 基本类型的字段名
+TYPE_KEY = "__type__"
+
+T = TypeVar("T", bound=type)
+
+_types_by_name: Dict[str, type] = {}
+_names_by_type: Dict[type, str] = {}
+
+
+def register_type(cls: T, name: str) -> T:
+    """
+    注册可写入二级缓存的类型
+
+    Args:
+        cls: NamedTuple 或 pydantic 模型类
+        name: 序列化后的类型名，修改后旧的缓存项将无法读取
+
+    Returns:
+        原类型
+
+    Raises:
+        TypeError: 类型不是 NamedTuple 或 pydantic 模型
+        ValueError: 类型名已被其他类型使用
+    """
+    if not (issubclass(cls, BaseModel) or hasattr(cls, "_fields")):
+        raise TypeError(f"只能注册 NamedTuple 或 pydantic 模型: {cls!r}")
+    if _types_by_name.setdefault(name, cls) is not cls:
+        raise ValueError(f"缓存值类型名已被使用: {name}")
+    _names_by_type[cls] = name
+    return cls
+
+
+def _encode(value: Any) -> Any:
+    """转换为可 JSON 序列化的结构"""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    name = _names_by_type.get(type(value))
+    if name is not None:
+        if isinstance(value, BaseModel):
+            return {TYPE_KEY: name, "data": value.model_dump(mode="json")}
+        return {TYPE_KEY: name, "items": [_encode(item) for item in value]}
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, tuple):
+        return {TYPE_KEY: "tuple", "items": [_encode(item) for item in value]}
+    if isinstance(value, dict):
+        if TYPE_KEY not in value and all(isinstance(key, str) for key in value):
+            return {key: _encode(item) for key, item in value.items()}
+        return {
+            TYPE_KEY: "dict",
+            "items": [[_encode(key), _encode(item)] for key, item in value.items()],
+        }
+    if isinstance(value, bytes):
+        return {TYPE_KEY: "bytes", "data": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"无法序列化 {type(value).__name__} 类型的缓存值，请先注册该类型")
+
+
+def _decode(value: Any) -> Any:
+    """还原 _encode 生成的结构"""
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    name = value.get(TYPE_KEY)
+    if name is None:
+        return {key: _decode(item) for key, item in value.items()}
+    if name == "tuple":
+        return tuple(_decode(item) for item in value["items"])
+    if name == "dict":
+        return {_decode(key): _decode(item) for key, item in value["items"]}
+    if name == "bytes":
+        return base64.b64decode(value["data"])
+    cls = _types_by_name.get(name)
+    if cls is None:
+        raise ValueError(f"未注册的缓存值类型: {name}")
+    if issubclass(cls, BaseModel):
+        return cls.model_validate(value["data"])
+    return cls(*(_decode(item) for item in value["items"]))
+
+
+def dumps(value: Any) -> bytes:
+    """
+    序列化缓存值
+
+    Args:
+        value: 缓存值
+
+    Returns:
+        bytes: UTF-8 编码的 JSON
+
+    Raises:
+        TypeError: 值中包含未注册的类型
+    """
+    return json.dumps(_encode(value), ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+def loads(payload: bytes) -> Any:
+    """
+    反序列化缓存值
+
+    Args:
+        payload: dumps 生成的数据
+
+    Returns:
+        Any: 缓存值
+
+    Raises:
+        ValueError: 数据不是合法的 JSON 或包含未注册的类型
+    """
+    return _decode(json.loads(payload))
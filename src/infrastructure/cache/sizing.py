@@ -0,0 +1,126 @@
+"""
+对象内存占用估算
+
+数据集快照等大对象可以通过 register_size_hint 提供预先计算的大小，
+估算时直接使用而不再遍历其引用对象，缓存写入和回填不必每次遍历整个数据集。
+"""
+
+import sys
+import asyncio
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+_size_hints: Dict[type, Callable[[Any], int]] = {}
+
+
+def register_size_hint(cls: type, hint: Callable[[Any], int]) -> None:
+    """
+    为类型注册预先计算的占用大小
+
+    Args:
+        cls: 对象类型，不包括子类
+        hint: 返回对象估算字节数的函数，返回 0 表示未知，此时按引用对象逐个估算
+    """
+    _size_hints[cls] = hint
+
+
+def _hinted_size(obj: Any) -> int:
+    """返回对象预先计算的大小，没有时返回 0"""
+    hint = _size_hints.get(type(obj))
+    return hint(obj) if hint is not None else 0
+
+
+def _referents(obj: Any) -> Iterable[Any]:
+    """返回需要继续计算的直接引用对象"""
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return ()
+    if isinstance(obj, dict):
+        return [*obj.keys(), *obj.values()]
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return list(obj)
+
+    referents = []
+    obj_dict = getattr(obj, "__dict__", None)
+    if obj_dict is not None:
+        referents.append(obj_dict)
+    slots = getattr(type(obj), "__slots__", ())
+    if isinstance(slots, str):
+        slots = (slots,)
+    for slot in slots:
+        if slot != "__dict__" and hasattr(obj, slot):
+            referents.append(getattr(obj, slot))
+    return referents
+
+
+def estimate_size(value: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    递归估算对象及其引用对象占用的字节数
+
+    结果为近似值：同一对象只计算一次，不计入类型对象和模块等共享对象。
+
+    Args:
+        value: 需要估算的对象
+        seen: 已经计算过的对象 id 集合
+
+    Returns:
+        int: 估算的字节数
+    """
+    if seen is None:
+        seen = set()
+
+    size = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        obj_id = id(obj)
+        if obj_id in seen or isinstance(obj, type):
+            continue
+        seen.add(obj_id)
+        hinted = _hinted_size(obj)
+        if hinted:
+            size += hinted
+            continue
+        size += sys.getsizeof(obj)
+        stack.extend(_referents(obj))
+
+    return size
+
+
+async def estimate_size_async(
+    value: Any, seen: Optional[Set[int]] = None, batch_size: int = 5000
+) -> int:
+    """
+    与 estimate_size 相同，但每处理 batch_size 个对象让出一次事件循环，
+    用于在后台估算数据集等大对象而不阻塞请求
+
+    Args:
+        value: 需要估算的对象
+        seen: 已经计算过的对象 id 集合，多次调用共用时共享对象只计入第一次
+        batch_size: 每批处理的对象数量
+
+    Returns:
+        int: 估算的字节数
+    """
+    if seen is None:
+        seen = set()
+
+    size = 0
+    processed = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        obj_id = id(obj)
+        if obj_id in seen or isinstance(obj, type):
+            continue
+        seen.add(obj_id)
+        hinted = _hinted_size(obj)
+        if hinted:
+            size += hinted
+            continue
+        size += sys.getsizeof(obj)
+        stack.extend(_referents(obj))
+
+        processed += 1
+        if processed % batch_size == 0:
+            await asyncio.sleep(0)
+
+    return size
@@ -0,0 +1,286 @@
+"""
+SQLite 二级缓存实现
+
+同一主机上的多个工作进程共享一个 SQLite 文件，一个进程计算的结果可以直接被其他进程读取。
+缓存值编码为 JSON（见 serialization），文件只允许当前用户访问（见 private_files）。
+"""
+
+import time
+import sqlite3
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .backend import CacheBackend
+from .private_files import prepare_private_file
+from . import serialization
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteCache(CacheBackend):
+    """基于 SQLite 文件的共享缓存"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, namespace: str = "default"):
+        """
+        初始化 SQLite 缓存
+
+        Args:
+            path: SQLite 文件路径
+            namespace: 键命名空间，同一文件中的不同缓存互不影响
+        """
+        self.path = path
+        self.namespace = namespace
+        # 所有数据库操作在同一个线程中执行，避免阻塞事件循环
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"sqlite-cache-{namespace}"
+        )
+        self._connection: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.expirations = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """在工作线程中创建连接并初始化表结构"""
+        if self._connection is None:
+            prepare_private_file(self.path)
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _full_key(self, key: str) -> str:
+        """生成带命名空间的键"""
+        return f"{self.namespace}:{key}"
+
+    async def _run(self, func, *args) -> Any:
+        """在数据库线程中执行操作"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _get_sync(self, key: str) -> Optional[Tuple[bytes, float]]:
+        return (
+            self._connect()
+            .execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,))
+            .fetchone()
+        )
+
+    def _set_sync(self, key: str, payload: bytes, expires_at: float) -> None:
+        connection = self._connect()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, payload, expires_at),
+        )
+        connection.commit()
+
+    def _get_many_sync(self, keys: List[str]) -> List[Tuple[str, bytes, float]]:
+        placeholders = ",".join("?" * len(keys))
+        return (
+            self._connect()
+            .execute(
+                f"SELECT key, value, expires_at FROM cache WHERE key IN ({placeholders})",
+                keys,
+            )
+            .fetchall()
+        )
+
+    def _set_many_sync(self, rows: List[Tuple[str, bytes, float]]) -> None:
+        connection = self._connect()
+        connection.executemany(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            rows,
+        )
+        connection.commit()
+
+    def _close_sync(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _delete_sync(self, key: str) -> None:
+        connection = self._connect()
+        connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+        connection.commit()
+
+    def _clear_sync(self, prefix: str) -> None:
+        connection = self._connect()
+        connection.execute(
+            "DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        )
+        connection.commit()
+
+    def _cleanup_sync(self, prefix: str, now: float) -> int:
+        connection = self._connect()
+        cursor = connection.execute(
+            "DELETE FROM cache WHERE expires_at < ? AND substr(key, 1, ?) = ?",
+            (now, len(prefix), prefix),
+        )
+        connection.commit()
+        return cursor.rowcount
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        获取缓存值
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Tuple[Any, float]]: (缓存值, 过期时间)，不存在、已过期或读取失败时返回 None
+        """
+        try:
+            row = await self._run(self._get_sync, self._full_key(key))
+            if row is None or row[1] < time.time():
+                self.misses += 1
+                return None
+            value = serialization.loads(row[0])
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"读取二级缓存失败: {e}")
+            return None
+
+        self.hits += 1
+        return value, row[1]
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Tuple[Any, float]]:
+        """
+        通过一次查询批量获取缓存值
+
+        Args:
+            keys: 缓存键列表
+
+        Returns:
+            Dict[str, Tuple[Any, float]]: 命中的键到 (缓存值, 过期时间) 的映射
+        """
+        if not keys:
+            return {}
+        prefix_length = len(self._full_key(""))
+        try:
+            rows = await self._run(
+                self._get_many_sync, [self._full_key(key) for key in keys]
+            )
+            now = time.time()
+            found = {
+                key[prefix_length:]: (serialization.loads(payload), expires_at)
+                for key, payload, expires_at in rows
+                if expires_at >= now
+            }
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"批量读取二级缓存失败: {e}")
+            return {}
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def set_many(self, items: Iterable[Tuple[str, Any, float]]) -> None:
+        """
+        在一个事务中批量写入缓存值
+
+        Args:
+            items: (缓存键, 缓存值, 过期时间戳) 序列
+        """
+        try:
+            rows = [
+                (self._full_key(key), serialization.dumps(value), expires_at)
+                for key, value, expires_at in items
+            ]
+            if rows:
+                await self._run(self._set_many_sync, rows)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"批量写入二级缓存失败: {e}")
+
+    async def set(self, key: str, value: Any, expires_at: float) -> None:
+        """
+        写入缓存值
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            expires_at: 过期时间戳
+        """
+        try:
+            payload = serialization.dumps(value)
+            await self._run(self._set_sync, self._full_key(key), payload, expires_at)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"写入二级缓存失败: {e}")
+
+    async def delete(self, key: str) -> None:
+        """
+        删除缓存值
+
+        Args:
+            key: 缓存键
+        """
+        try:
+            await self._run(self._delete_sync, self._full_key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"删除二级缓存失败: {e}")
+
+    async def clear(self) -> None:
+        """清空当前命名空间下的所有缓存"""
+        try:
+            await self._run(self._clear_sync, self._full_key(""))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"清空二级缓存失败: {e}")
+
+    async def cleanup_expired(self) -> int:
+        """
+        删除所有已过期的缓存项
+
+        Returns:
+            int: 删除的项目数量
+        """
+        try:
+            removed = await self._run(
+                self._cleanup_sync, self._full_key(""), time.time()
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"清理二级缓存失败: {e}")
+            return 0
+
+        self.expirations += removed
+        return removed
+
+    async def close(self) -> None:
+        """关闭数据库连接，下次访问时重新打开"""
+        try:
+            await self._run(self._close_sync)
+        except Exception as e:
+            logger.warning(f"关闭二级缓存失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取二级缓存统计信息
+
+        Returns:
+            Dict[str, Any]: 二级缓存统计信息
+        """
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "expirations": self.expirations,
+        }
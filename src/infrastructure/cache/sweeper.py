@@ -0,0 +1,130 @@
+"""
+缓存过期清理后台任务
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+from ...core.config import get_config
+from .memory_cache import MemoryCache, get_cache
+from .result_cache import get_result_cache
+
+logger = logging.getLogger(__name__)
+
+
+class CacheSweeper:
+    """定期增量清理缓存中的过期项"""
+
+    def __init__(
+        self,
+        caches: Dict[str, MemoryCache],
+        interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+    ):
+        """
+        初始化清理任务
+
+        Args:
+            caches: 缓存名称到缓存实例的映射
+            interval: 清理周期（秒），如果为 None 则使用配置文件设置
+            batch_size: 每批处理的过期记录数，如果为 None 则使用配置文件设置
+        """
+        config = get_config()
+        self.caches = caches
+        self.interval = (
+            interval if interval is not None else config.cache.sweep_interval
+        )
+        self.batch_size = (
+            batch_size if batch_size is not None else config.cache.sweep_batch_size
+        )
+        self._task: Optional[asyncio.Task] = None
+
+        self.cycles = 0
+        self.total_reclaimed = 0
+        self.last_reclaimed: Dict[str, int] = {}
+        self.last_run_at: Optional[float] = None
+        self.last_duration = 0.0
+        self.recent_cycles: List[int] = []
+
+    @property
+    def running(self) -> bool:
+        """清理任务是否正在运行"""
+        return self._task is not None and not self._task.done()
+
+    async def run_once(self) -> Dict[str, int]:
+        """
+        执行一轮清理
+
+        Returns:
+            Dict[str, int]: 每个缓存本轮清理的项目数量
+        """
+        start_time = time.perf_counter()
+        reclaimed = {}
+        for name, cache in self.caches.items():
+            reclaimed[name] = await cache.cleanup_expired(self.batch_size)
+
+        total = sum(reclaimed.values())
+        self.cycles += 1
+        self.total_reclaimed += total
+        self.last_reclaimed = reclaimed
+        self.last_run_at = time.time()
+        self.last_duration = time.perf_counter() - start_time
+        self.recent_cycles = (self.recent_cycles + [total])[-10:]
+
+        if total:
+            logger.debug(f"缓存清理完成，回收 {total} 项: {reclaimed}")
+        return reclaimed
+
+    async def _run(self) -> None:
+        """后台循环"""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"缓存清理失败: {e}")
+
+    def start(self) -> None:
+        """启动后台清理任务"""
+        if self.running or self.interval <= 0:
+            return
+        self._task = asyncio.create_task(self._run(), name="cache-sweeper")
+
+    async def stop(self) -> None:
+        """停止后台清理任务"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取清理任务统计信息
+
+        Returns:
+            Dict[str, Any]: 清理任务统计信息
+        """
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "cycles": self.cycles,
+            "total_reclaimed": self.total_reclaimed,
+            "last_reclaimed": self.last_reclaimed,
+            "recent_cycles": self.recent_cycles,
+            "last_run_at": self.last_run_at,
+            "last_duration": self.last_duration,
+        }
+
+
+# 全局清理任务实例
+_sweeper = CacheSweeper({"default": get_cache(), "result": get_result_cache()})
+
+
+def get_sweeper() -> CacheSweeper:
+    """获取全局缓存清理任务实例"""
+    return _sweeper
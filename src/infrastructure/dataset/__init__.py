@@ -0,0 +1,7 @@
+"""
+数据集状态模块
+"""
+
+from .dataset_state import DatasetState, get_dataset_state
+
+__all__ = ["DatasetState", "get_dataset_state"]
@@ -0,0 +1,89 @@
+"""
+菜谱数据集状态跟踪
+"""
+
+import time
+import hashlib
+from typing import Any, Dict, Optional
+
+
+class DatasetState:
+    """记录当前已加载菜谱数据集的版本和加载情况"""
+
+    def __init__(self):
+        """初始化数据集状态"""
+        self.version: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self.recipe_count: int = 0
+        self.last_error: Optional[str] = None
+        # 最近一次成功加载的版本，加载失败后仍保留，用于刷新时失效旧版本的缓存
+        self._last_loaded_version: Optional[str] = None
+
+    @staticmethod
+    def compute_version(content: bytes) -> str:
+        """
+        根据原始数据内容计算数据集版本
+
+        Args:
+            content: 数据源返回的原始字节
+
+        Returns:
+            str: 内容摘要形式的版本号
+        """
+        return hashlib.sha256(content).hexdigest()[:12]
+
+    def mark_loaded(
+        self, version: str, recipe_count: int, loaded_at: Optional[float] = None
+    ) -> Optional[str]:
+        """
+        记录数据集加载成功
+
+        Args:
+            version: 数据集版本
+            recipe_count: 菜谱数量
+            loaded_at: 数据实际拉取时间，如果为 None 则使用当前时间
+
+        Returns:
+            Optional[str]: 被替换的上一个数据集版本，首次加载或版本未变化时返回 None
+        """
+        previous = self._last_loaded_version
+        self._last_loaded_version = version
+        self.version = version
+        self.loaded_at = loaded_at if loaded_at is not None else time.time()
+        self.recipe_count = recipe_count
+        self.last_error = None
+        return previous if previous != version else None
+
+    def mark_failed(self, error: str) -> None:
+        """
+        记录数据集加载失败，失败后不再有可用的数据集版本
+
+        Args:
+            error: 错误信息
+        """
+        self.version = None
+        self.last_error = error
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取数据集状态信息
+
+        Returns:
+            Dict[str, Any]: 数据集状态信息
+        """
+        return {
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "age_seconds": time.time() - self.loaded_at if self.loaded_at else None,
+            "recipe_count": self.recipe_count,
+            "last_error": self.last_error,
+        }
+
+
+# 全局数据集状态实例
+_dataset_state = DatasetState()
+
+
+def get_dataset_state() -> DatasetState:
+    """获取全局数据集状态实例"""
+    return _dataset_state
@@ -0,0 +1,23 @@
+"""
+请求截止时间模块
+"""
+
+from .deadline import (
+    Deadline,
+    DeadlineExceeded,
+    DeadlineScan,
+    check_deadline,
+    current_deadline,
+    deadline_scope,
+    is_partial,
+)
+
+__all__ = [
+    "Deadline",
+    "DeadlineExceeded",
+    "DeadlineScan",
+    "check_deadline",
+    "current_deadline",
+    "deadline_scope",
+    "is_partial",
+]
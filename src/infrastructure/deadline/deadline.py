@@ -0,0 +1,168 @@
+"""
+请求截止时间
+
+中间件为每个工具调用和资源读取设置截止时间，通过上下文变量传递到服务层。服务层的长时间
+遍历用 DeadlineScan 协作检查截止时间，到期时提前停止并返回带 partial 标记的部分结果；
+没有可返回的结果时抛出 DeadlineExceeded。部分结果会把当前请求标记为 partial，
+各级缓存据此跳过写入。
+
+协作检查比硬超时提前 timeout * RESERVE_RATIO 秒到期，为排序、序列化和返回部分结果
+留出时间，避免部分结果在返回途中被硬超时取消。
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+# 协作检查提前于硬超时的比例
+RESERVE_RATIO = 0.1
+# 协作检查的间隔（条目数）
+CHECK_INTERVAL = 32
+
+
+class DeadlineExceeded(TimeoutError):
+    """请求已到截止时间，且没有可返回的部分结果"""
+
+
+class Deadline:
+    """单个请求的截止时间"""
+
+    __slots__ = ("timeout", "expires_at", "soft_expires_at", "partial")
+
+    def __init__(self, timeout: float, now: Optional[float] = None):
+        """
+        初始化截止时间
+
+        Args:
+            timeout: 超时时间（秒）
+            now: 当前单调时钟时间，如果为 None 则使用 time.monotonic()
+        """
+        now = time.monotonic() if now is None else now
+        self.timeout = timeout
+        self.expires_at = now + timeout
+        self.soft_expires_at = self.expires_at - timeout * RESERVE_RATIO
+        # 是否已返回部分结果
+        self.partial = False
+
+    def remaining(self) -> float:
+        """距硬超时的剩余秒数"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """协作检查是否已到期"""
+        return time.monotonic() >= self.soft_expires_at
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar(
+    "howtocook_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """获取当前请求的截止时间，不在请求中时返回 None"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(timeout: float) -> Iterator[Deadline]:
+    """
+    在代码块内设置截止时间，嵌套时不会延长外层的截止时间
+
+    Args:
+        timeout: 超时时间（秒）
+
+    Yields:
+        Deadline: 代码块内生效的截止时间
+    """
+    deadline = Deadline(timeout)
+    outer = _current_deadline.get()
+    if outer is not None and outer.expires_at <= deadline.expires_at:
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def check_deadline() -> None:
+    """
+    检查当前请求是否已到截止时间
+
+    Raises:
+        DeadlineExceeded: 已到截止时间
+    """
+    deadline = _current_deadline.get()
+    if deadline is not None and deadline.expired():
+        raise DeadlineExceeded(f"请求超时（{deadline.timeout:g} 秒）")
+
+
+def is_partial() -> bool:
+    """当前请求是否返回了部分结果，部分结果不应写入缓存"""
+    deadline = _current_deadline.get()
+    return deadline is not None and deadline.partial
+
+
+class DeadlineScan:
+    """按截止时间协作遍历，到期时提前停止并把当前请求标记为部分结果"""
+
+    def __init__(
+        self, items: Sequence[Any], label: str = "菜谱", interval: int = CHECK_INTERVAL
+    ):
+        """
+        初始化遍历
+
+        Args:
+            items: 要遍历的条目
+            label: 条目名称，用于部分结果说明
+            interval: 每遍历多少个条目检查一次截止时间
+        """
+        self.items = items
+        self.label = label
+        self.interval = interval
+        self.scanned = 0
+        self.truncated = False
+
+    def __iter__(self) -> Iterator[Any]:
+        deadline = _current_deadline.get()
+        for index, item in enumerate(self.items):
+            if (
+                deadline is not None
+                and index % self.interval == 0
+                and deadline.expired()
+            ):
+                self.truncated = True
+                deadline.partial = True
+                return
+            self.scanned = index + 1
+            yield item
+
+    def annotate(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        遍历被截断时在结果中加入部分结果标记
+
+        Args:
+            result: 结果字典
+
+        Returns:
+            Dict[str, Any]: 原结果字典
+        """
+        if self.truncated:
+            result["partial"] = True
+            result["partial_reason"] = (
+                f"请求即将超时，仅检索了 {self.scanned}/{len(self.items)} 个{self.label}"
+            )
+        return result
+
+    def raise_if_truncated(self) -> None:
+        """
+        遍历被截断且没有结果时调用
+
+        Raises:
+            DeadlineExceeded: 遍历被截断
+        """
+        if self.truncated:
+            raise DeadlineExceeded(
+                f"请求超时，检索 {self.scanned}/{len(self.items)} 个{self.label}后未找到结果"
+            )
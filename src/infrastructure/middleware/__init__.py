@@ -1,11 +1,29 @@
 """
-中间件模块 - 使用 FastMCP 内置中间件
+中间件模块
 
-本模块保留用于将来可能的自定义中间件实现。
-目前使用 FastMCP 提供的内置中间件：
+除 FastMCP 提供的内置中间件外，本模块包含以下自定义中间件：
+- AdmissionControlMiddleware: 过载时按优先级拒绝开销大的请求，保证轻量查询
+- ClientRateLimitMiddleware: 按客户端令牌桶限速，按工具计费，并限制全局并发
+- DeadlineMiddleware: 设置请求截止时间，到期时取消仍在等待的请求
+- PayloadSizeMiddleware: 按工具统计响应字节数和结果条目数
+- ResponseCacheMiddleware: 在工具执行前返回允许列表中工具和资源的缓存响应
+
+内置中间件：
 - fastmcp.server.middleware.timing.TimingMiddleware
 - fastmcp.server.middleware.error_handling.ErrorHandlingMiddleware
 - fastmcp.server.middleware.logging.LoggingMiddleware
 """
 
-__all__ = []
+from .admission import AdmissionControlMiddleware
+from .deadline import DeadlineMiddleware
+from .payload_size import PayloadSizeMiddleware
+from .rate_limit import ClientRateLimitMiddleware
+from .response_cache import ResponseCacheMiddleware
+
+__all__ = [
+    "AdmissionControlMiddleware",
+    "ClientRateLimitMiddleware",
+    "DeadlineMiddleware",
+    "PayloadSizeMiddleware",
+    "ResponseCacheMiddleware",
+]
@@ -0,0 +1,72 @@
+"""
+过载保护中间件
+"""
+
+from typing import Any, Type
+from fastmcp.exceptions import ResourceError, ToolError
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from ..monitoring.admission import get_admission_controller
+
+# 拒绝原因的说明
+REASONS = {"loop_lag": "事件循环延迟过高", "in_flight": "进行中的请求过多"}
+
+
+class AdmissionControlMiddleware(Middleware):
+    """过载时按优先级拒绝工具调用和资源读取的中间件"""
+
+    async def _admit(
+        self,
+        context: MiddlewareContext,
+        call_next: CallNext,
+        name: str,
+        error_type: Type[Exception],
+    ) -> Any:
+        """放行请求并在完成后释放，被拒绝时立即返回错误"""
+        controller = get_admission_controller()
+        reason = controller.admit(name)
+        if reason is not None:
+            raise error_type(
+                f"服务繁忙（{REASONS.get(reason, reason)}），已暂停处理 {name}，请稍后重试"
+            )
+        try:
+            return await call_next(context)
+        finally:
+            controller.release()
+
+    async def on_call_tool(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """
+        按工具优先级决定是否执行工具调用
+
+        Args:
+            context: 中间件上下文
+            call_next: 下一个处理函数
+
+        Returns:
+            工具结果
+
+        Raises:
+            ToolError: 服务过载，请求被拒绝
+        """
+        return await self._admit(context, call_next, context.message.name, ToolError)
+
+    async def on_read_resource(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """
+        按资源优先级决定是否读取资源
+
+        Args:
+            context: 中间件上下文
+            call_next: 下一个处理函数
+
+        Returns:
+            资源内容列表
+
+        Raises:
+            ResourceError: 服务过载，请求被拒绝
+        """
+        return await self._admit(
+            context, call_next, str(context.message.uri), ResourceError
+        )
@@ -0,0 +1,115 @@
+"""
+请求截止时间中间件
+
+为每个工具调用和资源读取设置 request_timeout 秒的截止时间。服务层通过上下文变量协作检查，
+返回部分结果或抛出 DeadlineExceeded；仍在等待（如数据源请求挂起）的请求在截止时间被取消，
+以超时错误返回给客户端。数据集拉取由缓存层合并并屏蔽取消，会继续为其他请求完成。
+"""
+
+import asyncio
+from typing import Any, Dict, Optional, Type
+from fastmcp.exceptions import ResourceError, ToolError
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from ...core.config import get_config
+from ..deadline import DeadlineExceeded, deadline_scope
+
+
+class DeadlineMiddleware(Middleware):
+    """设置请求截止时间并在到期时取消请求的中间件"""
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        初始化中间件
+
+        Args:
+            timeout: 超时时间（秒），0 表示不限制，如果为 None 则使用配置值
+        """
+        self.timeout = (
+            get_config().performance.request_timeout if timeout is None else timeout
+        )
+        self.timeouts = 0
+        self.partial = 0
+
+    async def _run(
+        self,
+        context: MiddlewareContext,
+        call_next: CallNext,
+        name: str,
+        error_type: Type[Exception],
+    ) -> Any:
+        """在截止时间内执行请求"""
+        if self.timeout <= 0:
+            return await call_next(context)
+
+        with deadline_scope(self.timeout) as deadline:
+            scope = asyncio.timeout(deadline.remaining())
+            try:
+                async with scope:
+                    result = await call_next(context)
+            except TimeoutError:
+                if not scope.expired():
+                    raise
+                self.timeouts += 1
+                raise error_type(
+                    f"请求超时：{name} 未能在 {self.timeout:g} 秒内完成"
+                ) from None
+            except Exception as error:
+                if isinstance(error, DeadlineExceeded) or isinstance(
+                    error.__cause__, DeadlineExceeded
+                ):
+                    self.timeouts += 1
+                raise
+            if deadline.partial:
+                self.partial += 1
+            return result
+
+    async def on_call_tool(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """
+        在截止时间内调用工具
+
+        Args:
+            context: 中间件上下文
+            call_next: 下一个处理函数
+
+        Returns:
+            工具结果，可能带有部分结果标记
+
+        Raises:
+            ToolError: 工具未能在截止时间内完成
+        """
+        return await self._run(context, call_next, context.message.name, ToolError)
+
+    async def on_read_resource(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """
+        在截止时间内读取资源
+
+        Args:
+            context: 中间件上下文
+            call_next: 下一个处理函数
+
+        Returns:
+            资源内容列表
+
+        Raises:
+            ResourceError: 资源未能在截止时间内读取
+        """
+        return await self._run(
+            context, call_next, str(context.message.uri), ResourceError
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取截止时间统计信息
+
+        Returns:
+            Dict[str, Any]: 超时时间、超时次数和返回部分结果的次数
+        """
+        return {
+            "timeout": self.timeout,
+            "timeouts": self.timeouts,
+            "partial": self.partial,
+        }
@@ -0,0 +1,61 @@
+"""
+工具响应大小统计中间件
+"""
+
+import json
+from typing import Any
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from mcp.types import TextContent
+from ..monitoring.payload import count_items, get_payload_stats
+
+
+def encoded_size(result: Any) -> int:
+    """
+    估算工具结果编码后的字节数
+
+    文本内容按 UTF-8 字节数计算，其他内容块和结构化内容按 JSON 序列化后的长度计算。
+
+    Args:
+        result: 工具返回的 ToolResult
+
+    Returns:
+        int: 字节数
+    """
+    size = 0
+    for block in getattr(result, "content", None) or ():
+        if isinstance(block, TextContent):
+            size += len(block.text.encode("utf-8"))
+        else:
+            size += len(block.model_dump_json(exclude_none=True).encode("utf-8"))
+    structured = getattr(result, "structured_content", None)
+    if structured is not None:
+        size += len(json.dumps(structured, ensure_ascii=False).encode("utf-8"))
+    return size
+
+
+class PayloadSizeMiddleware(Middleware):
+    """记录每个工具的响应字节数和结果条目数"""
+
+    async def on_call_tool(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """
+        调用工具并记录响应大小，调用失败时不记录
+
+        Args:
+            context: 中间件上下文
+            call_next: 下一个处理函数
+
+        Returns:
+            工具结果
+        """
+        result = await call_next(context)
+
+        stats = get_payload_stats()
+        items = None
+        if stats.sample_items():
+            content = getattr(result, "content", None) or ()
+            if content and isinstance(content[0], TextContent):
+                items = count_items(content[0].text)
+        stats.record(context.message.name, encoded_size(result), items)
+        return result
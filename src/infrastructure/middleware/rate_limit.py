@@ -0,0 +1,234 @@
+"""
+按客户端限速和并发上限中间件
+
+每个客户端（认证后使用访问令牌中的 client_id，否则使用 MCP 会话 ID）有独立的令牌桶，
+一个客户端频繁调用只会耗尽自己的令牌，不影响其他会话。请求元数据中的 client_id 由客户端
+任意填写，每次更换即可得到满桶并挤占其他客户端的令牌桶，因此不作为限速依据。工具调用按工具消耗不同数量的令牌，
+推荐、膳食计划等开销大的工具比查询消耗更多；其他请求消耗 1 个令牌。
+
+工具调用和资源读取还受全局并发上限 max_concurrent_requests 约束，超出的请求排队等待。
+
+令牌桶的读写都在事件循环线程内完成且不包含 await，因此无需加锁。客户端数量超过上限时
+淘汰最久未使用的令牌桶，被淘汰的客户端再次请求时从满桶开始。
+"""
+
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from fastmcp.server.dependencies import get_access_token
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.server.middleware.rate_limiting import RateLimitError
+from ...core.config import get_config
+
+
+class TokenBucket:
+    """令牌桶"""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated_at")
+
+    def __init__(self, capacity: float, rate: float, now: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated_at = now
+
+    def consume(self, cost: float, now: float) -> float:
+        """
+        尝试消耗令牌，不包含 await
+
+        Args:
+            cost: 需要的令牌数
+            now: 当前单调时钟时间
+
+        Returns:
+            float: 0 表示已消耗；否则为令牌足够前还需等待的秒数，此时不消耗
+        """
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+def client_identifier(context: MiddlewareContext) -> str:
+    """
+    获取请求所属的客户端标识
+
+    Args:
+        context: 中间件上下文
+
+    Returns:
+        str: 认证的 client_id 或会话 ID，都无法获取时返回 "global"
+    """
+    access_token = get_access_token()
+    if access_token is not None and access_token.client_id:
+        return f"auth:{access_token.client_id}"
+    fastmcp_context = context.fastmcp_context
+    if fastmcp_context is None:
+        return "global"
+    try:
+        session_id = fastmcp_context.session_id
+    except (RuntimeError, AttributeError, LookupError, ValueError):
+        return "global"
+    return f"session:{session_id}" if session_id else "global"
+
+
+class ClientRateLimitMiddleware(Middleware):
+    """按客户端令牌桶限速并限制全局并发的中间件"""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        tool_costs: Optional[Dict[str, float]] = None,
+        max_concurrent: Optional[int] = None,
+        max_clients: int = 10000,
+    ):
+        """
+        初始化中间件，参数为 None 时使用配置值
+
+        Args:
+            rate: 每个客户端每秒补充的令牌数，0 表示不限速
+            burst: 令牌桶容量，至少为最大的工具令牌数
+            tool_costs: 工具名到每次调用消耗令牌数的映射
+            max_concurrent: 同时执行的工具调用和资源读取上限，0 表示不限制
+            max_clients: 保留令牌桶的客户端数量上限
+        """
+        config = get_config().performance
+        self.rate = config.rate_limit_per_second if rate is None else rate
+        self.tool_costs = (
+            config.rate_limit_tool_costs if tool_costs is None else tool_costs
+        )
+        self.burst = max(
+            config.rate_limit_burst if burst is None else burst,
+            max(self.tool_costs.values(), default=1.0),
+        )
+        self.max_concurrent = (
+            config.max_concurrent_requests if max_concurrent is None else max_concurrent
+        )
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._semaphore = (
+            asyncio.Semaphore(self.max_concurrent) if self.max_concurrent > 0 else None
+        )
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        # 只按已注册的工具名统计，其他名称计入 unknown
+        self.rejected_by_tool: Dict[str, int] = {}
+
+    def cost(self, context: MiddlewareContext) -> float:
+        """
+        计算请求消耗的令牌数
+
+        Args:
+            context: 中间件上下文
+
+        Returns:
+            float: 工具调用按工具取值，其他请求为 1
+        """
+        if context.method == "tools/call":
+            return self.tool_costs.get(context.message.name, 1.0)
+        return 1.0
+
+    async def _rejected_name(self, context: MiddlewareContext) -> str:
+        """被拒绝请求的统计名称，客户端发送的未注册工具名统一为 unknown"""
+        if context.method != "tools/call":
+            return context.method
+        name = context.message.name
+        fastmcp_context = context.fastmcp_context
+        if (
+            fastmcp_context is not None
+            and name in await fastmcp_context.fastmcp.get_tools()
+        ):
+            return name
+        return "unknown"
+
+    def _bucket(self, client: str, now: float) -> TokenBucket:
+        """获取客户端的令牌桶，超过客户端上限时淘汰最久未使用的"""
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.burst, self.rate, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        return bucket
+
+    async def on_request(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        """
+        按客户端扣除令牌，令牌不足时拒绝请求
+
+        Args:
+            context: 中间件上下文
+            call_next: 下一个处理函数
+
+        Returns:
+            请求结果
+
+        Raises:
+            RateLimitError: 客户端令牌不足
+        """
+        if self.rate > 0:
+            now = time.monotonic()
+            bucket = self._bucket(client_identifier(context), now)
+            retry_after = bucket.consume(self.cost(context), now)
+            if retry_after:
+                self.rejected += 1
+                name = await self._rejected_name(context)
+                self.rejected_by_tool[name] = self.rejected_by_tool.get(name, 0) + 1
+                raise RateLimitError(f"请求过于频繁，请在 {retry_after:.1f} 秒后重试")
+        return await call_next(context)
+
+    async def _limit_concurrency(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """在全局并发上限内执行请求"""
+        if self._semaphore is None:
+            return await call_next(context)
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            return await call_next(context)
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def on_call_tool(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """工具调用受全局并发上限约束"""
+        return await self._limit_concurrency(context, call_next)
+
+    async def on_read_resource(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """资源读取受全局并发上限约束"""
+        return await self._limit_concurrency(context, call_next)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取限速统计信息
+
+        Returns:
+            Dict[str, Any]: 配置、当前并发和排队数量、被拒绝的请求数
+        """
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "clients": len(self._buckets),
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "rejected_by_tool": dict(self.rejected_by_tool),
+        }
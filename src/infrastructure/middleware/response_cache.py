@@ -0,0 +1,199 @@
+"""
+响应缓存中间件
+
+对允许列表中结果确定的工具和资源，按 方法、工具名（或资源 URI）、规范化参数和数据集版本
+查找缓存，命中时直接返回，不再执行参数校验、工具函数和服务层逻辑。缓存项存放在工具结果
+缓存中，带有数据集版本和工具标签，数据集刷新后随旧版本一起失效。
+
+工具响应的每个文本内容块在 _meta 中带有缓存状态 {"howtocook/cache": "hit" | "miss"}；
+当前协议版本的资源内容没有元数据字段，资源的缓存状态只体现在统计计数中。
+"""
+
+from typing import Any, Dict, List, Optional
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.types import TextContent
+from ...core.config import get_config
+from ..cache import get_result_cache
+from ..cache.keys import dataset_tag, digest, tool_tag
+from ..cache.memory_cache import MemoryCache
+from ..dataset import get_dataset_state
+from ..deadline import is_partial
+
+# 内容块元数据中表示缓存状态的键
+CACHE_STATUS_KEY = "howtocook/cache"
+
+
+def _tool_result(value: Dict[str, Any], status: str) -> ToolResult:
+    """由缓存值构造带缓存状态的工具结果"""
+    return ToolResult(
+        content=[
+            TextContent(type="text", text=text, _meta={CACHE_STATUS_KEY: status})
+            for text in value["texts"]
+        ],
+        structured_content=value["structured_content"],
+    )
+
+
+def _cacheable_tool_value(result: Any) -> Optional[Dict[str, Any]]:
+    """提取可缓存的工具结果，包含非文本内容时返回 None"""
+    content = getattr(result, "content", None)
+    if not content or not all(isinstance(block, TextContent) for block in content):
+        return None
+    return {
+        "texts": [block.text for block in content],
+        "structured_content": result.structured_content,
+    }
+
+
+class ResponseCacheMiddleware(Middleware):
+    """在工具执行前返回缓存响应的中间件"""
+
+    def __init__(
+        self,
+        tools: Optional[List[str]] = None,
+        resources: Optional[List[str]] = None,
+        cache: Optional[MemoryCache] = None,
+    ):
+        """
+        初始化响应缓存中间件
+
+        Args:
+            tools: 允许缓存的工具名，如果为 None 则使用配置值
+            resources: 允许缓存的资源 URI，如果为 None 则使用配置值
+            cache: 存放响应的缓存，如果为 None 则使用全局工具结果缓存
+        """
+        config = get_config().cache
+        self.tools = frozenset(config.response_cache_tools if tools is None else tools)
+        self.resources = frozenset(
+            config.response_cache_resources if resources is None else resources
+        )
+        self._cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self) -> MemoryCache:
+        """存放响应的缓存"""
+        return self._cache if self._cache is not None else get_result_cache()
+
+    @staticmethod
+    def build_key(
+        method: str, name: str, arguments: Dict[str, Any], version: str
+    ) -> str:
+        """
+        生成缓存键
+
+        Args:
+            method: MCP 方法，如 tools/call、resources/read
+            name: 工具名或资源 URI
+            arguments: 调用参数
+            version: 数据集版本
+
+        Returns:
+            str: 缓存键
+        """
+        return f"response:{method}:{name}:{version}:{digest(arguments)}"
+
+    async def _lookup(self, method: str, name: str, arguments: Dict[str, Any]) -> Any:
+        """查找缓存，数据集尚未加载时不查找"""
+        version = get_dataset_state().version
+        if version is None:
+            return None
+        return await self.cache.get(self.build_key(method, name, arguments, version))
+
+    async def _store(
+        self, method: str, name: str, arguments: Dict[str, Any], value: Any
+    ) -> None:
+        """按执行后的数据集版本缓存响应，数据集加载失败或返回部分结果时不缓存"""
+        version = get_dataset_state().version
+        if version is None or is_partial():
+            return
+        await self.cache.set(
+            self.build_key(method, name, arguments, version),
+            value,
+            tags=(dataset_tag(version), tool_tag(name)),
+        )
+
+    async def on_call_tool(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """
+        调用允许列表中的工具时先查找缓存
+
+        Args:
+            context: 中间件上下文
+            call_next: 下一个处理函数
+
+        Returns:
+            工具结果，允许列表中的工具的文本内容块带有缓存状态
+        """
+        name = context.message.name
+        if name not in self.tools:
+            return await call_next(context)
+
+        arguments = context.message.arguments or {}
+        cached = await self._lookup("tools/call", name, arguments)
+        if cached is not None:
+            self.hits += 1
+            return _tool_result(cached, "hit")
+
+        self.misses += 1
+        result = await call_next(context)
+        value = _cacheable_tool_value(result)
+        if value is None:
+            return result
+        await self._store("tools/call", name, arguments, value)
+        return _tool_result(value, "miss")
+
+    async def on_read_resource(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """
+        读取允许列表中的资源时先查找缓存
+
+        Args:
+            context: 中间件上下文
+            call_next: 下一个处理函数
+
+        Returns:
+            资源内容列表
+        """
+        uri = str(context.message.uri)
+        if uri not in self.resources:
+            return await call_next(context)
+
+        cached = await self._lookup("resources/read", uri, {})
+        if cached is not None:
+            self.hits += 1
+            return [
+                ReadResourceContents(content=content, mime_type=mime_type)
+                for content, mime_type in cached
+            ]
+
+        self.misses += 1
+        contents = await call_next(context)
+        await self._store(
+            "resources/read",
+            uri,
+            {},
+            [(item.content, item.mime_type) for item in contents],
+        )
+        return contents
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取响应缓存统计信息
+
+        Returns:
+            Dict[str, Any]: 允许列表大小和命中、未命中次数
+        """
+        total = self.hits + self.misses
+        return {
+            "tools": len(self.tools),
+            "resources": len(self.resources),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total * 100 if total else 0.0,
+        }
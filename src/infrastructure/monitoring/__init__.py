@@ -3,6 +3,16 @@
 """
 
 from .health_checker import HealthChecker, get_health_checker
+from .histogram import LatencyHistogram
+from .loop_lag import LoopLagMonitor, get_loop_lag_monitor
+from .metrics_exporter import render_openmetrics
+from .tracing import Tracer, span, get_tracer
+from .profiler import Profiler, get_profiler
+from .memory import MemoryAccountant, get_memory_accountant
+from .slow_calls import SlowCallLog, get_slow_call_log
+from .aggregation import MetricsAggregator, get_aggregator
+from .payload import PayloadStats, get_payload_stats
+from .admission import AdmissionController, get_admission_controller
 from .performance_monitor import PerformanceMonitor, performance_tracked, get_monitor
 
 __all__ = [
@@ -11,4 +21,23 @@ __all__ = [
     "PerformanceMonitor",
     "performance_tracked",
     "get_monitor",
+    "LatencyHistogram",
+    "LoopLagMonitor",
+    "get_loop_lag_monitor",
+    "render_openmetrics",
+    "Tracer",
+    "span",
+    "get_tracer",
+    "Profiler",
+    "get_profiler",
+    "MemoryAccountant",
+    "get_memory_accountant",
+    "SlowCallLog",
+    "get_slow_call_log",
+    "MetricsAggregator",
+    "get_aggregator",
+    "PayloadStats",
+    "get_payload_stats",
+    "AdmissionController",
+    "get_admission_controller",
 ]
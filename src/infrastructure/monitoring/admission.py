@@ -0,0 +1,178 @@
+"""
+过载保护的准入控制
+
+根据事件循环延迟和进行中（含排队等待并发名额）的请求数判断负载等级：
+- 延迟达到阈值或进行中请求达到上限的一半时进入繁忙状态，拒绝低优先级请求；
+- 延迟达到阈值的两倍或进行中请求达到上限时进入过载状态，再拒绝普通优先级请求；
+- 高优先级的轻量查询始终放行。
+
+被拒绝的请求立即返回，不占用令牌、并发名额和事件循环时间，由客户端稍后重试。
+拒绝次数按优先级和原因统计：工具名和资源 URI 由客户端发送，数量不受限制，
+且资源 URI 中可能带有参数，不能作为统计键或指标标签。
+准入判断和计数都在事件循环线程内完成且不包含 await，因此无需加锁。
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from .loop_lag import get_loop_lag_monitor
+from ...core.config import get_config
+
+# 请求优先级
+PRIORITY_LOW = "low"
+PRIORITY_NORMAL = "normal"
+PRIORITY_HIGH = "high"
+
+# 负载等级：正常、繁忙（拒绝低优先级）、过载（再拒绝普通优先级）
+LEVEL_OK = 0
+LEVEL_BUSY = 1
+LEVEL_OVERLOADED = 2
+
+
+class AdmissionController:
+    """按负载等级和请求优先级决定是否放行请求"""
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        lag_threshold: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+        low_priority: Optional[List[str]] = None,
+        high_priority: Optional[List[str]] = None,
+    ):
+        """
+        初始化准入控制器，参数为 None 时使用配置值
+
+        Args:
+            enabled: 是否启用准入控制
+            lag_threshold: 拒绝低优先级请求的事件循环延迟（秒），0 表示不看延迟
+            max_in_flight: 拒绝普通优先级请求的进行中请求数，0 表示不看进行中请求数
+            low_priority: 低优先级的工具名或资源 URI
+            high_priority: 高优先级的工具名或资源 URI
+        """
+        config = get_config().performance
+        self.enabled = config.admission_control_enabled if enabled is None else enabled
+        self.lag_threshold = (
+            config.admission_lag_threshold if lag_threshold is None else lag_threshold
+        )
+        self.max_in_flight = (
+            config.admission_max_in_flight if max_in_flight is None else max_in_flight
+        )
+        self.low_priority = frozenset(
+            config.admission_low_priority if low_priority is None else low_priority
+        )
+        self.high_priority = frozenset(
+            config.admission_high_priority if high_priority is None else high_priority
+        )
+
+        self.in_flight = 0
+        self.max_in_flight_seen = 0
+        self.admitted = 0
+        # (优先级, 原因) -> 被拒绝次数
+        self.shed: Dict[Tuple[str, str], int] = {}
+
+    def priority(self, name: str) -> str:
+        """
+        获取工具或资源的优先级
+
+        Args:
+            name: 工具名或资源 URI
+
+        Returns:
+            str: low、normal 或 high
+        """
+        if name in self.high_priority:
+            return PRIORITY_HIGH
+        if name in self.low_priority:
+            return PRIORITY_LOW
+        return PRIORITY_NORMAL
+
+    def pressure(self) -> Tuple[int, Optional[str]]:
+        """
+        计算当前负载等级
+
+        Returns:
+            Tuple[int, Optional[str]]: 负载等级和触发原因（loop_lag 或 in_flight）
+        """
+        lag = get_loop_lag_monitor().last_lag
+        lag_level = LEVEL_OK
+        if self.lag_threshold > 0:
+            if lag >= self.lag_threshold * 2:
+                lag_level = LEVEL_OVERLOADED
+            elif lag >= self.lag_threshold:
+                lag_level = LEVEL_BUSY
+
+        in_flight_level = LEVEL_OK
+        if self.max_in_flight > 0:
+            if self.in_flight >= self.max_in_flight:
+                in_flight_level = LEVEL_OVERLOADED
+            elif self.in_flight >= self.max_in_flight / 2:
+                in_flight_level = LEVEL_BUSY
+
+        if lag_level == in_flight_level == LEVEL_OK:
+            return LEVEL_OK, None
+        if lag_level >= in_flight_level:
+            return lag_level, "loop_lag"
+        return in_flight_level, "in_flight"
+
+    def admit(self, name: str) -> Optional[str]:
+        """
+        判断是否放行请求，放行时计入进行中请求，完成后必须调用 release
+
+        Args:
+            name: 工具名或资源 URI
+
+        Returns:
+            Optional[str]: None 表示放行，否则为拒绝原因
+        """
+        if self.enabled:
+            priority = self.priority(name)
+            if priority != PRIORITY_HIGH:
+                level, reason = self.pressure()
+                if level == LEVEL_OVERLOADED or (
+                    level == LEVEL_BUSY and priority == PRIORITY_LOW
+                ):
+                    key = (priority, reason)
+                    self.shed[key] = self.shed.get(key, 0) + 1
+                    return reason
+
+        self.admitted += 1
+        self.in_flight += 1
+        self.max_in_flight_seen = max(self.max_in_flight_seen, self.in_flight)
+        return None
+
+    def release(self) -> None:
+        """放行的请求完成"""
+        self.in_flight -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取准入控制统计信息
+
+        Returns:
+            Dict[str, Any]: 当前负载等级、进行中请求数和按优先级、原因统计的拒绝次数
+        """
+        level, reason = self.pressure()
+        shed_by_priority: Dict[str, int] = {}
+        shed_by_reason: Dict[str, int] = {}
+        for (priority, shed_reason), count in self.shed.items():
+            shed_by_priority[priority] = shed_by_priority.get(priority, 0) + count
+            shed_by_reason[shed_reason] = shed_by_reason.get(shed_reason, 0) + count
+        return {
+            "enabled": self.enabled,
+            "level": level,
+            "reason": reason,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight_seen,
+            "admitted": self.admitted,
+            "shed": sum(self.shed.values()),
+            "shed_by_priority": shed_by_priority,
+            "shed_by_reason": shed_by_reason,
+        }
+
+
+# 全局准入控制器实例
+_admission_controller = AdmissionController()
+
+
+def get_admission_controller() -> AdmissionController:
+    """获取全局准入控制器实例"""
+    return _admission_controller
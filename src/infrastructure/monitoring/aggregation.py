@@ -0,0 +1,356 @@
+"""
+多工作进程的指标汇总
+
+MCP_WORKERS 大于 1 时，每个工作进程的性能监控器只统计自己处理的请求。后台任务定期把本进程
+的工具耗时直方图、失败次数和缓存计数作为快照写入同一主机上共享的 SQLite 文件，并读回
+其他进程最近的快照。健康检查和指标端点把本进程的实时数据与其他进程的快照按桶合并，
+得到主机级的数据，其他进程的部分最多滞后一个发布周期。
+
+超过三个周期未更新的快照视为进程已退出，不参与合并并从文件中删除；
+进程正常停止时删除自己的快照。共享文件与二级缓存一样只允许当前用户访问，
+不属于当前用户的文件会被拒绝，发布失败计入错误次数。
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from .histogram import LatencyHistogram
+from .performance_monitor import get_monitor
+from ..cache import get_cache, get_result_cache
+from ..cache.private_files import prepare_private_file
+from ...core.config import get_config
+
+logger = logging.getLogger(__name__)
+
+# 参与汇总的缓存统计字段
+CACHE_FIELDS = (
+    "hits",
+    "misses",
+    "evictions",
+    "expirations",
+    "total_items",
+    "total_bytes",
+)
+
+# 快照超过多少个发布周期未更新时视为过期
+STALE_INTERVALS = 3
+
+
+class MetricsAggregator:
+    """基于共享 SQLite 文件的跨进程指标汇总器"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        interval: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        worker_id: Optional[str] = None,
+    ):
+        """
+        初始化汇总器
+
+        Args:
+            path: 共享 SQLite 文件路径，如果为 None 则使用配置值
+            interval: 发布周期（秒），如果为 None 则使用配置值
+            enabled: 是否开启，如果为 None 则在 MCP_WORKERS 大于 1 且周期大于 0 时开启
+            worker_id: 本进程标识，如果为 None 则使用主机名和进程号
+        """
+        config = get_config()
+        self.path = path or config.monitoring.metrics_aggregation_path
+        self.interval = (
+            config.monitoring.metrics_aggregation_interval
+            if interval is None
+            else interval
+        )
+        if enabled is None:
+            enabled = config.server_config.workers > 1 and self.interval > 0
+        self.enabled = enabled
+        self._worker_id = worker_id
+        # 其他工作进程最近的快照：进程标识 -> (更新时间, 工具统计, 缓存统计)
+        self.peers: Dict[
+            str,
+            Tuple[float, Dict[str, Tuple[LatencyHistogram, int]], Dict[str, Dict]],
+        ] = {}
+        self.updated_at: Optional[float] = None
+        self.errors = 0
+        # 所有数据库操作在同一个线程中执行，避免阻塞事件循环
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="metrics-aggregation"
+        )
+        self._connection: Optional[sqlite3.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def worker_id(self) -> str:
+        """本进程标识，在调用时读取进程号，兼容 fork 出的工作进程"""
+        return self._worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
+    @property
+    def stale_after(self) -> float:
+        """快照过期时长（秒）"""
+        return self.interval * STALE_INTERVALS
+
+    def _connect(self) -> sqlite3.Connection:
+        """在工作线程中创建连接并初始化表结构"""
+        if self._connection is None:
+            prepare_private_file(self.path)
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS worker_metrics (worker TEXT PRIMARY KEY, "
+                "updated_at REAL NOT NULL, snapshot TEXT NOT NULL)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    async def _run_sync(self, func, *args) -> Any:
+        """在数据库线程中执行操作"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        生成本进程的指标快照，不包含 await
+
+        Returns:
+            Dict[str, Any]: 可 JSON 序列化的工具统计和缓存统计
+        """
+        tools = {
+            name: {"histogram": series.histogram.to_dict(), "failures": series.failures}
+            for name, series in get_monitor().metrics.items()
+        }
+        caches = {}
+        for cache_name, cache in (
+            ("default", get_cache()),
+            ("result", get_result_cache()),
+        ):
+            stats = cache.get_stats()
+            if stats.get("enabled"):
+                caches[cache_name] = {key: stats[key] for key in CACHE_FIELDS}
+        return {"tools": tools, "caches": caches}
+
+    def _exchange_sync(
+        self, worker: str, payload: str, now: float
+    ) -> List[Tuple[str, float, str]]:
+        """写入本进程快照、删除过期快照并读取其他进程的快照"""
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO worker_metrics (worker, updated_at, snapshot) "
+                "VALUES (?, ?, ?)",
+                (worker, now, payload),
+            )
+            connection.execute(
+                "DELETE FROM worker_metrics WHERE updated_at < ?",
+                (now - self.stale_after,),
+            )
+        return connection.execute(
+            "SELECT worker, updated_at, snapshot FROM worker_metrics WHERE worker != ?",
+            (worker,),
+        ).fetchall()
+
+    def _remove_sync(self, worker: str) -> None:
+        """删除本进程快照并关闭连接"""
+        if self._connection is None:
+            return
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM worker_metrics WHERE worker = ?", (worker,)
+            )
+        self._connection.close()
+        self._connection = None
+
+    async def refresh(self) -> int:
+        """
+        发布一次本进程快照并读取其他进程的快照
+
+        Returns:
+            int: 当前参与汇总的其他进程数量
+        """
+        payload = json.dumps(self.snapshot())
+        rows = await self._run_sync(
+            self._exchange_sync, self.worker_id, payload, time.time()
+        )
+
+        peers = {}
+        for worker, updated_at, raw in rows:
+            try:
+                data = json.loads(raw)
+                tools = {
+                    name: (
+                        LatencyHistogram.from_dict(tool["histogram"]),
+                        tool["failures"],
+                    )
+                    for name, tool in data["tools"].items()
+                }
+                peers[worker] = (updated_at, tools, data["caches"])
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"忽略无法解析的指标快照 {worker}: {e}")
+        self.peers = peers
+        self.updated_at = time.time()
+        return len(peers)
+
+    @property
+    def running(self) -> bool:
+        """后台任务是否在运行"""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """启动后台发布任务，未开启或已在运行时不做任何事"""
+        if not self.enabled or self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台发布任务并删除本进程的快照"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.peers = {}
+        try:
+            await self._run_sync(self._remove_sync, self.worker_id)
+        except Exception as e:
+            logger.warning(f"删除指标快照失败: {e}")
+
+    async def _run(self) -> None:
+        """周期性发布，首次发布在启动后立即进行"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"发布指标快照失败: {e}")
+            await asyncio.sleep(self.interval)
+
+    def _fresh_peers(self) -> List[Tuple]:
+        """未过期的其他进程快照"""
+        cutoff = time.time() - self.stale_after
+        return [peer for peer in self.peers.values() if peer[0] >= cutoff]
+
+    @property
+    def worker_count(self) -> int:
+        """参与汇总的工作进程数量，包括本进程"""
+        return 1 + len(self._fresh_peers())
+
+    def merged_tools(self) -> Dict[str, Tuple[LatencyHistogram, int]]:
+        """
+        合并本进程实时数据和其他进程快照中的工具统计
+
+        Returns:
+            Dict[str, Tuple[LatencyHistogram, int]]: 工具名到 (合并后的直方图, 失败次数)
+        """
+        merged = {
+            name: (series.histogram.copy(), series.failures)
+            for name, series in get_monitor().metrics.items()
+        }
+        for _, tools, _ in self._fresh_peers():
+            for name, (histogram, failures) in tools.items():
+                if name not in merged:
+                    merged[name] = (histogram.copy(), failures)
+                    continue
+                total, total_failures = merged[name]
+                try:
+                    total.merge(histogram)
+                except ValueError:
+                    continue
+                merged[name] = (total, total_failures + failures)
+        return merged
+
+    def merged_caches(self) -> Dict[str, Dict[str, int]]:
+        """
+        合并本进程和其他进程快照中的缓存统计
+
+        Returns:
+            Dict[str, Dict[str, int]]: 缓存名到各计数之和
+        """
+        merged: Dict[str, Dict[str, int]] = {}
+        local = {}
+        for cache_name, cache in (
+            ("default", get_cache()),
+            ("result", get_result_cache()),
+        ):
+            stats = cache.get_stats()
+            if stats.get("enabled"):
+                local[cache_name] = stats
+        for caches in [local] + [peer[2] for peer in self._fresh_peers()]:
+            for cache_name, stats in caches.items():
+                total = merged.setdefault(cache_name, dict.fromkeys(CACHE_FIELDS, 0))
+                for key in CACHE_FIELDS:
+                    total[key] += stats.get(key, 0)
+        return merged
+
+    def get_host_stats(self) -> Dict[str, Any]:
+        """
+        获取主机级汇总统计
+
+        Returns:
+            Dict[str, Any]: 工作进程数量、合并后的整体延迟、各工具统计和缓存统计
+        """
+        tools = self.merged_tools()
+        overall = LatencyHistogram()
+        detailed = {}
+        for name, (histogram, failures) in sorted(tools.items()):
+            overall.merge(histogram)
+            stats = histogram.get_stats()
+            detailed[name] = {
+                "count": histogram.count,
+                "success_rate": (
+                    (histogram.count - failures) / histogram.count * 100
+                    if histogram.count
+                    else 0.0
+                ),
+                "avg_duration": stats["avg"],
+                "p50_duration": stats["p50"],
+                "p95_duration": stats["p95"],
+                "p99_duration": stats["p99"],
+            }
+        return {
+            "workers": self.worker_count,
+            "total_requests": overall.count,
+            "latency": overall.get_stats(),
+            "detailed_stats": detailed,
+            "caches": self.merged_caches(),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取汇总器自身的状态
+
+        Returns:
+            Dict[str, Any]: 开关、本进程标识、其他进程快照的年龄和错误次数
+        """
+        now = time.time()
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "path": self.path,
+            "worker": self.worker_id,
+            "updated_at": self.updated_at,
+            "peers": {
+                worker: {"age": now - peer[0]}
+                for worker, peer in sorted(self.peers.items())
+            },
+            "errors": self.errors,
+        }
+
+
+# 全局指标汇总器实例
+_aggregator = MetricsAggregator()
+
+
+def get_aggregator() -> MetricsAggregator:
+    """获取全局指标汇总器实例"""
+    return _aggregator
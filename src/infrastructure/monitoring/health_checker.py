@@ -4,15 +4,26 @@
 
 import time
 import asyncio
-from typing import Dict, Any, TYPE_CHECKING
-from ...infrastructure.cache import get_cache
+from typing import Dict, Any, Optional, TYPE_CHECKING
+from ...infrastructure.cache import get_cache, get_result_cache, get_sweeper
+from ...infrastructure.dataset import get_dataset_state
 from ...core.config import get_config
 from .performance_monitor import get_monitor
+from .loop_lag import get_loop_lag_monitor
+from .tracing import get_tracer
+from .memory import get_memory_accountant
+from .slow_calls import get_slow_call_log
+from .aggregation import get_aggregator
+from .payload import get_payload_stats
+from .admission import get_admission_controller
 
 # 使用 TYPE_CHECKING 避免循环导入
 if TYPE_CHECKING:
     from ...domain.repositories import RecipeRepository
 
+# 后台加载连续失败时最小间隔的最大倍数
+MAX_WARMUP_BACKOFF = 32
+
 
 class HealthChecker:
     """健康检查器"""
@@ -21,6 +32,9 @@ class HealthChecker:
         """初始化健康检查器"""
         self.start_time = time.time()
         self._recipe_repo = None
+        self._warmup: Optional[asyncio.Future] = None
+        self._warmup_started_at: Optional[float] = None
+        self._warmup_failures = 0
 
     def _get_recipe_repo(self):
         """延迟导入 RecipeRepository 避免循环导入"""
@@ -30,6 +44,107 @@ class HealthChecker:
             self._recipe_repo = RecipeRepository()
         return self._recipe_repo
 
+    def check_liveness(self) -> Dict[str, Any]:
+        """
+        存活检查，只要事件循环能处理请求即为存活，不做任何 I/O
+
+        Returns:
+            Dict[str, Any]: 存活状态、运行时间和最近一次事件循环延迟
+        """
+        return {
+            "status": "alive",
+            "timestamp": time.time(),
+            "uptime_seconds": time.time() - self.start_time,
+            "loop_lag": get_loop_lag_monitor().last_lag,
+        }
+
+    def check_readiness(self) -> Dict[str, Any]:
+        """
+        就绪检查，只读取内存中已有的数据集和熔断状态，耗时与请求量和数据量无关
+
+        数据集尚未加载或已过期时返回未就绪，并在后台触发一次加载，检查本身不等待下载。
+        两次加载之间至少间隔 READINESS_WARMUP_INTERVAL 秒，连续失败时间隔逐次加倍，
+        上游故障期间负载均衡的频繁探测不会变成对上游的频繁下载。
+        二级缓存熔断打开时仍可使用本地缓存，只标记为降级。
+
+        Returns:
+            Dict[str, Any]: 就绪状态、未就绪原因、数据集状态和熔断状态
+        """
+        config = get_config()
+        dataset = get_dataset_state()
+        reasons = []
+
+        age = time.time() - dataset.loaded_at if dataset.loaded_at else None
+        max_age = config.monitoring.readiness_max_dataset_age
+        if dataset.version is None:
+            reasons.append(
+                f"数据集加载失败: {dataset.last_error}"
+                if dataset.last_error
+                else "数据集尚未加载"
+            )
+            self._schedule_warmup()
+        elif max_age > 0 and age is not None and age > max_age:
+            reasons.append(f"数据集已 {age:.0f} 秒未刷新")
+            self._schedule_warmup()
+
+        breakers = {}
+        caches = (("cache", get_cache()), ("result_cache", get_result_cache()))
+        for name, cache in caches:
+            l2 = cache.get_stats().get("l2")
+            if l2 and "available" in l2:
+                breakers[name] = "closed" if l2["available"] else "open"
+
+        if reasons:
+            status = "not_ready"
+        elif "open" in breakers.values():
+            status = "degraded"
+        else:
+            status = "ready"
+
+        return {
+            "status": status,
+            "ready": not reasons,
+            "timestamp": time.time(),
+            "reasons": reasons,
+            "dataset": {
+                "version": dataset.version,
+                "age_seconds": age,
+                "recipe_count": dataset.recipe_count,
+                "last_error": dataset.last_error,
+            },
+            "circuit_breakers": breakers,
+        }
+
+    def _schedule_warmup(self) -> None:
+        """在后台加载数据集，同一时间只有一个加载任务，距上次加载不足间隔时跳过"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._warmup is not None and not self._warmup.done():
+            return
+
+        now = time.monotonic()
+        if self._warmup_started_at is not None:
+            interval = get_config().monitoring.readiness_warmup_interval
+            backoff = min(2**self._warmup_failures, MAX_WARMUP_BACKOFF)
+            if now - self._warmup_started_at < interval * backoff:
+                return
+
+        self._warmup_started_at = now
+        self._warmup = asyncio.ensure_future(
+            self._get_recipe_repo().fetch_all_recipes()
+        )
+        self._warmup.add_done_callback(self._finish_warmup)
+
+    def _finish_warmup(self, future: asyncio.Future) -> None:
+        """记录后台加载是否成功，加载失败时仓库返回空列表并在数据集状态中记录错误"""
+        failed = future.cancelled() or future.exception() is not None
+        if failed or get_dataset_state().last_error is not None:
+            self._warmup_failures += 1
+        else:
+            self._warmup_failures = 0
+
     async def check_data_source(self) -> Dict[str, Any]:
         """
         检查数据源健康状态
@@ -80,6 +195,8 @@ class HealthChecker:
                 "status": "healthy" if cached_value == test_value else "unhealthy",
                 "enabled": cache_stats.get("enabled", False),
                 "total_items": cache_stats.get("total_items", 0),
+                "result_cache": get_result_cache().get_stats(),
+                "sweeper": get_sweeper().get_stats(),
                 "error": None,
             }
         except Exception as e:
@@ -109,9 +226,18 @@ class HealthChecker:
                 else 0
             )
 
+            aggregator = get_aggregator()
             return {
+                "worker": aggregator.worker_id,
+                "host": aggregator.get_host_stats() if aggregator.enabled else None,
                 "total_requests": total_requests,
                 "avg_success_rate": avg_success_rate,
+                "latency": await monitor.get_overall_latency(),
+                "loop_lag": get_loop_lag_monitor().get_stats(),
+                "tracing": get_tracer().get_stats(),
+                "slow_calls": get_slow_call_log().get_stats(),
+                "payload": get_payload_stats().get_stats(),
+                "admission": get_admission_controller().get_stats(),
                 "monitored_functions": list(stats.keys()),
                 "detailed_stats": stats,
             }
@@ -158,7 +284,8 @@ class HealthChecker:
 
     async def full_health_check(self) -> Dict[str, Any]:
         """
-        执行完整的健康检查
+        执行完整的健康检查，会实际读取数据源和往返缓存，只用于按需诊断，
+        负载均衡探活应使用 check_liveness / check_readiness
 
         Returns:
             Dict[str, Any]: 完整的健康检查结果
@@ -205,6 +332,7 @@ class HealthChecker:
             "performance": performance_summary
             if not isinstance(performance_summary, Exception)
             else {"error": str(performance_summary)},
+            "memory": get_memory_accountant().get_stats(),
         }
 
 
@@ -0,0 +1,370 @@
+"""
+固定内存的流式延迟直方图
+
+采用 DDSketch 的对数分桶方式：第 i 个桶覆盖 (min_value·γ^(i-1), min_value·γ^i]，
+其中 γ = (1 + α) / (1 - α)。任一分位数的估计值与真实值的相对误差不超过 α。
+
+桶数组在创建时按 [min_value, max_value] 一次性分配，之后记录任意多的样本都不再增长；
+同参数直方图的合并是逐桶相加，耗时只与固定的桶数有关，与样本数量无关。
+"""
+
+import math
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_PERCENTILES = (0.5, 0.95, 0.99)
+
+_log = math.log
+_ceil = math.ceil
+
+
+class LatencyHistogram:
+    """对数分桶的延迟直方图"""
+
+    __slots__ = (
+        "relative_accuracy",
+        "min_value",
+        "max_value",
+        "_gamma",
+        "_log_gamma",
+        "_log_min",
+        "_inv_log_gamma",
+        "_last_index",
+        "_counts",
+        "count",
+        "total",
+        "min",
+        "max",
+    )
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        min_value: float = 1e-6,
+        max_value: float = 3600.0,
+    ):
+        """
+        初始化直方图
+
+        Args:
+            relative_accuracy: 分位数估计的相对误差上限
+            min_value: 可区分的最小值（秒），更小的值计入第一个桶
+            max_value: 可区分的最大值（秒），更大的值计入最后一个桶
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy 必须在 0 和 1 之间")
+        if not 0 < min_value < max_value:
+            raise ValueError("必须满足 0 < min_value < max_value")
+
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._log_min = math.log(min_value)
+        self._inv_log_gamma = 1 / self._log_gamma
+        bucket_count = math.ceil(math.log(max_value / min_value) / self._log_gamma) + 1
+        self._last_index = bucket_count - 1
+        self._counts = array("q", bytes(8 * bucket_count))
+
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def bucket_count(self) -> int:
+        """桶数量"""
+        return len(self._counts)
+
+    def bucket_index(self, value: float) -> int:
+        """
+        计算样本所在的桶，同参数的多个直方图可共用一次计算结果
+
+        Args:
+            value: 样本值（秒）
+
+        Returns:
+            int: 桶下标
+        """
+        if value > self.min_value:
+            index = _ceil((_log(value) - self._log_min) * self._inv_log_gamma)
+            return index if index < self._last_index else self._last_index
+        return 0
+
+    def add(self, index: int, value: float) -> None:
+        """
+        按已计算的桶下标记录一个样本，只更新预分配的计数
+
+        Args:
+            index: bucket_index 返回的桶下标
+            value: 样本值（秒）
+        """
+        self._counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def record(self, value: float) -> None:
+        """
+        记录一个样本
+
+        Args:
+            value: 样本值（秒）
+        """
+        self.add(self.bucket_index(value), value)
+
+    def new_counts(self) -> array:
+        """
+        创建与本直方图分桶一致的空计数数组，供只需要计数的调用方预分配
+
+        Returns:
+            array: 全零计数数组
+        """
+        return array("q", bytes(8 * len(self._counts)))
+
+    def remap_indexes(self, target: "LatencyHistogram") -> array:
+        """
+        按桶代表值计算本直方图各桶在另一组分桶参数下的桶下标，
+        供只需要较低精度的调用方把已计算的桶下标转换到更粗的分桶
+
+        转换后的分位数相对误差约为两组参数的相对误差之和。
+
+        Args:
+            target: 目标分桶参数的直方图
+
+        Returns:
+            array: 以本直方图桶下标为索引的目标桶下标
+        """
+        return array(
+            "l",
+            (
+                target.bucket_index(self._representative(index))
+                for index in range(len(self._counts))
+            ),
+        )
+
+    def merge_counts(self, counts: array, count: int) -> None:
+        """
+        合并 new_counts 创建的计数数组，最值按首尾非空桶的代表值估计
+
+        Args:
+            counts: 计数数组
+            count: 数组中的样本总数
+        """
+        if not count:
+            return
+
+        first = last = -1
+        own = self._counts
+        for index, bucket in enumerate(counts):
+            if bucket:
+                own[index] += bucket
+                if first < 0:
+                    first = index
+                last = index
+        self.count += count
+        self.min = min(self.min, self._representative(first))
+        self.max = max(self.max, self._representative(last))
+
+    def _representative(self, index: int) -> float:
+        """桶区间内相对误差最小的代表值"""
+        if index == 0:
+            return self.min_value
+        return 2 * self.min_value * self._gamma**index / (self._gamma + 1)
+
+    def _bucket_value(self, index: int) -> float:
+        """桶代表值，并限制在已观测的最值范围内"""
+        return min(max(self._representative(index), self.min), self.max)
+
+    def quantile(self, q: float) -> float:
+        """
+        估计分位数
+
+        Args:
+            q: 分位点，取值 0-1
+
+        Returns:
+            float: 分位数估计值，没有样本时返回 0.0
+        """
+        return next(iter(self.percentiles((q,)).values()))
+
+    def percentiles(
+        self, quantiles: Iterable[float] = DEFAULT_PERCENTILES
+    ) -> Dict[str, float]:
+        """
+        一次遍历桶数组计算多个分位数
+
+        Args:
+            quantiles: 分位点列表，取值 0-1
+
+        Returns:
+            Dict[str, float]: 形如 {"p50": ..., "p99": ...} 的分位数，没有样本时均为 0.0
+        """
+        targets = sorted(quantiles)
+        result = {f"p{q * 100:g}": 0.0 for q in targets}
+        if self.count == 0:
+            return result
+
+        # 最小、最大分位数直接使用精确记录的最值
+        for q in targets:
+            if q <= 0:
+                result[f"p{q * 100:g}"] = self.min
+            elif q >= 1:
+                result[f"p{q * 100:g}"] = self.max
+        targets = [q for q in targets if 0 < q < 1]
+
+        cumulative = 0
+        position = 0
+        for index, bucket in enumerate(self._counts):
+            if not bucket:
+                continue
+            cumulative += bucket
+            while position < len(targets) and cumulative > targets[position] * (
+                self.count - 1
+            ):
+                result[f"p{targets[position] * 100:g}"] = self._bucket_value(index)
+                position += 1
+            if position == len(targets):
+                break
+        return result
+
+    def cumulative_counts(self, boundaries: Iterable[float]) -> List[int]:
+        """
+        一次遍历桶数组计算不超过各边界的样本数，供导出固定边界的直方图
+
+        边界所在的桶整体计入该边界，计数对应的边界值误差不超过 relative_accuracy。
+
+        Args:
+            boundaries: 升序排列的边界值（秒）
+
+        Returns:
+            List[int]: 与边界一一对应的累计样本数
+        """
+        result = []
+        counts = self._counts
+        cumulative = 0
+        index = 0
+        for boundary in boundaries:
+            last = self.bucket_index(boundary)
+            while index <= last:
+                cumulative += counts[index]
+                index += 1
+            result.append(cumulative)
+        return result
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        合并同参数的另一个直方图
+
+        Args:
+            other: 另一个直方图
+
+        Raises:
+            ValueError: 两个直方图的分桶参数不同
+        """
+        if (
+            other.relative_accuracy != self.relative_accuracy
+            or other.min_value != self.min_value
+            or len(other._counts) != len(self._counts)
+        ):
+            raise ValueError("只能合并分桶参数相同的直方图")
+
+        counts = self._counts
+        for index, bucket in enumerate(other._counts):
+            if bucket:
+                counts[index] += bucket
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def copy(self) -> "LatencyHistogram":
+        """
+        复制直方图
+
+        Returns:
+            LatencyHistogram: 内容相同的新直方图
+        """
+        clone = LatencyHistogram(self.relative_accuracy, self.min_value, self.max_value)
+        clone.merge(self)
+        return clone
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        导出为可 JSON 序列化的结构，只保存非空桶，供跨进程合并
+
+        Returns:
+            Dict[str, Any]: 分桶参数、非空桶的 [下标, 计数] 列表和汇总值
+        """
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "min_value": self.min_value,
+            "max_value": self.max_value,
+            "buckets": [
+                [index, bucket] for index, bucket in enumerate(self._counts) if bucket
+            ],
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        """
+        从 to_dict 导出的结构恢复直方图
+
+        Args:
+            data: to_dict 的返回值
+
+        Returns:
+            LatencyHistogram: 恢复的直方图
+
+        Raises:
+            ValueError: 分桶参数或桶下标不合法
+        """
+        histogram = cls(data["relative_accuracy"], data["min_value"], data["max_value"])
+        counts = histogram._counts
+        for index, bucket in data["buckets"]:
+            if not 0 <= index < len(counts):
+                raise ValueError(f"桶下标越界: {index}")
+            counts[index] = bucket
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        if data["count"]:
+            histogram.min = data["min"]
+            histogram.max = data["max"]
+        return histogram
+
+    def clear(self) -> None:
+        """清空所有样本"""
+        self._counts = array("q", bytes(8 * len(self._counts)))
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def get_stats(
+        self, quantiles: Optional[Iterable[float]] = None
+    ) -> Dict[str, float]:
+        """
+        获取直方图统计信息
+
+        Args:
+            quantiles: 分位点列表，如果为 None 则使用 p50/p95/p99
+
+        Returns:
+            Dict[str, float]: 样本数、均值、最值和分位数
+        """
+        stats = {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+        }
+        stats.update(self.percentiles(quantiles or DEFAULT_PERCENTILES))
+        return stats
@@ -0,0 +1,203 @@
+"""
+事件循环延迟监控
+
+后台任务按固定周期 sleep，实际唤醒时间与预期时间的差值即为事件循环被同步代码
+占用而无法及时调度的时长。延迟记录在固定内存的直方图中。
+
+阻塞期间事件循环上的任务都无法运行，因此由一个守护线程检查哨兵任务是否超过阈值仍未
+唤醒：一旦超时，线程读取事件循环线程当前的调用栈，并按栈中的 performance_tracked
+函数归属到具体工具。每次阻塞只采集一次调用栈。
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from .histogram import LatencyHistogram
+from .performance_monitor import find_tracked_name
+from ...core.config import get_config
+
+logger = logging.getLogger(__name__)
+
+# 每次阻塞采集的最内层栈帧数量
+STACK_LIMIT = 30
+
+
+class LoopLagMonitor:
+    """事件循环延迟监控器"""
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        threshold: Optional[float] = None,
+        recent_stalls: int = 20,
+    ):
+        """
+        初始化延迟监控器
+
+        Args:
+            interval: 采样周期（秒），如果为 None 则使用配置值，0 表示关闭
+            threshold: 采集阻塞调用栈的延迟阈值（秒），如果为 None 则使用配置值，0 表示不采集
+            recent_stalls: 保留的最近阻塞记录数量
+        """
+        config = get_config()
+        if interval is None:
+            interval = config.monitoring.loop_lag_interval
+        if threshold is None:
+            threshold = config.monitoring.loop_lag_threshold
+        self.interval = interval
+        self.threshold = threshold
+        self.histogram = LatencyHistogram()
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.stalls_by_tool: Dict[str, int] = {}
+        self.recent_stalls: Deque[Dict[str, Any]] = deque(maxlen=recent_stalls)
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        # 哨兵任务预期的唤醒时间，以及已采集过调用栈的唤醒时间
+        self._deadline: Optional[float] = None
+        self._captured_deadline: Optional[float] = None
+        self._pending_stall: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        """后台任务是否在运行"""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """启动后台采样任务和阻塞检测线程，周期为 0 或已在运行时不做任何事"""
+        if self.interval <= 0 or self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        if self.threshold > 0:
+            self._loop_thread_id = threading.get_ident()
+            self._stop_event.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-lag-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        """停止后台采样任务和阻塞检测线程"""
+        if self._watchdog is not None:
+            self._stop_event.set()
+            self._watchdog.join()
+            self._watchdog = None
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._deadline = None
+
+    def record(self, lag: float) -> None:
+        """
+        记录一次延迟样本
+
+        Args:
+            lag: 延迟时长（秒）
+        """
+        lag = max(lag, 0.0)
+        self.histogram.record(lag)
+        self.last_lag = lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+        # 阻塞结束后补上完整的延迟时长
+        stall = self._pending_stall
+        if stall is not None:
+            stall["lag"] = lag
+            self._pending_stall = None
+
+    async def _run(self) -> None:
+        """周期性测量唤醒延迟"""
+        while True:
+            expected = time.perf_counter() + self.interval
+            self._deadline = expected
+            await asyncio.sleep(self.interval)
+            self.record(time.perf_counter() - expected)
+
+    def _watch(self) -> None:
+        """守护线程：哨兵任务超过阈值仍未唤醒时采集事件循环线程的调用栈"""
+        check_interval = max(min(self.threshold / 2, self.interval), 0.005)
+        while not self._stop_event.wait(check_interval):
+            deadline = self._deadline
+            if deadline is None or deadline == self._captured_deadline:
+                continue
+            blocked_for = time.perf_counter() - deadline
+            if blocked_for >= self.threshold:
+                self._captured_deadline = deadline
+                self.capture_stall(blocked_for)
+
+    def capture_stall(self, blocked_for: float) -> Optional[Dict[str, Any]]:
+        """
+        采集事件循环线程当前的调用栈并记录一次阻塞
+
+        Args:
+            blocked_for: 采集时已阻塞的时长（秒）
+
+        Returns:
+            Optional[Dict[str, Any]]: 阻塞记录，无法获取事件循环线程的栈帧时返回 None
+        """
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        tool = find_tracked_name(frame) or "unknown"
+        stack: List[str] = [
+            f"{entry.filename}:{entry.lineno} in {entry.name}"
+            for entry in traceback.extract_stack(frame, limit=STACK_LIMIT)
+        ]
+        del frame
+
+        stall = {
+            "tool": tool,
+            "timestamp": time.time(),
+            "blocked_for": blocked_for,
+            "lag": None,
+            "stack": stack,
+        }
+        self.stalls += 1
+        self.stalls_by_tool[tool] = self.stalls_by_tool.get(tool, 0) + 1
+        self.recent_stalls.append(stall)
+        self._pending_stall = stall
+        logger.warning(
+            f"事件循环已被 {tool} 阻塞 {blocked_for * 1000:.0f}ms，位置: {stack[-1] if stack else '未知'}"
+        )
+        return stall
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取延迟统计信息
+
+        Returns:
+            Dict[str, Any]: 运行状态、最近一次和最大延迟、延迟分布以及阻塞记录
+        """
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "threshold": self.threshold,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            **self.histogram.get_stats(),
+            "stalls": self.stalls,
+            "stalls_by_tool": dict(self.stalls_by_tool),
+            "recent_stalls": list(self.recent_stalls),
+        }
+
+
+# 全局事件循环延迟监控器实例
+_loop_lag_monitor = LoopLagMonitor()
+
+
+def get_loop_lag_monitor() -> LoopLagMonitor:
+    """获取全局事件循环延迟监控器实例"""
+    return _loop_lag_monitor
@@ -0,0 +1,177 @@
+"""
+子系统内存统计
+
+后台任务周期性地估算各子系统对象图的深度内存占用，结果发布到健康检查和指标端点，
+请求路径上只读取上一次的统计结果。估算过程每处理一批对象让出一次事件循环。
+
+所有子系统共用一个已计算对象集合并按固定顺序估算：先估算通过 register 注册的
+来源（如数据集），再估算缓存索引、缓存项和监控指标。被多个子系统引用的对象
+只计入最先估算的子系统，例如缓存中的数据集快照计入 dataset 而不重复计入 cache。
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from ..cache import get_cache, get_result_cache
+from ..cache.sizing import estimate_size_async
+from .loop_lag import get_loop_lag_monitor
+from .performance_monitor import get_monitor
+from .slow_calls import get_slow_call_log
+from .payload import get_payload_stats
+from .tracing import get_tracer
+from ...core.config import get_config
+
+logger = logging.getLogger(__name__)
+
+
+def read_rss_bytes() -> Optional[int]:
+    """
+    读取当前进程的常驻内存
+
+    Returns:
+        Optional[int]: 常驻内存字节数，当前平台不支持时返回 None
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryAccountant:
+    """子系统内存统计器"""
+
+    def __init__(self, interval: Optional[float] = None, batch_size: int = 5000):
+        """
+        初始化内存统计器
+
+        Args:
+            interval: 统计周期（秒），如果为 None 则使用配置值，0 表示关闭
+            batch_size: 每处理多少个对象让出一次事件循环
+        """
+        if interval is None:
+            interval = get_config().monitoring.memory_accounting_interval
+        self.interval = interval
+        self.batch_size = batch_size
+        self.usage: Dict[str, int] = {}
+        self.rss_bytes: Optional[int] = None
+        self.updated_at: Optional[float] = None
+        self.duration = 0.0
+        self._sources: Dict[str, Callable[[], Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, source: Callable[[], Any]) -> None:
+        """
+        注册一个需要统计的子系统
+
+        Args:
+            name: 子系统名称
+            source: 返回该子系统根对象的函数，返回 None 时记为 0
+        """
+        self._sources[name] = source
+
+    def _builtin_sources(self) -> Tuple[Tuple[str, Any], ...]:
+        """内置子系统：各缓存的索引和缓存项，以及监控指标"""
+        cache = get_cache().memory_sources()
+        result_cache = get_result_cache().memory_sources()
+        loop_lag = get_loop_lag_monitor()
+        return (
+            ("cache_index", cache["index"]),
+            ("cache_entries", cache["entries"]),
+            ("result_cache_index", result_cache["index"]),
+            ("result_cache_entries", result_cache["entries"]),
+            (
+                "metrics",
+                (
+                    get_monitor().metrics,
+                    get_tracer().stages,
+                    loop_lag.histogram,
+                    loop_lag.recent_stalls,
+                    get_slow_call_log().entries,
+                    get_payload_stats().tools,
+                ),
+            ),
+        )
+
+    async def measure(self) -> Dict[str, int]:
+        """
+        估算一次所有子系统的内存占用
+
+        Returns:
+            Dict[str, int]: 子系统名称到估算字节数的映射
+        """
+        start = time.perf_counter()
+        seen = set()
+        usage = {}
+        sources = [(name, source()) for name, source in self._sources.items()]
+        sources.extend(self._builtin_sources())
+        for name, root in sources:
+            usage[name] = (
+                await estimate_size_async(root, seen, self.batch_size)
+                if root is not None
+                else 0
+            )
+
+        self.usage = usage
+        self.rss_bytes = read_rss_bytes()
+        self.updated_at = time.time()
+        self.duration = time.perf_counter() - start
+        return usage
+
+    @property
+    def running(self) -> bool:
+        """后台任务是否在运行"""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """启动后台统计任务，周期为 0 或已在运行时不做任何事"""
+        if self.interval <= 0 or self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台统计任务"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """周期性统计，首次统计在启动后立即进行"""
+        while True:
+            try:
+                await self.measure()
+            except Exception as e:
+                logger.warning(f"内存统计失败: {e}")
+            await asyncio.sleep(self.interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取最近一次的统计结果，不触发估算
+
+        Returns:
+            Dict[str, Any]: 各子系统估算字节数、合计、进程常驻内存和统计时间
+        """
+        return {
+            "running": self.running,
+            "updated_at": self.updated_at,
+            "duration": self.duration,
+            "subsystems": dict(self.usage),
+            "total_bytes": sum(self.usage.values()),
+            "rss_bytes": self.rss_bytes,
+        }
+
+
+# 全局内存统计器实例
+_memory_accountant = MemoryAccountant()
+
+
+def get_memory_accountant() -> MemoryAccountant:
+    """获取全局内存统计器实例"""
+    return _memory_accountant
@@ -0,0 +1,335 @@
+"""
+OpenMetrics 文本格式指标导出
+
+只在被抓取时读取各模块已有的统计信息并拼接文本，不在请求路径上增加任何记录操作。
+工具耗时直方图由固定内存的对数分桶直方图换算到固定的 le 边界，每个工具只遍历一次桶数组。
+多工作进程汇总开启时，工具和缓存指标为本进程与其他工作进程快照合并后的主机级数据。
+"""
+
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .histogram import LatencyHistogram
+from .loop_lag import get_loop_lag_monitor
+from .performance_monitor import get_monitor
+from .tracing import get_tracer
+from .memory import get_memory_accountant
+from .aggregation import get_aggregator
+from .payload import get_payload_stats
+from .admission import get_admission_controller
+from ..cache import get_cache, get_result_cache
+from ..dataset import get_dataset_state
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# 工具耗时直方图导出的桶边界（秒）
+DURATION_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# 工具响应字节数直方图导出的桶边界（字节）
+PAYLOAD_BUCKETS: Tuple[float, ...] = (
+    256,
+    1024,
+    4096,
+    16384,
+    65536,
+    262144,
+    1048576,
+    4194304,
+)
+
+# 分位数形式导出的摘要使用的分位点
+SUMMARY_QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+
+Labels = Dict[str, str]
+
+
+def _escape(value: Any) -> str:
+    """转义标签值中的反斜杠、双引号和换行"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Optional[Labels]) -> str:
+    """格式化标签集合，没有标签时返回空字符串"""
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+        + "}"
+    )
+
+
+def _format_value(value: float) -> str:
+    """格式化样本值，整数原样输出，浮点数保留完整精度"""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Family:
+    """一个指标族的元数据和样本"""
+
+    def __init__(self, name: str, metric_type: str, help_text: str, unit: str = ""):
+        self.name = name
+        self.metric_type = metric_type
+        self.help_text = help_text
+        self.unit = unit
+        self.samples: List[str] = []
+
+    def add(
+        self, value: float, labels: Optional[Labels] = None, suffix: str = ""
+    ) -> None:
+        """
+        添加一个样本
+
+        Args:
+            value: 样本值
+            labels: 标签
+            suffix: 样本名后缀，如 _total、_bucket
+        """
+        self.samples.append(
+            f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+        )
+
+    def render(self) -> List[str]:
+        """输出元数据行和样本行"""
+        lines = [
+            f"# TYPE {self.name} {self.metric_type}",
+            f"# HELP {self.name} {self.help_text}",
+        ]
+        if self.unit:
+            lines.append(f"# UNIT {self.name} {self.unit}")
+        return lines + self.samples
+
+
+def _add_histogram(
+    family: _Family,
+    histogram: LatencyHistogram,
+    labels: Labels,
+    boundaries: Iterable[float] = DURATION_BUCKETS,
+) -> None:
+    """按固定边界导出累计桶计数、总数和总和"""
+    boundaries = tuple(boundaries)
+    for boundary, count in zip(boundaries, histogram.cumulative_counts(boundaries)):
+        family.add(count, {**labels, "le": _format_value(boundary)}, "_bucket")
+    family.add(histogram.count, {**labels, "le": "+Inf"}, "_bucket")
+    family.add(histogram.count, labels, "_count")
+    family.add(histogram.total, labels, "_sum")
+
+
+def _tool_families() -> List[_Family]:
+    """工具耗时直方图和调用、失败计数，开启汇总时为主机级数据"""
+    duration = _Family(
+        "howtocook_tool_duration_seconds", "histogram", "工具调用耗时", "seconds"
+    )
+    calls = _Family("howtocook_tool_calls", "counter", "工具调用次数")
+    errors = _Family("howtocook_tool_errors", "counter", "工具调用失败次数")
+    workers = _Family("howtocook_workers", "gauge", "参与汇总的工作进程数量")
+
+    aggregator = get_aggregator()
+    if aggregator.enabled:
+        tools = aggregator.merged_tools()
+        workers.add(aggregator.worker_count)
+    else:
+        tools = {
+            name: (series.histogram, series.failures)
+            for name, series in get_monitor().metrics.items()
+        }
+        workers.add(1)
+
+    for name, (histogram, failures) in sorted(tools.items()):
+        labels = {"tool": name}
+        _add_histogram(duration, histogram, labels)
+        calls.add(histogram.count, labels, "_total")
+        errors.add(failures, labels, "_total")
+    return [duration, calls, errors, workers]
+
+
+def _stage_families() -> List[_Family]:
+    """开启追踪时各工具内部阶段的耗时直方图"""
+    duration = _Family(
+        "howtocook_stage_duration_seconds", "histogram", "工具内部阶段耗时", "seconds"
+    )
+    for path, histogram in sorted(get_tracer().stages.items()):
+        tool, _, stage = path.partition("/")
+        if stage:
+            _add_histogram(duration, histogram, {"tool": tool, "stage": stage})
+    return [duration]
+
+
+def _payload_families() -> List[_Family]:
+    """工具响应字节数直方图"""
+    size = _Family(
+        "howtocook_tool_response_bytes", "histogram", "工具响应编码后的字节数", "bytes"
+    )
+    for name, series in sorted(get_payload_stats().tools.items()):
+        _add_histogram(size, series.bytes, {"tool": name}, PAYLOAD_BUCKETS)
+    return [size]
+
+
+def _cache_families() -> List[_Family]:
+    """本地缓存和工具结果缓存的计数与容量，开启汇总时为主机级数据"""
+    counters = {
+        "hits": _Family("howtocook_cache_hits", "counter", "缓存命中次数"),
+        "misses": _Family("howtocook_cache_misses", "counter", "缓存未命中次数"),
+        "evictions": _Family(
+            "howtocook_cache_evictions", "counter", "因容量限制淘汰的缓存项数"
+        ),
+        "expirations": _Family(
+            "howtocook_cache_expirations", "counter", "过期删除的缓存项数"
+        ),
+    }
+    gauges = {
+        "total_items": _Family("howtocook_cache_entries", "gauge", "当前缓存项数"),
+        "total_bytes": _Family(
+            "howtocook_cache_size_bytes", "gauge", "当前缓存占用的估算字节数", "bytes"
+        ),
+    }
+
+    aggregator = get_aggregator()
+    if aggregator.enabled:
+        caches = aggregator.merged_caches()
+    else:
+        caches = {}
+        for cache_name, cache in (
+            ("default", get_cache()),
+            ("result", get_result_cache()),
+        ):
+            stats = cache.get_stats()
+            if stats.get("enabled"):
+                caches[cache_name] = stats
+
+    for cache_name, stats in caches.items():
+        labels = {"cache": cache_name}
+        for key, family in counters.items():
+            family.add(stats[key], labels, "_total")
+        for key, family in gauges.items():
+            family.add(stats[key], labels)
+    return list(counters.values()) + list(gauges.values())
+
+
+def _dataset_families() -> List[_Family]:
+    """数据集版本、数据年龄和菜谱数量，尚未加载时没有样本"""
+    state = get_dataset_state()
+    info = _Family("howtocook_dataset", "info", "当前加载的菜谱数据集版本")
+    age = _Family(
+        "howtocook_dataset_age_seconds", "gauge", "数据集距上次拉取的时长", "seconds"
+    )
+    recipes = _Family("howtocook_dataset_recipes", "gauge", "数据集中的菜谱数量")
+
+    if state.version is not None:
+        info.add(1, {"version": state.version}, "_info")
+    if state.loaded_at is not None:
+        age.add(time.time() - state.loaded_at)
+        recipes.add(state.recipe_count)
+    return [info, age, recipes]
+
+
+def _loop_lag_families() -> List[_Family]:
+    """事件循环延迟分位数、最大值和按工具统计的阻塞次数"""
+    monitor = get_loop_lag_monitor()
+    lag = _Family(
+        "howtocook_event_loop_lag_seconds", "summary", "事件循环调度延迟", "seconds"
+    )
+    max_lag = _Family(
+        "howtocook_event_loop_lag_max_seconds",
+        "gauge",
+        "观测到的最大事件循环调度延迟",
+        "seconds",
+    )
+    stalls = _Family(
+        "howtocook_event_loop_stalls",
+        "counter",
+        "事件循环阻塞超过阈值的次数，按阻塞时所在的工具统计",
+    )
+
+    histogram = monitor.histogram
+    percentiles = histogram.percentiles(SUMMARY_QUANTILES)
+    for q in SUMMARY_QUANTILES:
+        lag.add(percentiles[f"p{q * 100:g}"], {"quantile": _format_value(q)})
+    lag.add(histogram.count, None, "_count")
+    lag.add(histogram.total, None, "_sum")
+    max_lag.add(monitor.max_lag)
+    for tool, count in sorted(monitor.stalls_by_tool.items()):
+        stalls.add(count, {"tool": tool}, "_total")
+    return [lag, max_lag, stalls]
+
+
+def _memory_families() -> List[_Family]:
+    """后台统计的各子系统内存占用和进程常驻内存，尚未统计时没有样本"""
+    accountant = get_memory_accountant()
+    subsystems = _Family(
+        "howtocook_memory_bytes", "gauge", "各子系统估算的深度内存占用", "bytes"
+    )
+    rss = _Family(
+        "howtocook_process_resident_memory_bytes", "gauge", "进程常驻内存", "bytes"
+    )
+    for name, size in sorted(accountant.usage.items()):
+        subsystems.add(size, {"subsystem": name})
+    if accountant.rss_bytes is not None:
+        rss.add(accountant.rss_bytes)
+    return [subsystems, rss]
+
+
+def _admission_families() -> List[_Family]:
+    """准入控制的负载等级、进行中请求数和按优先级、原因统计的拒绝次数"""
+    controller = get_admission_controller()
+    level = _Family(
+        "howtocook_admission_level", "gauge", "负载等级：0 正常，1 繁忙，2 过载"
+    )
+    in_flight = _Family(
+        "howtocook_admission_in_flight", "gauge", "进行中（含排队）的工具调用和资源读取"
+    )
+    shed = _Family(
+        "howtocook_admission_shed",
+        "counter",
+        "过载时被拒绝的请求次数，按请求优先级统计",
+    )
+    level.add(controller.pressure()[0])
+    in_flight.add(controller.in_flight)
+    for (priority, reason), count in sorted(controller.shed.items()):
+        shed.add(count, {"priority": priority, "reason": reason}, "_total")
+    return [level, in_flight, shed]
+
+
+def render_openmetrics() -> str:
+    """
+    渲染所有指标
+
+    Returns:
+        str: OpenMetrics 文本格式的指标，以 # EOF 结尾
+    """
+    lines: List[str] = []
+    for family in (
+        _tool_families()
+        + _stage_families()
+        + _payload_families()
+        + _cache_families()
+        + _dataset_families()
+        + _loop_lag_families()
+        + _memory_families()
+        + _admission_families()
+    ):
+        lines.extend(family.render())
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,137 @@
+"""
+工具响应大小统计
+
+每个工具的响应字节数和结果条目数分别记录在固定内存的对数分桶直方图中。字节数在每次调用时
+记录；统计条目数需要解析返回的 JSON，开销与编码相当，因此只对按 item_sample_rate
+采样的调用进行。
+"""
+
+import json
+import random
+from typing import Any, Dict, List, Optional
+from .histogram import LatencyHistogram
+from ...core.config import get_config
+
+# 字节数、条目数直方图的可区分范围
+BYTES_RANGE = (1.0, 1e9)
+ITEMS_RANGE = (1.0, 1e6)
+
+
+def count_items(text: str) -> Optional[int]:
+    """
+    统计 JSON 结果中的条目数
+
+    顶层为数组时取数组长度；顶层为对象时取其中最长的数组字段长度，没有数组字段时记为 1。
+
+    Args:
+        text: 工具返回的文本
+
+    Returns:
+        Optional[int]: 条目数，文本不是 JSON 时返回 None
+    """
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(value, list):
+        return len(value)
+    if isinstance(value, dict):
+        return max(
+            (len(item) for item in value.values() if isinstance(item, list)),
+            default=1,
+        )
+    return 1
+
+
+class _PayloadSeries:
+    """单个工具的响应大小统计"""
+
+    __slots__ = ("bytes", "items")
+
+    def __init__(self):
+        self.bytes = LatencyHistogram(
+            min_value=BYTES_RANGE[0], max_value=BYTES_RANGE[1]
+        )
+        self.items = LatencyHistogram(
+            min_value=ITEMS_RANGE[0], max_value=ITEMS_RANGE[1]
+        )
+
+
+class PayloadStats:
+    """按工具统计的响应大小"""
+
+    def __init__(self, item_sample_rate: Optional[float] = None):
+        """
+        初始化响应大小统计
+
+        Args:
+            item_sample_rate: 统计条目数的采样比例，如果为 None 则使用配置值
+        """
+        if item_sample_rate is None:
+            item_sample_rate = get_config().monitoring.payload_item_sample_rate
+        self.item_sample_rate = item_sample_rate
+        self.tools: Dict[str, _PayloadSeries] = {}
+
+    def series(self, tool: str) -> _PayloadSeries:
+        """获取工具的统计，不存在时创建"""
+        series = self.tools.get(tool)
+        if series is None:
+            series = self.tools[tool] = _PayloadSeries()
+        return series
+
+    def sample_items(self) -> bool:
+        """本次调用是否统计条目数"""
+        return random.random() < self.item_sample_rate
+
+    def record(self, tool: str, size: int, items: Optional[int] = None) -> None:
+        """
+        记录一次响应，不包含 await
+
+        Args:
+            tool: 工具名
+            size: 编码后的响应字节数
+            items: 结果条目数，未采样时为 None
+        """
+        series = self.series(tool)
+        series.bytes.record(size)
+        if items is not None:
+            series.items.record(items)
+
+    def get_stats(self, top: int = 5) -> Dict[str, Any]:
+        """
+        获取响应大小统计
+
+        Args:
+            top: 返回的响应最大的工具数量
+
+        Returns:
+            Dict[str, Any]: 按 p95 字节数从大到小排列的工具统计
+        """
+        tools: List[Dict[str, Any]] = []
+        for name, series in self.tools.items():
+            sizes = series.bytes.get_stats()
+            items = series.items.get_stats()
+            tools.append(
+                {
+                    "tool": name,
+                    "count": series.bytes.count,
+                    "avg_bytes": sizes["avg"],
+                    "p95_bytes": sizes["p95"],
+                    "max_bytes": sizes["max"],
+                    "total_bytes": series.bytes.total,
+                    "avg_items": items["avg"],
+                    "p95_items": items["p95"],
+                    "max_items": items["max"],
+                }
+            )
+        tools.sort(key=lambda item: item["p95_bytes"], reverse=True)
+        return {"item_sample_rate": self.item_sample_rate, "largest": tools[:top]}
+
+
+# 全局响应大小统计实例
+_payload_stats = PayloadStats()
+
+
+def get_payload_stats() -> PayloadStats:
+    """获取全局响应大小统计实例"""
+    return _payload_stats
@@ -3,36 +3,112 @@
 """
 
 import time
-import asyncio
+import math
+import inspect
+import functools
+from types import CodeType, FrameType
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
-from collections import defaultdict, deque
-
-
-@dataclass
-class PerformanceMetric:
-    """性能指标数据类"""
-
-    name: str
-    duration: float
-    timestamp: float
-    success: bool
-    error_message: Optional[str] = None
+from collections import deque
+from .histogram import LatencyHistogram
+from .rolling import RollingMetrics, clock as rolling_clock
+from . import slow_calls, tracing
+
+
+class _MetricSeries:
+    """单个指标的累计统计，内存占用固定"""
+
+    __slots__ = (
+        "histogram",
+        "failures",
+        "recent_errors",
+        "windows",
+        "profiler",
+        "slow_threshold",
+        "slow_refresh_at",
+    )
+
+    def __init__(self, recent_errors: int):
+        self.histogram = LatencyHistogram()
+        self.failures = 0
+        self.recent_errors: deque = deque(maxlen=recent_errors)
+        self.windows = RollingMetrics()
+        # 按需性能分析器只在分析该指标时挂上
+        self.profiler = None
+        # 慢调用阈值及下次重新计算时的调用次数，由慢调用日志维护
+        self.slow_threshold = math.inf
+        self.slow_refresh_at = 0
+
+    def record(
+        self,
+        duration: float,
+        error_message: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> None:
+        """记录一次调用，不包含 await，只更新预分配的计数"""
+        index = self.histogram.bucket_index(duration)
+        self.histogram.add(index, duration)
+        failed = error_message is not None
+        self.windows.add(index, failed, rolling_clock() if now is None else now)
+        if failed:
+            self.failures += 1
+            if error_message:
+                self.recent_errors.append(error_message)
+
+    def clear(self) -> None:
+        """原地清空，已持有该对象的调用方继续有效"""
+        self.histogram.clear()
+        self.failures = 0
+        self.recent_errors.clear()
+        self.windows = RollingMetrics()
+        self.slow_threshold = math.inf
+        self.slow_refresh_at = 0
 
 
 class PerformanceMonitor:
     """性能监控器"""
 
-    def __init__(self, max_history: int = 1000):
+    def __init__(self, recent_errors: int = 10):
         """
         初始化性能监控器
 
+        每个指标的耗时记录在固定内存的对数分桶直方图中，统计时直接读取分桶，
+        不再保留和复制每次调用的历史记录。所有读写都在事件循环线程内完成且不包含 await，
+        因此无需加锁。
+
         Args:
-            max_history: 保留的历史记录最大数量
+            recent_errors: 每个指标保留的最近错误信息数量
         """
-        self.max_history = max_history
-        self.metrics: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_history))
-        self._lock = asyncio.Lock()
+        self.recent_errors = recent_errors
+        self.metrics: Dict[str, _MetricSeries] = {}
+
+    def series(self, name: str) -> _MetricSeries:
+        """获取指标统计，不存在时创建；装饰器持有返回的对象以跳过每次调用的查找"""
+        series = self.metrics.get(name)
+        if series is None:
+            series = self.metrics[name] = _MetricSeries(self.recent_errors)
+        return series
+
+    def record(
+        self,
+        name: str,
+        duration: float,
+        success: bool = True,
+        error_message: Optional[str] = None,
+    ) -> None:
+        """
+        同步记录性能指标
+
+        Args:
+            name: 指标名称
+            duration: 执行时间（秒）
+            success: 是否成功
+            error_message: 错误信息（如果有）
+        """
+        if success:
+            error_message = None
+        elif error_message is None:
+            error_message = ""
+        self.series(name).record(duration, error_message)
 
     async def record_metric(
         self,
@@ -42,7 +118,7 @@ class PerformanceMonitor:
         error_message: Optional[str] = None,
     ):
         """
-        记录性能指标
+        记录性能指标，保留给异步调用方，等价于 record
 
         Args:
             name: 指标名称
@@ -50,16 +126,7 @@ class PerformanceMonitor:
             success: 是否成功
             error_message: 错误信息（如果有）
         """
-        metric = PerformanceMetric(
-            name=name,
-            duration=duration,
-            timestamp=time.time(),
-            success=success,
-            error_message=error_message,
-        )
-
-        async with self._lock:
-            self.metrics[name].append(metric)
+        self.record(name, duration, success, error_message)
 
     async def get_stats(self, name: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -71,27 +138,39 @@ class PerformanceMonitor:
         Returns:
             Dict[str, Any]: 统计信息
         """
-        async with self._lock:
-            if name:
-                return self._calculate_stats(name, self.metrics[name])
-            else:
-                return {
-                    metric_name: self._calculate_stats(metric_name, metrics)
-                    for metric_name, metrics in self.metrics.items()
-                }
+        if name:
+            return self._calculate_stats(name, self.metrics.get(name))
+        return {
+            metric_name: self._calculate_stats(metric_name, series)
+            for metric_name, series in self.metrics.items()
+        }
+
+    async def get_overall_latency(self) -> Dict[str, float]:
+        """
+        合并所有指标的直方图，获取整体延迟分布
 
-    def _calculate_stats(self, name: str, metrics: deque) -> Dict[str, Any]:
+        Returns:
+            Dict[str, float]: 整体样本数、均值、最值和 p50/p95/p99
+        """
+        overall = LatencyHistogram()
+        for series in self.metrics.values():
+            overall.merge(series.histogram)
+        return overall.get_stats()
+
+    def _calculate_stats(
+        self, name: str, series: Optional[_MetricSeries]
+    ) -> Dict[str, Any]:
         """
         计算单个指标的统计信息
 
         Args:
             name: 指标名称
-            metrics: 指标数据队列
+            series: 指标累计统计
 
         Returns:
             Dict[str, Any]: 统计信息
         """
-        if not metrics:
+        if series is None or series.histogram.count == 0:
             return {
                 "name": name,
                 "count": 0,
@@ -99,23 +178,26 @@ class PerformanceMonitor:
                 "avg_duration": 0.0,
                 "min_duration": 0.0,
                 "max_duration": 0.0,
+                "p50_duration": 0.0,
+                "p95_duration": 0.0,
+                "p99_duration": 0.0,
+                "windows": series.windows.get_stats() if series is not None else {},
             }
 
-        durations = [m.duration for m in metrics]
-        successes = [m.success for m in metrics]
-
+        histogram = series.histogram
+        latency = histogram.get_stats()
         return {
             "name": name,
-            "count": len(metrics),
-            "success_rate": sum(successes) / len(successes) * 100,
-            "avg_duration": sum(durations) / len(durations),
-            "min_duration": min(durations),
-            "max_duration": max(durations),
-            "recent_errors": [
-                m.error_message
-                for m in list(metrics)[-10:]
-                if not m.success and m.error_message
-            ],
+            "count": histogram.count,
+            "success_rate": (histogram.count - series.failures) / histogram.count * 100,
+            "avg_duration": latency["avg"],
+            "min_duration": latency["min"],
+            "max_duration": latency["max"],
+            "p50_duration": latency["p50"],
+            "p95_duration": latency["p95"],
+            "p99_duration": latency["p99"],
+            "recent_errors": list(series.recent_errors),
+            "windows": series.windows.get_stats(),
         }
 
     async def clear_metrics(self, name: Optional[str] = None):
@@ -125,50 +207,123 @@ class PerformanceMonitor:
         Args:
             name: 指标名称，如果为 None 则清除所有指标
         """
-        async with self._lock:
-            if name:
-                self.metrics[name].clear()
-            else:
-                self.metrics.clear()
+        if name:
+            series = self.metrics.get(name)
+            if series is not None:
+                series.clear()
+        else:
+            for series in self.metrics.values():
+                series.clear()
 
 
 # 全局性能监控器实例
 _monitor = PerformanceMonitor()
 
+# 被跟踪函数的代码对象到指标名称的映射，用于把调用栈归属到工具
+_tracked_code: Dict[CodeType, str] = {}
+
 
 def performance_tracked(name: Optional[str] = None):
     """
     性能跟踪装饰器
 
+    记录路径不包含 await，也不为每次调用创建记录对象：指标统计对象在首次调用时获取并复用，
+    计时使用单调时钟。开启追踪时每次调用创建一个根 span，服务内部的阶段 span 挂在其下；
+    未开启追踪时只为慢调用日志采样的调用创建本地根 span。调用结束后耗时达到该工具
+    慢调用阈值的调用记入慢调用日志。
+
     Args:
         name: 指标名称，如果为 None 则使用函数名
     """
 
     def decorator(func):
-        async def wrapper(*args, **kwargs):
-            metric_name = name or func.__name__
-            start_time = time.time()
-            success = True
-            error_message = None
+        metric_name = name or func.__name__
+        series = None
+        _tracked_code[inspect.unwrap(func).__code__] = metric_name
 
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            nonlocal series
+            if series is None:
+                series = _monitor.series(metric_name)
+
+            tracer = tracing._tracer
+            slow_log = slow_calls._slow_call_log
+            if tracer.enabled:
+                root = tracer.start_span(metric_name)
+            elif slow_log.enabled and slow_log.sample():
+                root = tracer.start_local_span(metric_name)
+            else:
+                root = None
+            profiler = series.profiler
+            if profiler is not None:
+                profiler.call_started()
+            start_time = time.perf_counter()
             try:
                 result = await func(*args, **kwargs)
-                return result
             except Exception as e:
-                success = False
-                error_message = str(e)
+                end_time = time.perf_counter()
+                duration = end_time - start_time
+                series.record(duration, str(e), end_time)
+                if root is not None:
+                    root.finish(e)
+                if profiler is not None:
+                    profiler.call_finished()
+                if slow_log.enabled and slow_log.is_slow(series, duration):
+                    slow_log.record(
+                        metric_name,
+                        duration,
+                        series.slow_threshold,
+                        func,
+                        args,
+                        kwargs,
+                        error=e,
+                        root=root,
+                    )
                 raise
-            finally:
-                duration = time.time() - start_time
-                await _monitor.record_metric(
-                    metric_name, duration, success, error_message
+            end_time = time.perf_counter()
+            duration = end_time - start_time
+            series.record(duration, None, end_time)
+            if root is not None:
+                root.finish()
+            if profiler is not None:
+                profiler.call_finished()
+            if slow_log.enabled and slow_log.is_slow(series, duration):
+                slow_log.record(
+                    metric_name,
+                    duration,
+                    series.slow_threshold,
+                    func,
+                    args,
+                    kwargs,
+                    result=result,
+                    root=root,
                 )
+            return result
 
         return wrapper
 
     return decorator
 
 
+def find_tracked_name(frame: Optional[FrameType]) -> Optional[str]:
+    """
+    从内向外查找调用栈中第一个被 performance_tracked 跟踪的函数
+
+    Args:
+        frame: 最内层栈帧
+
+    Returns:
+        Optional[str]: 指标名称，栈中没有被跟踪的函数时返回 None
+    """
+    while frame is not None:
+        name = _tracked_code.get(frame.f_code)
+        if name is not None:
+            return name
+        frame = frame.f_back
+    return None
+
+
 def get_monitor() -> PerformanceMonitor:
     """获取全局性能监控器实例"""
     return _monitor
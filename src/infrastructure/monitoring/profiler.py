@@ -0,0 +1,368 @@
+"""
+按需性能分析
+
+供管理工具在运行中的服务上临时开启性能分析：
+- cprofile: 使用 cProfile 记录确定性的函数调用耗时
+- sampling: 守护线程按固定间隔读取事件循环线程的调用栈并计数，开销与调用量无关
+
+分析范围可以是一段时间内的所有代码，也可以只覆盖某个工具接下来的 N 次调用。
+指定工具时，由 performance_tracked 在调用前后通知分析器；异步调用之间交错执行的
+其他协程也会被计入。另提供 tracemalloc 内存快照，返回分配最多的代码行及与上次快照的差异。
+
+未开启时不运行任何线程、不挂任何钩子，对请求路径没有影响。
+"""
+
+import asyncio
+import cProfile
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from .performance_monitor import get_monitor
+
+MODES = ("cprofile", "sampling")
+
+
+class Profiler:
+    """按需性能分析器"""
+
+    def __init__(self, sample_interval: float = 0.005, max_stack_depth: int = 64):
+        """
+        初始化性能分析器
+
+        Args:
+            sample_interval: 采样模式的采样间隔（秒）
+            max_stack_depth: 采样模式每次读取的最大栈深度
+        """
+        self.sample_interval = sample_interval
+        self.max_stack_depth = max_stack_depth
+        self.mode: Optional[str] = None
+        self.tool: Optional[str] = None
+        self.calls_remaining: Optional[int] = None
+        self.started_at: Optional[float] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+
+        self._profile: Optional[cProfile.Profile] = None
+        self._series = None
+        self._active_calls = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._samples = 0
+        self._self_counts: Counter = Counter()
+        self._cumulative_counts: Counter = Counter()
+
+        self._last_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def active(self) -> bool:
+        """是否有进行中的性能分析"""
+        return self.mode is not None
+
+    def start(
+        self,
+        mode: str = "cprofile",
+        seconds: Optional[float] = None,
+        tool: Optional[str] = None,
+        calls: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        开始性能分析
+
+        Args:
+            mode: 分析方式，cprofile 或 sampling
+            seconds: 分析时长（秒），到时自动停止，为 None 时需手动停止或由 calls 结束
+            tool: 只分析该工具（performance_tracked 的指标名称）的调用
+            calls: 与 tool 一起使用，分析完该工具的 N 次调用后自动停止
+
+        Returns:
+            Dict[str, Any]: 当前分析状态
+
+        Raises:
+            RuntimeError: 已有进行中的性能分析
+            ValueError: 参数不合法
+        """
+        if self.active:
+            raise RuntimeError("已有进行中的性能分析，请先停止")
+        if mode not in MODES:
+            raise ValueError(f"mode 必须是 {', '.join(MODES)} 之一")
+        if calls is not None and (tool is None or calls <= 0):
+            raise ValueError("calls 必须与 tool 一起使用且大于 0")
+        if seconds is not None and seconds <= 0:
+            raise ValueError("seconds 必须大于 0")
+
+        self.mode = mode
+        self.tool = tool
+        self.calls_remaining = calls
+        self.started_at = time.time()
+        self._active_calls = 0
+
+        if mode == "cprofile":
+            self._profile = cProfile.Profile()
+            if tool is None:
+                self._profile.enable()
+        else:
+            self._samples = 0
+            self._self_counts = Counter()
+            self._cumulative_counts = Counter()
+            self._loop_thread_id = threading.get_ident()
+            self._stop_event.clear()
+            self._sampler = threading.Thread(
+                target=self._sample, name="profiler-sampler", daemon=True
+            )
+            self._sampler.start()
+
+        if tool is not None:
+            self._series = get_monitor().series(tool)
+            self._series.profiler = self
+        if seconds is not None:
+            self._timer = asyncio.get_running_loop().call_later(seconds, self.stop)
+        return self.get_status()
+
+    def stop(self, top: int = 20) -> Dict[str, Any]:
+        """
+        停止性能分析并生成报告
+
+        Args:
+            top: 报告中保留的热点数量
+
+        Returns:
+            Dict[str, Any]: 分析报告
+
+        Raises:
+            RuntimeError: 没有进行中的性能分析
+        """
+        if not self.active:
+            raise RuntimeError("没有进行中的性能分析")
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._series is not None:
+            self._series.profiler = None
+            self._series = None
+        if self._sampler is not None:
+            self._stop_event.set()
+            self._sampler.join()
+            self._sampler = None
+
+        report = {
+            "mode": self.mode,
+            "tool": self.tool,
+            "started_at": self.started_at,
+            "duration": time.time() - self.started_at,
+        }
+        if self.mode == "cprofile":
+            self._profile.disable()
+            report.update(self._cprofile_report(self._profile, top))
+            self._profile = None
+        else:
+            report.update(self._sampling_report(top))
+
+        self.mode = None
+        self.tool = None
+        self.calls_remaining = None
+        self.last_report = report
+        return report
+
+    def call_started(self) -> None:
+        """被分析的工具开始一次调用，由 performance_tracked 调用"""
+        self._active_calls += 1
+        if self._active_calls == 1 and self._profile is not None:
+            self._profile.enable()
+
+    def call_finished(self) -> None:
+        """被分析的工具结束一次调用，由 performance_tracked 调用"""
+        self._active_calls -= 1
+        if self._active_calls == 0 and self._profile is not None:
+            self._profile.disable()
+        if self.calls_remaining is not None:
+            self.calls_remaining -= 1
+            if self.calls_remaining <= 0 and self._active_calls == 0:
+                self.stop()
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        获取当前分析状态
+
+        Returns:
+            Dict[str, Any]: 分析方式、目标工具和剩余调用次数等
+        """
+        return {
+            "active": self.active,
+            "mode": self.mode,
+            "tool": self.tool,
+            "calls_remaining": self.calls_remaining,
+            "started_at": self.started_at if self.active else None,
+            "has_report": self.last_report is not None,
+        }
+
+    def _sample(self) -> None:
+        """采样线程：按间隔读取事件循环线程的调用栈"""
+        while not self._stop_event.wait(self.sample_interval):
+            if self.tool is not None and self._active_calls == 0:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            code = frame.f_code
+            self._self_counts[(code.co_filename, frame.f_lineno, code.co_name)] += 1
+            seen = set()
+            depth = 0
+            while frame is not None and depth < self.max_stack_depth:
+                code = frame.f_code
+                seen.add((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+                depth += 1
+            self._cumulative_counts.update(seen)
+            self._samples += 1
+            del frame
+
+    def _sampling_report(self, top: int) -> Dict[str, Any]:
+        """汇总采样结果"""
+        total = self._samples
+
+        def rows(counter: Counter) -> List[Dict[str, Any]]:
+            return [
+                {
+                    "function": f"{name} ({filename}:{lineno})",
+                    "samples": count,
+                    "percent": count / total * 100 if total else 0.0,
+                }
+                for (filename, lineno, name), count in counter.most_common(top)
+            ]
+
+        return {
+            "samples": total,
+            "sample_interval": self.sample_interval,
+            "self": rows(self._self_counts),
+            "cumulative": rows(self._cumulative_counts),
+        }
+
+    @staticmethod
+    def _cprofile_report(profile: cProfile.Profile, top: int) -> Dict[str, Any]:
+        """汇总 cProfile 结果，分别按累计耗时和自身耗时排序"""
+        profile.create_stats()
+        if not profile.stats:
+            return {"total_calls": 0, "total_time": 0.0, "cumulative": [], "self": []}
+        stats = pstats.Stats(profile)
+
+        def rows(index: int) -> List[Dict[str, Any]]:
+            ordered = sorted(
+                stats.stats.items(), key=lambda item: item[1][index], reverse=True
+            )
+            return [
+                {
+                    "function": f"{name} ({filename}:{lineno})",
+                    "calls": calls,
+                    "self_time": self_time,
+                    "cumulative_time": cumulative_time,
+                }
+                for (filename, lineno, name), (
+                    _,
+                    calls,
+                    self_time,
+                    cumulative_time,
+                    _,
+                ) in ordered[:top]
+            ]
+
+        return {
+            "total_calls": stats.total_calls,
+            "total_time": stats.total_tt,
+            "cumulative": rows(3),
+            "self": rows(2),
+        }
+
+    def start_memory_tracing(self, frames: int = 1) -> Dict[str, Any]:
+        """
+        开启 tracemalloc，开启后所有内存分配都会被记录，用完应及时关闭
+
+        Args:
+            frames: 每次分配记录的栈帧数量
+
+        Returns:
+            Dict[str, Any]: 当前已跟踪的内存
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._last_snapshot = None
+        return self._traced_memory()
+
+    def memory_snapshot(self, top: int = 20) -> Dict[str, Any]:
+        """
+        获取内存快照，返回分配最多的代码行以及与上次快照相比增长最多的代码行
+
+        Args:
+            top: 返回的代码行数量
+
+        Returns:
+            Dict[str, Any]: 内存快照摘要
+
+        Raises:
+            RuntimeError: 尚未开启 tracemalloc
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("尚未开启内存跟踪")
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+        )
+        result = {
+            **self._traced_memory(),
+            "top_allocations": [
+                {
+                    "location": str(stat.traceback),
+                    "size": stat.size,
+                    "count": stat.count,
+                }
+                for stat in snapshot.statistics("lineno")[:top]
+            ],
+            "top_growth": None,
+        }
+        if self._last_snapshot is not None:
+            result["top_growth"] = [
+                {
+                    "location": str(stat.traceback),
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in snapshot.compare_to(self._last_snapshot, "lineno")[:top]
+            ]
+        self._last_snapshot = snapshot
+        return result
+
+    def stop_memory_tracing(self) -> Dict[str, Any]:
+        """
+        关闭 tracemalloc 并释放快照
+
+        Returns:
+            Dict[str, Any]: 关闭前已跟踪的内存
+        """
+        memory = self._traced_memory()
+        tracemalloc.stop()
+        self._last_snapshot = None
+        return memory
+
+    @staticmethod
+    def _traced_memory() -> Dict[str, Any]:
+        """tracemalloc 状态和当前、峰值跟踪内存"""
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {"tracing": tracing, "current_bytes": current, "peak_bytes": peak}
+
+
+# 全局性能分析器实例
+_profiler = Profiler()
+
+
+def get_profiler() -> Profiler:
+    """获取全局性能分析器实例"""
+    return _profiler
@@ -0,0 +1,174 @@
+"""
+按时间滑动的窗口统计
+
+时间被切分为固定长度的槽，每个槽保存一组分桶计数和失败次数，槽以环形方式复用：
+进入新的时间段时原地清零最旧的槽再写入，不重新分配计数数组。查询某个窗口时合并窗口内
+仍然有效的槽。每个指标的内存占用只与槽数量和桶数有关，与调用量无关。
+
+1 分钟窗口使用 6 个 10 秒的槽，5 分钟和 15 分钟窗口共用 15 个 1 分钟的槽。
+滑动窗口只用于观察近期趋势，槽使用相对误差 5% 的粗分桶（约 220 个桶），
+每个槽的计数数组约为全量延迟直方图的五分之一；全量直方图的桶下标通过查表转换，
+窗口分位数的相对误差约为 6%。
+"""
+
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+from .histogram import LatencyHistogram
+
+# (窗口名称, 所用的环, 窗口长度（秒）)
+WINDOWS: Tuple[Tuple[str, str, int], ...] = (
+    ("1m", "fine", 60),
+    ("5m", "coarse", 300),
+    ("15m", "coarse", 900),
+)
+
+# 统计窗口使用的时钟，与 performance_tracked 的计时时钟一致
+clock = time.perf_counter
+
+# 滑动窗口使用的分桶精度
+RELATIVE_ACCURACY = 0.05
+
+# 提供分桶参数的模板直方图
+_TEMPLATE = LatencyHistogram(RELATIVE_ACCURACY)
+# 全量延迟直方图桶下标到滑动窗口桶下标的映射
+_INDEXES = LatencyHistogram().remap_indexes(_TEMPLATE)
+# 清零槽时复制的全零数组
+_ZEROS = _TEMPLATE.new_counts()
+
+
+class _Slot:
+    """一个时间槽"""
+
+    __slots__ = ("period", "counts", "failures")
+
+    def __init__(self):
+        self.period = -1
+        self.counts: array = _TEMPLATE.new_counts()
+        self.failures = 0
+
+
+class RollingWindow:
+    """固定槽数的环形时间窗口"""
+
+    def __init__(self, slot_seconds: float, slot_count: int):
+        """
+        初始化时间窗口
+
+        Args:
+            slot_seconds: 每个槽覆盖的秒数
+            slot_count: 槽数量，窗口最长覆盖 slot_seconds * slot_count 秒
+        """
+        self.slot_seconds = slot_seconds
+        self.slot_count = slot_count
+        self._slots: List[_Slot] = [_Slot() for _ in range(slot_count)]
+        self._current = self._slots[0]
+        self._period_end = -float("inf")
+
+    def _advance(self, now: float) -> None:
+        """切换到 now 所在时间段的槽，槽中的旧数据已滑出窗口，复用前清空"""
+        period = int(now // self.slot_seconds)
+        slot = self._slots[period % self.slot_count]
+        if slot.period != period:
+            slot.period = period
+            slot.counts[:] = _ZEROS
+            slot.failures = 0
+        self._current = slot
+        self._period_end = (period + 1) * self.slot_seconds
+
+    def add(self, index: int, failed: bool, now: float) -> None:
+        """
+        记录一个样本，同一时间段内只做计数更新
+
+        Args:
+            index: 全量延迟直方图的桶下标
+            failed: 是否失败
+            now: 当前时间（clock 时钟）
+        """
+        if now >= self._period_end:
+            self._advance(now)
+        slot = self._current
+        slot.counts[_INDEXES[index]] += 1
+        if failed:
+            slot.failures += 1
+
+    def collect(self, seconds: float, now: float) -> Tuple[LatencyHistogram, int]:
+        """
+        合并最近 seconds 秒内的槽
+
+        Args:
+            seconds: 窗口长度（秒），不超过 slot_seconds * slot_count
+            now: 当前时间（clock 时钟）
+
+        Returns:
+            Tuple[LatencyHistogram, int]: 合并后的直方图和失败次数
+        """
+        current = int(now // self.slot_seconds)
+        oldest = current - min(int(seconds // self.slot_seconds), self.slot_count) + 1
+        merged = LatencyHistogram(RELATIVE_ACCURACY)
+        failures = 0
+        for slot in self._slots:
+            if oldest <= slot.period <= current:
+                merged.merge_counts(slot.counts, sum(slot.counts))
+                failures += slot.failures
+        return merged, failures
+
+
+class RollingMetrics:
+    """单个指标的 1/5/15 分钟滑动窗口统计"""
+
+    def __init__(self):
+        """初始化滑动窗口"""
+        self.fine = RollingWindow(slot_seconds=10, slot_count=6)
+        self.coarse = RollingWindow(slot_seconds=60, slot_count=15)
+        self.started_at = clock()
+
+    def add(self, index: int, failed: bool, now: float) -> None:
+        """
+        记录一个样本
+
+        Args:
+            index: 全量延迟直方图的桶下标
+            failed: 是否失败
+            now: 当前时间（clock 时钟）
+        """
+        # 两个环的写入在此内联，同一时间段内只做一次查表和两次计数更新
+        index = _INDEXES[index]
+        fine, coarse = self.fine, self.coarse
+        if now >= fine._period_end:
+            fine._advance(now)
+        if now >= coarse._period_end:
+            coarse._advance(now)
+        fine._current.counts[index] += 1
+        coarse._current.counts[index] += 1
+        if failed:
+            fine._current.failures += 1
+            coarse._current.failures += 1
+
+    def get_stats(self, now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        获取各窗口的吞吐量、错误率和分位数
+
+        Args:
+            now: 当前时间（clock 时钟），如果为 None 则读取时钟
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 窗口名称到统计信息的映射
+        """
+        if now is None:
+            now = clock()
+        stats = {}
+        for name, ring, seconds in WINDOWS:
+            window = self.fine if ring == "fine" else self.coarse
+            histogram, failures = window.collect(seconds, now)
+            # 最新的槽只覆盖了一部分时间，按实际覆盖的时长计算吞吐量
+            covered = seconds - window.slot_seconds + (now % window.slot_seconds)
+            covered = max(min(covered, now - self.started_at), 1e-9)
+            count = histogram.count
+            stats[name] = {
+                "count": count,
+                "throughput": count / covered,
+                "error_rate": failures / count * 100 if count else 0.0,
+                **histogram.percentiles(),
+            }
+        return stats
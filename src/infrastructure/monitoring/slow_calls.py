@@ -0,0 +1,241 @@
+"""
+慢调用日志
+
+performance_tracked 在每次调用结束后用该工具直方图的分位数判断是否为慢调用。分位数阈值
+每隔固定调用次数才重新计算一次，判断本身只是一次比较；规范化参数、计算结果大小等
+开销只发生在慢调用上，按定义只占调用的一小部分，日志条数也有固定上限。
+
+阶段耗时来自根 span：开启追踪时每次调用都有根 span；未开启追踪时按 sample_rate
+采样部分调用创建本地根 span，未被采样的慢调用不含阶段耗时。
+"""
+
+import inspect
+import json
+import math
+import random
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from ..cache.keys import canonicalize
+from ..dataset import get_dataset_state
+from ...core.config import get_config
+
+# 单个参数规范化后的最大长度，超出部分截断
+MAX_ARGUMENT_CHARS = 200
+
+
+def normalize_arguments(
+    func: Callable, args: Tuple[Any, ...], kwargs: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    将调用参数按参数名规范化，去掉 self 并截断过长的值
+
+    Args:
+        func: 被调用的函数
+        args: 位置参数
+        kwargs: 关键字参数
+
+    Returns:
+        Dict[str, Any]: 参数名到规范化值的映射
+    """
+    try:
+        arguments = inspect.signature(func).bind_partial(*args, **kwargs).arguments
+    except (TypeError, ValueError):
+        arguments = {"args": args, "kwargs": kwargs}
+
+    normalized = {}
+    for name, value in arguments.items():
+        if name in ("self", "cls"):
+            continue
+        try:
+            value = canonicalize(value)
+        except TypeError:
+            value = repr(value)
+        encoded = json.dumps(value, ensure_ascii=False, sort_keys=True)
+        if len(encoded) > MAX_ARGUMENT_CHARS:
+            value = encoded[:MAX_ARGUMENT_CHARS] + "..."
+        normalized[name] = value
+    return normalized
+
+
+def result_size(result: Any) -> Optional[int]:
+    """
+    计算工具结果的字节数，工具返回 JSON 字符串
+
+    Args:
+        result: 工具返回值
+
+    Returns:
+        Optional[int]: UTF-8 编码后的字节数，无法计算时返回 None
+    """
+    if isinstance(result, str):
+        return len(result.encode("utf-8"))
+    if isinstance(result, (bytes, bytearray)):
+        return len(result)
+    return None
+
+
+class SlowCallLog:
+    """有界的慢调用日志"""
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        percentile: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        capacity: Optional[int] = None,
+        sample_rate: Optional[float] = None,
+        refresh_every: int = 128,
+    ):
+        """
+        初始化慢调用日志，参数为 None 时使用配置值
+
+        Args:
+            enabled: 是否开启
+            percentile: 慢调用阈值分位点，取值 0-1
+            min_samples: 工具调用次数达到该值后才开始判定
+            capacity: 保留的最近记录数
+            sample_rate: 未开启追踪时收集阶段耗时的采样比例
+            refresh_every: 每隔多少次调用重新计算一次阈值
+        """
+        config = get_config().monitoring
+        self.enabled = config.slow_call_log_enabled if enabled is None else enabled
+        self.percentile = (
+            config.slow_call_percentile if percentile is None else percentile
+        )
+        self.min_samples = (
+            config.slow_call_min_samples if min_samples is None else min_samples
+        )
+        self.sample_rate = (
+            config.slow_call_sample_rate if sample_rate is None else sample_rate
+        )
+        self.refresh_every = refresh_every
+        self.entries: Deque[Dict[str, Any]] = deque(
+            maxlen=config.slow_call_log_size if capacity is None else capacity
+        )
+        self.recorded = 0
+
+    def sample(self) -> bool:
+        """本次调用是否收集阶段耗时"""
+        return random.random() < self.sample_rate
+
+    def is_slow(self, series: Any, duration: float) -> bool:
+        """
+        判断一次已记录到指标统计中的调用是否为慢调用，不包含 await
+
+        阈值缓存在指标统计对象上，每隔 refresh_every 次调用才从直方图重新计算。
+
+        Args:
+            series: 该工具的指标统计
+            duration: 本次调用耗时（秒）
+
+        Returns:
+            bool: 是否应记入日志
+        """
+        histogram = series.histogram
+        if histogram.count >= series.slow_refresh_at:
+            series.slow_refresh_at = histogram.count + self.refresh_every
+            series.slow_threshold = (
+                histogram.quantile(self.percentile)
+                if histogram.count >= self.min_samples
+                else math.inf
+            )
+        return duration >= series.slow_threshold
+
+    def record(
+        self,
+        tool: str,
+        duration: float,
+        threshold: float,
+        func: Callable,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        result: Any = None,
+        error: Optional[BaseException] = None,
+        root: Any = None,
+    ) -> None:
+        """
+        记录一次慢调用
+
+        Args:
+            tool: 工具名
+            duration: 调用耗时（秒）
+            threshold: 判定时使用的阈值（秒）
+            func: 被调用的函数
+            args: 位置参数
+            kwargs: 关键字参数
+            result: 工具返回值
+            error: 调用抛出的异常（如果有）
+            root: 本次调用的根 span，为 None 时不含阶段耗时
+        """
+        stages = None
+        if root is not None:
+            stages = {}
+            for path, stage_duration in root.stages:
+                stages[path] = stages.get(path, 0.0) + stage_duration
+
+        self.recorded += 1
+        self.entries.append(
+            {
+                "tool": tool,
+                "timestamp": time.time(),
+                "duration": duration,
+                "threshold": threshold,
+                "arguments": normalize_arguments(func, args, kwargs),
+                "result_bytes": result_size(result),
+                "dataset_version": get_dataset_state().version,
+                "error": f"{type(error).__name__}: {error}" if error else None,
+                "stages": stages,
+            }
+        )
+
+    def get_entries(
+        self, tool: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        获取慢调用记录，最新的在前
+
+        Args:
+            tool: 只返回该工具的记录
+            limit: 最多返回的记录数
+
+        Returns:
+            List[Dict[str, Any]]: 慢调用记录
+        """
+        entries = [
+            entry
+            for entry in reversed(self.entries)
+            if tool is None or entry["tool"] == tool
+        ]
+        return entries[:limit] if limit is not None else entries
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取慢调用日志统计信息
+
+        Returns:
+            Dict[str, Any]: 配置、累计记录数和当前保留的记录数
+        """
+        return {
+            "enabled": self.enabled,
+            "percentile": self.percentile,
+            "min_samples": self.min_samples,
+            "sample_rate": self.sample_rate,
+            "capacity": self.entries.maxlen,
+            "recorded": self.recorded,
+            "retained": len(self.entries),
+        }
+
+    def clear(self) -> None:
+        """清空日志"""
+        self.entries.clear()
+        self.recorded = 0
+
+
+# 全局慢调用日志实例
+_slow_call_log = SlowCallLog()
+
+
+def get_slow_call_log() -> SlowCallLog:
+    """获取全局慢调用日志实例"""
+    return _slow_call_log
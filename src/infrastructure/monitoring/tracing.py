@@ -0,0 +1,445 @@
+"""
+服务内部的阶段级追踪
+
+performance_tracked 在开启追踪时为每次工具调用创建根 span，服务方法内部用 span()
+标记 fetch、filter、score、serialize 等阶段。每个阶段的耗时按 "工具/阶段" 路径记录在
+固定内存的直方图中；配置了收集器地址时，结束的 span 会放入有界队列，由后台任务按
+OTLP/HTTP JSON 格式批量发送给 OpenTelemetry 收集器。
+
+根 span 还按结束顺序收集本次调用各阶段的耗时，供慢调用日志使用。未开启追踪时，
+慢调用日志按比例采样部分调用创建本地根 span：其下的阶段 span 只计入根 span，
+不更新阶段直方图也不导出。
+
+关闭追踪且当前调用未被采样时，span() 只做一次属性判断和一次上下文变量读取，
+并返回共享的空操作对象，不读取时钟也不分配对象。
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import httpx
+from .histogram import LatencyHistogram
+from ...core.config import get_config
+
+logger = logging.getLogger(__name__)
+
+# 当前协程上下文中正在执行的 span
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Span:
+    """一个计时区间"""
+
+    __slots__ = (
+        "tracer",
+        "name",
+        "path",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start",
+        "start_ns",
+        "duration",
+        "attributes",
+        "error",
+        "root",
+        "local",
+        "stages",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        attributes: Dict[str, Any],
+        local: bool = False,
+    ):
+        parent = _current_span.get()
+        self.tracer = tracer
+        self.name = name
+        if parent is None:
+            self.path = name
+            self.trace_id = os.urandom(16).hex()
+            self.parent_id: Optional[str] = None
+            self.root = self
+            self.local = local
+            # 根 span 收集的 (阶段路径, 耗时)，阶段路径不含根 span 名称
+            self.stages: Optional[List[Tuple[str, float]]] = []
+        else:
+            self.path = f"{parent.path}/{name}"
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self.root = parent.root
+            self.local = parent.local
+            self.stages = None
+        self.span_id = os.urandom(8).hex()
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.duration = 0.0
+        self.start_ns = time.time_ns()
+        self.start = time.perf_counter()
+        self._token = _current_span.set(self)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """
+        设置 span 属性
+
+        Args:
+            key: 属性名
+            value: 属性值
+        """
+        self.attributes[key] = value
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """
+        结束 span 并恢复上一层 span
+
+        Args:
+            error: 区间内抛出的异常（如果有）
+        """
+        self.duration = time.perf_counter() - self.start
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        _current_span.reset(self._token)
+        root = self.root
+        if root is not self:
+            root.stages.append((self.path[len(root.name) + 1 :], self.duration))
+        if not self.local:
+            self.tracer._on_finish(self)
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.finish(exc)
+        return False
+
+
+class _NoopSpan:
+    """追踪关闭时使用的空操作 span"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class OTLPExporter:
+    """以 OTLP/HTTP JSON 格式批量导出 span"""
+
+    def __init__(
+        self,
+        endpoint: str,
+        service_name: str,
+        service_version: str = "",
+        interval: float = 5.0,
+        max_queue: int = 2048,
+        timeout: float = 5.0,
+    ):
+        """
+        初始化导出器
+
+        Args:
+            endpoint: 收集器地址，如 http://localhost:4318
+            service_name: 上报的 service.name
+            service_version: 上报的 service.version
+            interval: 批量导出周期（秒）
+            max_queue: 待导出队列上限，队列满时丢弃最旧的 span
+            timeout: 单次请求超时（秒）
+        """
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.service_version = service_version
+        self.interval = interval
+        self.timeout = timeout
+        self._queue: Deque[Span] = deque(maxlen=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self.exported = 0
+        self.dropped = 0
+        self.failures = 0
+
+    def enqueue(self, span: Span) -> None:
+        """
+        放入待导出队列，不包含 await
+
+        Args:
+            span: 已结束的 span
+        """
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(span)
+
+    def start(self) -> None:
+        """启动后台导出任务"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台导出任务并发送剩余的 span"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        发送队列中的所有 span，失败时记录日志并丢弃这一批
+
+        Returns:
+            int: 成功发送的 span 数量
+        """
+        if not self._queue:
+            return 0
+        batch = list(self._queue)
+        self._queue.clear()
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.post(self.url, json=self.encode(batch))
+                response.raise_for_status()
+        except Exception as e:
+            self.failures += 1
+            self.dropped += len(batch)
+            logger.warning(f"导出 {len(batch)} 个 span 失败: {e}")
+            return 0
+        self.exported += len(batch)
+        return len(batch)
+
+    def encode(self, spans: List[Span]) -> Dict[str, Any]:
+        """
+        编码为 OTLP ExportTraceServiceRequest 的 JSON 形式
+
+        Args:
+            spans: 已结束的 span 列表
+
+        Returns:
+            Dict[str, Any]: 请求体
+        """
+        resource = [_attribute("service.name", self.service_name)]
+        if self.service_version:
+            resource.append(_attribute("service.version", self.service_version))
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": resource},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [_encode_span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取导出统计信息
+
+        Returns:
+            Dict[str, Any]: 导出地址、队列长度和发送计数
+        """
+        return {
+            "url": self.url,
+            "queued": len(self._queue),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failures": self.failures,
+        }
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    """编码 OTLP KeyValue"""
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+def _encode_span(span: Span) -> Dict[str, Any]:
+    """编码 OTLP Span"""
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 2 if span.parent_id is None else 1,  # SERVER / INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.start_ns + int(span.duration * 1e9)),
+        "attributes": [_attribute(k, v) for k, v in span.attributes.items()],
+        # STATUS_CODE_OK = 1, STATUS_CODE_ERROR = 2
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id is not None:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+class Tracer:
+    """阶段级追踪器"""
+
+    def __init__(
+        self, enabled: Optional[bool] = None, exporter: Optional[OTLPExporter] = None
+    ):
+        """
+        初始化追踪器
+
+        Args:
+            enabled: 是否开启，如果为 None 则使用配置值
+            exporter: span 导出器，如果为 None 则只在本地统计各阶段耗时
+        """
+        if enabled is None:
+            enabled = get_config().monitoring.tracing_enabled
+        self.enabled = enabled
+        self.exporter = exporter
+        self.stages: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, int] = {}
+
+    def start_span(self, name: str, **attributes: Any) -> Span:
+        """
+        开始一个 span 并设为当前 span，调用方负责调用 finish
+
+        Args:
+            name: span 名称，根 span 使用工具名，内部 span 使用阶段名
+            **attributes: span 属性
+
+        Returns:
+            Span: 新的 span
+        """
+        return Span(self, name, attributes)
+
+    def start_local_span(self, name: str) -> Span:
+        """
+        开始一个只在本次调用内收集阶段耗时的根 span，调用方负责调用 finish
+
+        该 span 及其下的阶段 span 不计入阶段直方图也不导出，供慢调用日志在未开启追踪时
+        采样使用。
+
+        Args:
+            name: 工具名
+
+        Returns:
+            Span: 新的本地根 span
+        """
+        return Span(self, name, {}, local=True)
+
+    def span(self, name: str, **attributes: Any):
+        """
+        阶段计时上下文管理器，关闭追踪且不在本地根 span 下时返回共享的空操作对象
+
+        Args:
+            name: 阶段名称
+            **attributes: span 属性
+
+        Returns:
+            Span 或空操作 span
+        """
+        if not self.enabled and _current_span.get() is None:
+            return _NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def _on_finish(self, span: Span) -> None:
+        """记录阶段耗时并放入导出队列"""
+        histogram = self.stages.get(span.path)
+        if histogram is None:
+            histogram = self.stages[span.path] = LatencyHistogram()
+        histogram.record(span.duration)
+        if span.error is not None:
+            self.errors[span.path] = self.errors.get(span.path, 0) + 1
+        if self.exporter is not None:
+            self.exporter.enqueue(span)
+
+    def start(self) -> None:
+        """启动导出任务"""
+        if self.enabled and self.exporter is not None:
+            self.exporter.start()
+
+    async def stop(self) -> None:
+        """停止导出任务并发送剩余的 span"""
+        if self.exporter is not None:
+            await self.exporter.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取追踪统计信息
+
+        Returns:
+            Dict[str, Any]: 开关状态、导出统计和各阶段的耗时分布
+        """
+        return {
+            "enabled": self.enabled,
+            "exporter": self.exporter.get_stats() if self.exporter else None,
+            "stages": {
+                path: {**histogram.get_stats(), "errors": self.errors.get(path, 0)}
+                for path, histogram in sorted(self.stages.items())
+            },
+        }
+
+
+def _create_tracer() -> Tracer:
+    """根据配置创建追踪器"""
+    config = get_config()
+    exporter = None
+    if config.monitoring.tracing_otlp_endpoint:
+        exporter = OTLPExporter(
+            config.monitoring.tracing_otlp_endpoint,
+            service_name=config.server.name,
+            service_version=config.server.version,
+            interval=config.monitoring.tracing_export_interval,
+            max_queue=config.monitoring.tracing_max_queue,
+        )
+    return Tracer(exporter=exporter)
+
+
+# 全局追踪器实例
+_tracer = _create_tracer()
+
+
+def span(name: str, **attributes: Any):
+    """
+    在全局追踪器上标记一个阶段
+
+    Args:
+        name: 阶段名称，如 fetch、filter、score、serialize
+        **attributes: span 属性
+
+    Returns:
+        上下文管理器，关闭追踪时为空操作对象
+    """
+    return _tracer.span(name, **attributes)
+
+
+def get_tracer() -> Tracer:
+    """获取全局追踪器实例"""
+    return _tracer
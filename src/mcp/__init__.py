@@ -6,15 +6,19 @@ from .tools import (
     register_recipe_tools,
     register_meal_tools,
     register_recommendation_tools,
+    register_admin_tools,
 )
 from .resources import register_api_resources
+from .routes import register_http_routes
 from .prompts import meal_planning, meal_planning_prompt, recipe_recommendation_prompt
 
 __all__ = [
     "register_recipe_tools",
     "register_meal_tools",
     "register_recommendation_tools",
+    "register_admin_tools",
     "register_api_resources",
+    "register_http_routes",
     "meal_planning",
     "meal_planning_prompt",
     "recipe_recommendation_prompt",
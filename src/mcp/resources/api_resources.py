@@ -86,3 +86,25 @@ def register_api_resources(server: FastMCP):
         """
         health_result = await health_checker.full_health_check()
         return json.dumps(health_result, ensure_ascii=False, indent=2)
+
+    @server.resource("howtocook://health/live")
+    async def get_liveness_status():
+        """
+        获取服务器存活状态，不做任何 I/O
+
+        Returns:
+            存活检查结果
+        """
+        return json.dumps(health_checker.check_liveness(), ensure_ascii=False, indent=2)
+
+    @server.resource("howtocook://health/ready")
+    async def get_readiness_status():
+        """
+        获取服务器就绪状态，只读取已缓存的数据集和熔断状态
+
+        Returns:
+            就绪检查结果
+        """
+        return json.dumps(
+            health_checker.check_readiness(), ensure_ascii=False, indent=2
+        )
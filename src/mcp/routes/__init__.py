@@ -0,0 +1,16 @@
+"""
+HTTP路由模块 - streamable-http 模式下 MCP 协议之外的辅助端点
+"""
+
+from fastmcp import FastMCP
+from .health_routes import register_health_routes
+from .metrics_routes import register_metrics_routes
+
+
+def register_http_routes(server: FastMCP):
+    """注册所有HTTP路由"""
+    register_health_routes(server)
+    register_metrics_routes(server)
+
+
+__all__ = ["register_http_routes", "register_health_routes", "register_metrics_routes"]
@@ -0,0 +1,26 @@
+"""
+健康检查HTTP路由
+"""
+
+from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from ...core.config import get_config
+from ...infrastructure.monitoring.health_checker import get_health_checker
+
+
+def register_health_routes(server: FastMCP):
+    """注册存活、就绪检查路由，供负载均衡高频探活"""
+    config = get_config()
+    health_checker = get_health_checker()
+
+    @server.custom_route(config.monitoring.health_live_path, methods=["GET"])
+    async def liveness(request: Request) -> JSONResponse:
+        """存活检查"""
+        return JSONResponse(health_checker.check_liveness())
+
+    @server.custom_route(config.monitoring.health_ready_path, methods=["GET"])
+    async def readiness(request: Request) -> JSONResponse:
+        """就绪检查，未就绪时返回 503"""
+        result = health_checker.check_readiness()
+        return JSONResponse(result, status_code=200 if result["ready"] else 503)
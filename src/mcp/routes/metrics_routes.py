@@ -0,0 +1,24 @@
+"""
+监控指标HTTP路由
+"""
+
+from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import Response
+from ...core.config import get_config
+from ...infrastructure.monitoring.metrics_exporter import (
+    CONTENT_TYPE,
+    render_openmetrics,
+)
+
+
+def register_metrics_routes(server: FastMCP):
+    """注册监控指标路由"""
+    config = get_config()
+
+    if config.monitoring.metrics_enabled:
+
+        @server.custom_route(config.monitoring.metrics_path, methods=["GET"])
+        async def metrics(request: Request) -> Response:
+            """以 OpenMetrics 文本格式导出监控指标"""
+            return Response(render_openmetrics(), media_type=CONTENT_TYPE)
@@ -0,0 +1,125 @@
+"""
+管理相关的MCP工具，只在 ADMIN_ENABLED=true 时注册
+
+管理令牌只作为工具参数传入，不出现在资源 URI 中，避免进入请求日志、错误信息和指标标签。
+"""
+
+import hmac
+import json
+from typing import Optional
+from fastmcp import FastMCP
+from ...core.config import get_config
+from ...infrastructure.monitoring.profiler import get_profiler
+from ...infrastructure.monitoring.slow_calls import get_slow_call_log
+
+
+def _dump(result) -> str:
+    """序列化工具返回值"""
+    return json.dumps(result, ensure_ascii=False, indent=2)
+
+
+def register_admin_tools(server: FastMCP):
+    """注册管理工具，未开启时不注册任何工具，开启但未配置令牌时抛出 ValueError"""
+    config = get_config()
+    if not config.admin.enabled:
+        return
+    # 管理工具可以开启分析器并读取调用参数，不允许在没有令牌时对所有客户端开放
+    if not config.admin.token:
+        raise ValueError("ADMIN_ENABLED=true 时必须设置 ADMIN_TOKEN")
+
+    profiler = get_profiler()
+    slow_call_log = get_slow_call_log()
+
+    def authorized(token: str) -> bool:
+        """校验管理令牌"""
+        return hmac.compare_digest(token.encode(), config.admin.token.encode())
+
+    @server.tool()
+    async def admin_profile(
+        action: str,
+        mode: str = "cprofile",
+        seconds: Optional[float] = None,
+        tool: Optional[str] = None,
+        calls: Optional[int] = None,
+        top: int = 20,
+        token: str = "",
+    ):
+        """
+        管理员工具：在运行中的服务上进行性能分析
+
+        Args:
+            action: start 开始分析，stop 停止并返回报告，status 查看状态，report 查看上次报告
+            mode: 分析方式，cprofile（函数级耗时）或 sampling（低开销采样）
+            seconds: 分析时长（秒），到时自动停止
+            tool: 只分析该工具的调用，如"search_recipes_by_ingredients"
+            calls: 与 tool 一起使用，分析该工具接下来的 N 次调用后自动停止
+            top: 报告中返回的热点数量
+            token: 管理令牌
+
+        Returns:
+            分析状态或按累计耗时、自身耗时排序的热点报告
+        """
+        if not authorized(token):
+            return _dump({"error": "管理令牌无效"})
+        try:
+            if action == "start":
+                return _dump(profiler.start(mode, seconds, tool, calls))
+            if action == "stop":
+                return _dump(profiler.stop(top))
+            if action == "status":
+                return _dump(profiler.get_status())
+            if action == "report":
+                return _dump(profiler.last_report or {"error": "尚无分析报告"})
+        except (RuntimeError, ValueError) as e:
+            return _dump({"error": str(e)})
+        return _dump({"error": "action 必须是 start、stop、status、report 之一"})
+
+    @server.tool()
+    async def admin_memory(action: str, top: int = 20, token: str = ""):
+        """
+        管理员工具：使用 tracemalloc 跟踪内存分配
+
+        Args:
+            action: start 开启跟踪，snapshot 获取快照（与上次快照比较增长），stop 关闭跟踪
+            top: 返回的代码行数量
+            token: 管理令牌
+
+        Returns:
+            内存跟踪状态或分配最多的代码行
+        """
+        if not authorized(token):
+            return _dump({"error": "管理令牌无效"})
+        try:
+            if action == "start":
+                return _dump(profiler.start_memory_tracing())
+            if action == "snapshot":
+                return _dump(profiler.memory_snapshot(top))
+            if action == "stop":
+                return _dump(profiler.stop_memory_tracing())
+        except RuntimeError as e:
+            return _dump({"error": str(e)})
+        return _dump({"error": "action 必须是 start、snapshot、stop 之一"})
+
+    @server.tool()
+    async def admin_slow_calls(tool: Optional[str] = None, token: str = ""):
+        """
+        管理员工具：最近的慢调用记录，最新的在前
+
+        每条记录包含工具名、规范化后的参数、耗时与判定阈值、结果字节数、数据集版本，
+        以及被采样调用的各阶段耗时
+
+        Args:
+            tool: 只返回该工具的记录，如"search_recipes_by_ingredients"
+            token: 管理令牌
+
+        Returns:
+            慢调用日志统计和记录
+        """
+        if not authorized(token):
+            return _dump({"error": "管理令牌无效"})
+        return _dump(
+            {
+                "stats": slow_call_log.get_stats(),
+                "entries": slow_call_log.get_entries(tool),
+            }
+        )
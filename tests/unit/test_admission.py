@@ -0,0 +1,154 @@
+"""
+准入控制单元测试
+"""
+
+import asyncio
+import pytest
+from fastmcp import Client, FastMCP
+import src.infrastructure.monitoring.admission as admission
+from src.infrastructure.middleware import AdmissionControlMiddleware
+from src.infrastructure.monitoring.admission import (
+    LEVEL_BUSY,
+    LEVEL_OK,
+    LEVEL_OVERLOADED,
+    AdmissionController,
+)
+from src.infrastructure.monitoring.loop_lag import get_loop_lag_monitor
+from src.infrastructure.monitoring.metrics_exporter import render_openmetrics
+
+
+@pytest.fixture
+def lag(monkeypatch):
+    """设置事件循环延迟"""
+
+    def set_lag(value: float):
+        monkeypatch.setattr(get_loop_lag_monitor(), "last_lag", value)
+
+    set_lag(0.0)
+    return set_lag
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    """替换全局准入控制器"""
+    instance = AdmissionController(
+        enabled=True,
+        lag_threshold=0.1,
+        max_in_flight=4,
+        low_priority=["expensive"],
+        high_priority=["lookup"],
+    )
+    monkeypatch.setattr(admission, "_admission_controller", instance)
+    return instance
+
+
+class TestAdmissionController:
+    """AdmissionController 测试类"""
+
+    def test_priority(self, controller):
+        """测试按列表区分优先级，未列出的为普通优先级"""
+        assert controller.priority("expensive") == "low"
+        assert controller.priority("lookup") == "high"
+        assert controller.priority("other") == "normal"
+
+    def test_sheds_by_in_flight(self, controller, lag):
+        """测试进行中请求达到一半时拒绝低优先级，达到上限时拒绝普通优先级"""
+        for _ in range(2):
+            assert controller.admit("other") is None
+        assert controller.pressure() == (LEVEL_BUSY, "in_flight")
+        assert controller.admit("expensive") == "in_flight"
+        assert controller.admit("other") is None
+        assert controller.admit("other") is None
+
+        assert controller.pressure()[0] == LEVEL_OVERLOADED
+        assert controller.admit("other") == "in_flight"
+        assert controller.admit("lookup") is None
+
+        stats = controller.get_stats()
+        assert stats["shed"] == 2
+        assert stats["shed_by_priority"] == {"low": 1, "normal": 1}
+        assert stats["max_in_flight"] == 5
+
+    def test_sheds_by_loop_lag(self, controller, lag):
+        """测试事件循环延迟达到阈值时拒绝低优先级，达到两倍时拒绝普通优先级"""
+        lag(0.15)
+        assert controller.admit("expensive") == "loop_lag"
+        assert controller.admit("other") is None
+
+        lag(0.25)
+        assert controller.admit("other") == "loop_lag"
+        assert controller.admit("lookup") is None
+        assert controller.get_stats()["shed_by_reason"] == {"loop_lag": 2}
+
+        lag(0.0)
+        controller.release()
+        controller.release()
+        assert controller.pressure() == (LEVEL_OK, None)
+        assert controller.admit("expensive") is None
+
+    def test_shed_counts_do_not_keep_request_names(self, controller, lag):
+        """测试拒绝次数只按优先级统计，不记录客户端发送的名称"""
+        lag(0.25)
+        for index in range(100):
+            assert controller.admit(f"howtocook://recipe/{index}") == "loop_lag"
+
+        assert controller.shed == {("normal", "loop_lag"): 100}
+        text = render_openmetrics()
+        assert (
+            'howtocook_admission_shed_total{priority="normal",reason="loop_lag"} 100'
+            in text
+        )
+        assert "howtocook://recipe/" not in text
+
+    def test_disabled_admits_everything(self, lag):
+        """测试关闭时全部放行"""
+        lag(1.0)
+        controller = AdmissionController(
+            enabled=False, lag_threshold=0.1, max_in_flight=1, low_priority=["x"]
+        )
+
+        assert controller.admit("x") is None
+        assert controller.admit("x") is None
+        assert controller.get_stats()["shed"] == 0
+
+
+class TestAdmissionControlMiddleware:
+    """AdmissionControlMiddleware 测试类"""
+
+    @pytest.mark.asyncio
+    async def test_sheds_expensive_calls_under_load(self, controller, lag):
+        """测试进行中请求较多时拒绝开销大的工具，轻量查询不受影响"""
+        server = FastMCP("admission-test")
+        server.add_middleware(AdmissionControlMiddleware())
+        release = asyncio.Event()
+
+        @server.tool()
+        async def other():
+            await release.wait()
+            return "done"
+
+        @server.tool()
+        async def expensive():
+            return "expensive"
+
+        @server.tool()
+        async def lookup():
+            return "lookup"
+
+        async with Client(server) as client:
+            pending = [
+                asyncio.create_task(client.call_tool("other", {})) for _ in range(2)
+            ]
+            while controller.in_flight < 2:
+                await asyncio.sleep(0.001)
+
+            with pytest.raises(Exception, match="服务繁忙"):
+                await client.call_tool("expensive", {})
+            result = await client.call_tool("lookup", {})
+
+            release.set()
+            await asyncio.gather(*pending)
+
+        assert result.content[0].text == "lookup"
+        assert controller.in_flight == 0
+        assert controller.get_stats()["shed_by_priority"] == {"low": 1}
@@ -0,0 +1,147 @@
+"""
+多工作进程指标汇总单元测试
+"""
+
+import os
+import json
+import pytest
+import src.infrastructure.monitoring.aggregation as aggregation
+import src.infrastructure.monitoring.performance_monitor as performance_monitor
+from src.infrastructure.monitoring.aggregation import MetricsAggregator
+from src.infrastructure.monitoring.histogram import LatencyHistogram
+from src.infrastructure.monitoring.metrics_exporter import render_openmetrics
+
+
+def make_monitor(durations, failures=0):
+    """构造记录了指定耗时的性能监控器"""
+    monitor = performance_monitor.PerformanceMonitor()
+    for index, duration in enumerate(durations):
+        monitor.record("search", duration, success=index >= failures)
+    return monitor
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """共享同一个 SQLite 文件的两个汇总器，分别模拟两个工作进程"""
+    path = str(tmp_path / "metrics.sqlite3")
+    first = MetricsAggregator(path, interval=5, enabled=True, worker_id="host:1")
+    second = MetricsAggregator(path, interval=5, enabled=True, worker_id="host:2")
+    return first, second
+
+
+class TestHistogramSerialization:
+    """直方图序列化测试类"""
+
+    def test_round_trip(self):
+        """测试导出再恢复后统计信息不变"""
+        histogram = LatencyHistogram()
+        for value in (0.001, 0.01, 0.01, 0.5):
+            histogram.record(value)
+
+        restored = LatencyHistogram.from_dict(
+            json.loads(json.dumps(histogram.to_dict()))
+        )
+
+        assert restored.get_stats() == histogram.get_stats()
+        assert LatencyHistogram.from_dict(LatencyHistogram().to_dict()).count == 0
+
+    def test_invalid_bucket(self):
+        """测试桶下标越界时报错"""
+        data = LatencyHistogram().to_dict()
+        data["buckets"] = [[10**6, 1]]
+
+        with pytest.raises(ValueError):
+            LatencyHistogram.from_dict(data)
+
+
+class TestMetricsAggregator:
+    """MetricsAggregator 测试类"""
+
+    @pytest.mark.asyncio
+    async def test_merges_peer_snapshots(self, workers, monkeypatch):
+        """测试合并本进程实时数据和其他进程的快照"""
+        first, second = workers
+        monkeypatch.setattr(
+            performance_monitor, "_monitor", make_monitor([0.01] * 10, failures=2)
+        )
+        await first.refresh()
+        monkeypatch.setattr(performance_monitor, "_monitor", make_monitor([0.1] * 30))
+
+        assert await second.refresh() == 1
+        histogram, failures = second.merged_tools()["search"]
+        host = second.get_host_stats()
+
+        assert histogram.count == 40
+        assert failures == 2
+        assert host["workers"] == 2
+        assert host["detailed_stats"]["search"]["success_rate"] == 95.0
+        assert host["latency"]["p50"] == pytest.approx(0.1, rel=0.02)
+        # 本进程的数据在读取时实时合并，不依赖上一次发布
+        performance_monitor.get_monitor().record("search", 0.1)
+        assert second.merged_tools()["search"][0].count == 41
+
+    @pytest.mark.asyncio
+    async def test_stale_and_stopped_workers_excluded(self, workers, monkeypatch):
+        """测试过期快照不参与合并，停止的进程删除自己的快照"""
+        first, second = workers
+        monkeypatch.setattr(performance_monitor, "_monitor", make_monitor([0.01]))
+        await first.refresh()
+        await second.refresh()
+        assert second.worker_count == 2
+
+        updated_at, tools, caches = second.peers["host:1"]
+        second.peers["host:1"] = (updated_at - 60, tools, caches)
+        assert second.worker_count == 1
+
+        first.start()
+        await first.stop()
+        assert await second.refresh() == 0
+
+    @pytest.mark.asyncio
+    async def test_metrics_export_host_totals(self, workers, monkeypatch):
+        """测试开启汇总时指标端点导出主机级数据"""
+        first, second = workers
+        monkeypatch.setattr(performance_monitor, "_monitor", make_monitor([0.01] * 5))
+        await first.refresh()
+        monkeypatch.setattr(performance_monitor, "_monitor", make_monitor([0.01] * 7))
+        await second.refresh()
+        monkeypatch.setattr(aggregation, "_aggregator", second)
+
+        text = render_openmetrics()
+
+        assert "howtocook_workers 2" in text
+        assert 'howtocook_tool_calls_total{tool="search"} 12' in text
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="需要 POSIX 权限")
+    async def test_refuses_foreign_file(self, tmp_path, monkeypatch):
+        """测试共享文件不属于当前用户时不发布也不读取快照"""
+        path = tmp_path / "metrics.sqlite3"
+        path.touch()
+        monkeypatch.setattr(os, "getuid", lambda: os.stat(path).st_uid + 1)
+        aggregator = MetricsAggregator(str(path), interval=5, enabled=True)
+
+        with pytest.raises(PermissionError):
+            await aggregator.refresh()
+
+        assert aggregator.peers == {}
+        assert path.stat().st_size == 0
+
+    def test_disabled_by_default_with_one_worker(self):
+        """测试单工作进程时默认不开启"""
+        aggregator = MetricsAggregator(interval=5)
+
+        aggregator.start()
+
+        assert not aggregator.enabled
+        assert not aggregator.running
+        assert aggregator.get_stats()["peers"] == {}
+
+    def test_snapshot_is_json(self, monkeypatch):
+        """测试快照可以 JSON 序列化"""
+        monkeypatch.setattr(performance_monitor, "_monitor", make_monitor([0.2]))
+        aggregator = MetricsAggregator(interval=5, enabled=True)
+
+        snapshot = json.loads(json.dumps(aggregator.snapshot()))
+
+        assert snapshot["tools"]["search"]["histogram"]["count"] == 1
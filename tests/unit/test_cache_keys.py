@@ -0,0 +1,109 @@
+"""
+缓存键生成单元测试
+"""
+
+import hashlib
+import pytest
+from src.infrastructure.cache.keys import (
+    CacheKeyBuilder,
+    canonical_json,
+    dataset_version_namespace,
+)
+from src.infrastructure.cache.memory_cache import cached
+from src.infrastructure.dataset import get_dataset_state
+
+
+class Repository:
+    """测试用仓库类"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def fetch(self, category: str, limit: int = 10):
+        self.calls += 1
+        return f"{category}:{limit}"
+
+
+class TestCacheKeyBuilder:
+    """CacheKeyBuilder 测试类"""
+
+    def test_instance_methods_share_keys(self):
+        """测试实例方法跳过 self，不同实例生成相同的键"""
+        builder = CacheKeyBuilder(Repository.fetch, key_prefix="repo")
+
+        first = builder.build((Repository(), "荤菜"), {})
+        second = builder.build((Repository(),), {"category": "荤菜", "limit": 10})
+
+        assert first == second
+        assert first.startswith("repo:")
+        assert "0x" not in first
+
+    def test_keys_are_stable(self):
+        """测试键与参数顺序无关且不依赖进程内哈希"""
+        assert canonical_json({"b": [1, 2], "a": {"y", "x"}}) == (
+            '{"a":["x","y"],"b":[1,2]}'
+        )
+
+        builder = CacheKeyBuilder(Repository.fetch)
+        expected_digest = hashlib.sha256(
+            '{"category":"素菜","limit":5}'.encode("utf-8")
+        ).hexdigest()[:32]
+        assert builder.build((None, "素菜", 5), {}) == (
+            f"tests.unit.test_cache_keys.Repository.fetch:{expected_digest}"
+        )
+
+    def test_custom_key_func(self):
+        """测试自定义键函数"""
+        builder = CacheKeyBuilder(
+            Repository.fetch, key_func=lambda category, limit=10: category
+        )
+
+        assert builder.build((Repository(), "荤菜", 1), {}) == builder.build(
+            (Repository(), "荤菜", 99), {}
+        )
+
+    def test_unsupported_argument_type(self):
+        """测试无法稳定表示的参数会提示提供 key_func"""
+        builder = CacheKeyBuilder(Repository.fetch)
+
+        with pytest.raises(TypeError):
+            builder.build((Repository(), object()), {})
+
+    def test_dataset_namespace(self):
+        """测试按数据集版本划分命名空间"""
+        state = get_dataset_state()
+        previous = state.version
+        builder = CacheKeyBuilder(Repository.fetch, namespace=dataset_version_namespace)
+        try:
+            state.version = None
+            assert builder.build((Repository(), "荤菜"), {}) is None
+
+            state.version = "v1"
+            first = builder.build((Repository(), "荤菜"), {})
+            state.version = "v2"
+            second = builder.build((Repository(), "荤菜"), {})
+
+            assert ":dataset:v1:" in first
+            assert first != second
+        finally:
+            state.version = previous
+
+
+class TestCachedDecorator:
+    """cached 装饰器测试类"""
+
+    @pytest.mark.asyncio
+    async def test_instances_share_cache_entries(self):
+        """测试不同实例共享缓存结果"""
+
+        class Service:
+            calls = 0
+
+            @cached(ttl=60, key_prefix="test-share")
+            async def lookup(self, name: str):
+                Service.calls += 1
+                return name.upper()
+
+        assert await Service().lookup("a") == "A"
+        assert await Service().lookup(name="a") == "A"
+        assert Service.calls == 1
@@ -0,0 +1,140 @@
+"""
+二级缓存序列化和共享文件权限单元测试
+"""
+
+import os
+import stat
+import pickle
+import pytest
+from src.domain.models.recipe import Ingredient, Recipe
+from src.domain.repositories.recipe_repository import DatasetSnapshot
+import src.infrastructure.cache.private_files as private_files
+from src.infrastructure.cache import serialization
+from src.infrastructure.cache.memory_cache import MemoryCache, _Computed, _Tagged
+from src.infrastructure.cache.private_files import prepare_private_file
+from src.infrastructure.cache.sqlite_cache import SQLiteCache
+
+posix_only = pytest.mark.skipif(not hasattr(os, "getuid"), reason="需要 POSIX 权限")
+
+
+def make_recipe() -> Recipe:
+    """构造测试菜谱"""
+    return Recipe(
+        id="recipe-1",
+        name="番茄炒蛋",
+        description="测试",
+        source_path="test/path",
+        category="素菜",
+        difficulty=1,
+        tags=["家常"],
+        servings=2,
+        ingredients=[Ingredient(name="鸡蛋", text_quantity="2个")],
+        steps=[],
+    )
+
+
+class TestSerialization:
+    """缓存值编码测试类"""
+
+    def test_round_trip(self):
+        """测试缓存中出现的各类值编码后能原样还原"""
+        snapshot = DatasetSnapshot("abc", 1.5, [make_recipe()])
+        values = [
+            "text",
+            {"texts": ["a"], "structured_content": {"count": 1}},
+            [("内容", "text/plain"), (b"\x00\xff", "application/octet-stream")],
+            {1: "a", "__type__": "b"},
+            _Tagged(_Computed(snapshot, 0.25), ("dataset:abc",)),
+        ]
+
+        for value in values:
+            assert serialization.loads(serialization.dumps(value)) == value
+
+        restored = serialization.loads(serialization.dumps(_Computed(snapshot, 0)))
+        assert isinstance(restored.value, DatasetSnapshot)
+        assert isinstance(restored.value.recipes[0], Recipe)
+
+    def test_rejects_unregistered_types(self):
+        """测试未注册的类型既不能写入也不能读取"""
+
+        class Unknown:
+            pass
+
+        with pytest.raises(TypeError):
+            serialization.dumps(Unknown())
+        with pytest.raises(ValueError, match="os.system"):
+            serialization.loads(b'{"__type__": "os.system", "items": ["id"]}')
+        with pytest.raises(ValueError):
+            serialization.loads(pickle.dumps(("value", 0)))
+
+    @pytest.mark.asyncio
+    async def test_sqlite_ignores_foreign_payload(self, tmp_path):
+        """测试其他程序写入的 pickle 数据被当作读取失败"""
+        backend = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+        backend._set_sync(backend._full_key("key"), pickle.dumps("value"), 1e12)
+        cache = MemoryCache(enabled=True, default_ttl=60, l2=backend)
+
+        assert await cache.get("key") is None
+        assert backend.get_stats()["errors"] == 1
+        await backend.close()
+
+
+@posix_only
+class TestPrivateFiles:
+    """共享文件权限测试类"""
+
+    def test_creates_private_default_directory(self, tmp_path, monkeypatch):
+        """测试默认目录以 0700 创建，文件以 0600 创建"""
+        directory = tmp_path / "private"
+        monkeypatch.setattr(private_files, "private_data_dir", lambda: str(directory))
+        path = directory / "cache.sqlite3"
+
+        prepare_private_file(str(path))
+
+        assert stat.S_IMODE(directory.stat().st_mode) == 0o700
+        assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+    def test_tightens_existing_file(self, tmp_path):
+        """测试收紧已存在文件的权限"""
+        path = tmp_path / "cache.sqlite3"
+        path.touch(mode=0o666)
+        os.chmod(path, 0o666)
+
+        prepare_private_file(str(path))
+
+        assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+    def test_refuses_foreign_file(self, tmp_path, monkeypatch):
+        """测试拒绝使用其他用户的文件"""
+        path = tmp_path / "cache.sqlite3"
+        path.touch()
+        monkeypatch.setattr(os, "getuid", lambda: os.stat(path).st_uid + 1)
+
+        with pytest.raises(PermissionError):
+            prepare_private_file(str(path))
+
+    def test_refuses_symlink(self, tmp_path):
+        """测试不跟随指向其他文件的符号链接"""
+        target = tmp_path / "target"
+        target.touch()
+        link = tmp_path / "cache.sqlite3"
+        link.symlink_to(target)
+
+        with pytest.raises(OSError):
+            prepare_private_file(str(link))
+
+    @pytest.mark.asyncio
+    async def test_sqlite_cache_refuses_foreign_file(self, tmp_path, monkeypatch):
+        """测试 SQLite 缓存遇到其他用户的文件时退化为仅使用本地缓存"""
+        path = tmp_path / "cache.sqlite3"
+        path.touch()
+        monkeypatch.setattr(os, "getuid", lambda: os.stat(path).st_uid + 1)
+        backend = SQLiteCache(str(path))
+        cache = MemoryCache(enabled=True, default_ttl=60, l2=backend)
+
+        await cache.set("key", "value")
+
+        assert await cache.get("key") == "value"
+        assert backend.get_stats()["errors"] == 1
+        assert path.stat().st_size == 0
+        await backend.close()
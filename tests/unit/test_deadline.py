@@ -0,0 +1,207 @@
+"""
+请求截止时间单元测试
+"""
+
+import asyncio
+import json
+from unittest.mock import patch
+import pytest
+from fastmcp import Client, FastMCP
+from src.domain.models.recipe import Ingredient, Recipe
+from src.domain.services.recipe_service import RecipeService
+import src.infrastructure.cache.result_cache as result_cache
+from src.infrastructure.cache.result_cache import ResultCache, result_cached
+from src.infrastructure.dataset import get_dataset_state
+from src.infrastructure.deadline import (
+    DeadlineExceeded,
+    DeadlineScan,
+    check_deadline,
+    current_deadline,
+    deadline_scope,
+    is_partial,
+)
+from src.infrastructure.middleware import DeadlineMiddleware
+
+
+class ExpiringList(list):
+    """遍历到指定位置时使当前截止时间到期的列表"""
+
+    def __init__(self, items, expire_at):
+        super().__init__(items)
+        self.expire_at = expire_at
+
+    def __iter__(self):
+        for index, item in enumerate(super().__iter__()):
+            if index == self.expire_at and current_deadline() is not None:
+                current_deadline().soft_expires_at = 0
+            yield item
+
+
+def make_recipe(index: int) -> Recipe:
+    """构造包含鸡肉的菜谱"""
+    return Recipe(
+        id=f"recipe-{index}",
+        name=f"菜谱{index}",
+        description="测试",
+        source_path="test/path",
+        category="荤菜",
+        difficulty=1,
+        tags=[],
+        servings=2,
+        ingredients=[Ingredient(name="鸡肉", text_quantity="100g")],
+        steps=[],
+    )
+
+
+@pytest.fixture
+def dataset_version(monkeypatch):
+    """设置数据集版本并使用独立的工具结果缓存"""
+    monkeypatch.setattr(result_cache, "_result_cache", ResultCache(enabled=True))
+    monkeypatch.setattr(get_dataset_state(), "version", "test-version")
+
+
+class TestDeadline:
+    """截止时间上下文测试类"""
+
+    def test_scope_sets_and_restores(self):
+        """测试截止时间只在代码块内生效"""
+        assert current_deadline() is None
+        with deadline_scope(10) as deadline:
+            assert current_deadline() is deadline
+            assert 9 < deadline.remaining() <= 10
+            check_deadline()
+        assert current_deadline() is None
+
+    def test_nested_scope_does_not_extend(self):
+        """测试嵌套时不会延长外层截止时间"""
+        with deadline_scope(1) as outer:
+            with deadline_scope(10) as inner:
+                assert inner is outer
+            with deadline_scope(0.5) as shorter:
+                assert shorter is not outer
+
+    def test_check_raises_when_expired(self):
+        """测试到期后协作检查抛出 DeadlineExceeded"""
+        with deadline_scope(0):
+            with pytest.raises(DeadlineExceeded):
+                check_deadline()
+
+    def test_scan_truncates_and_annotates(self):
+        """测试遍历到期时提前停止，标记部分结果"""
+        with deadline_scope(10):
+            scan = DeadlineScan(ExpiringList(range(100), expire_at=40), interval=32)
+            items = list(scan)
+            result = scan.annotate({})
+
+            assert items == list(range(64))
+            assert scan.truncated
+            assert is_partial()
+        assert result["partial"] is True
+        assert "64/100" in result["partial_reason"]
+
+    def test_scan_without_deadline(self):
+        """测试不在请求中时完整遍历"""
+        scan = DeadlineScan(range(100))
+
+        assert len(list(scan)) == 100
+        assert scan.annotate({}) == {}
+        scan.raise_if_truncated()
+
+
+class TestDeadlineInServices:
+    """服务层协作检查测试类"""
+
+    @pytest.mark.asyncio
+    async def test_search_returns_flagged_partial_result(self, dataset_version):
+        """测试搜索临近截止时间时返回带标记的部分结果，且不缓存"""
+        service = RecipeService()
+        recipes = ExpiringList([make_recipe(i) for i in range(100)], expire_at=40)
+
+        with patch.object(
+            service.repository, "fetch_all_recipes", return_value=recipes
+        ):
+            with deadline_scope(10):
+                data = json.loads(await service.search_recipes_by_ingredients(["鸡肉"]))
+            assert data["partial"] is True
+            assert data["total_found"] == 64
+
+            # 部分结果未被缓存，无截止时间的请求得到完整结果
+            data = json.loads(await service.search_recipes_by_ingredients(["鸡肉"]))
+        assert data["total_found"] == 100
+        assert "partial" not in data
+
+    @pytest.mark.asyncio
+    async def test_search_without_results_times_out(self):
+        """测试截止时间已到且没有结果时抛出 DeadlineExceeded"""
+        service = RecipeService()
+
+        with patch.object(
+            service.repository, "fetch_all_recipes", return_value=[make_recipe(1)]
+        ):
+            with deadline_scope(0):
+                with pytest.raises(DeadlineExceeded):
+                    await service.search_recipes_by_tags(["不存在"])
+
+    @pytest.mark.asyncio
+    async def test_result_cache_skips_partial(self, dataset_version):
+        """测试部分结果不写入工具结果缓存"""
+        calls = []
+
+        @result_cached("deadline_test")
+        async def compute(value):
+            calls.append(value)
+            current_deadline().partial = len(calls) == 1
+            return value
+
+        with deadline_scope(10):
+            await compute(1)
+        with deadline_scope(10):
+            await compute(1)
+            await compute(1)
+
+        assert calls == [1, 1]
+
+
+class TestDeadlineMiddleware:
+    """DeadlineMiddleware 测试类"""
+
+    @pytest.mark.asyncio
+    async def test_cancels_hung_tool(self):
+        """测试超过截止时间仍在等待的工具被取消并返回超时错误"""
+        server = FastMCP("deadline-test")
+        middleware = DeadlineMiddleware(timeout=0.05)
+        server.add_middleware(middleware)
+
+        @server.tool()
+        async def hang():
+            await asyncio.sleep(10)
+
+        @server.tool()
+        async def fast():
+            return str(current_deadline() is not None)
+
+        async with Client(server) as client:
+            with pytest.raises(Exception, match="请求超时"):
+                await client.call_tool("hang", {})
+            result = await client.call_tool("fast", {})
+
+        assert result.content[0].text == "True"
+        assert middleware.get_stats()["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_counts_cooperative_timeouts(self):
+        """测试服务层抛出的 DeadlineExceeded 计入超时次数"""
+        server = FastMCP("deadline-test")
+        middleware = DeadlineMiddleware(timeout=10)
+        server.add_middleware(middleware)
+
+        @server.tool()
+        async def slow():
+            current_deadline().soft_expires_at = 0
+            check_deadline()
+
+        async with Client(server) as client:
+            with pytest.raises(Exception, match="请求超时"):
+                await client.call_tool("slow", {})
+
+        assert middleware.get_stats()["timeouts"] == 1
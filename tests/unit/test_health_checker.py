@@ -0,0 +1,174 @@
+"""
+HealthChecker 存活、就绪检查单元测试
+"""
+
+import time
+from unittest.mock import patch
+import pytest
+from starlette.testclient import TestClient
+import src.infrastructure.dataset.dataset_state as dataset_state
+import src.infrastructure.monitoring.health_checker as health_checker_module
+from src.domain.repositories.recipe_repository import DatasetSnapshot, RecipeRepository
+from src.infrastructure.monitoring.health_checker import HealthChecker
+
+
+class FakeRepository:
+    """记录加载次数的仓库替身"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def fetch_all_recipes(self):
+        self.calls += 1
+        dataset_state.get_dataset_state().mark_loaded("v1", 3)
+        return []
+
+
+class FailingRepository:
+    """上游不可用时的仓库替身"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def fetch_all_recipes(self):
+        self.calls += 1
+        dataset_state.get_dataset_state().mark_failed("连接超时")
+        return []
+
+
+class FakeCache:
+    """返回指定二级缓存状态的缓存替身"""
+
+    def __init__(self, l2=None):
+        self.l2 = l2
+
+    def get_stats(self):
+        return {"enabled": True, "l2": self.l2}
+
+
+@pytest.fixture
+def state(monkeypatch):
+    """替换全局数据集状态"""
+    instance = dataset_state.DatasetState()
+    monkeypatch.setattr(dataset_state, "_dataset_state", instance)
+    return instance
+
+
+@pytest.fixture
+def checker():
+    """使用仓库替身的健康检查器"""
+    instance = HealthChecker()
+    instance._recipe_repo = FakeRepository()
+    return instance
+
+
+class TestHealthChecks:
+    """存活、就绪检查测试类"""
+
+    def test_liveness(self, checker):
+        """测试存活检查"""
+        result = checker.check_liveness()
+
+        assert result["status"] == "alive"
+        assert result["uptime_seconds"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_not_ready_until_dataset_loaded(self, checker, state):
+        """测试数据集未加载时未就绪，并只在后台触发一次加载"""
+        first = checker.check_readiness()
+        second = checker.check_readiness()
+
+        assert first["ready"] is False
+        assert first["reasons"] == ["数据集尚未加载"]
+        assert second["ready"] is False
+
+        await checker._warmup
+        assert checker._recipe_repo.calls == 1
+        result = checker.check_readiness()
+        assert result["status"] == "ready"
+        assert result["dataset"]["version"] == "v1"
+
+    def test_failed_and_stale_dataset(self, checker, state):
+        """测试加载失败和数据过期时未就绪"""
+        state.mark_loaded("v1", 3, loaded_at=time.time() - 10**6)
+        stale = checker.check_readiness()
+        assert stale["ready"] is False
+        assert "未刷新" in stale["reasons"][0]
+
+        state.mark_failed("连接超时")
+        failed = checker.check_readiness()
+        assert failed["reasons"] == ["数据集加载失败: 连接超时"]
+
+    @pytest.mark.asyncio
+    async def test_stale_dataset_recovers_after_refetch_of_same_version(self, state):
+        """测试数据集过期后重新拉取到相同版本时恢复就绪"""
+        state.mark_loaded("abc", 3, loaded_at=time.time() - 3 * 3600)
+        checker = HealthChecker()
+        checker._recipe_repo = RecipeRepository()
+        fresh = DatasetSnapshot("abc", time.time(), [])
+
+        with patch.object(checker._recipe_repo, "_fetch_dataset", return_value=fresh):
+            stale = checker.check_readiness()
+            assert stale["ready"] is False
+            await checker._warmup
+
+        result = checker.check_readiness()
+        assert result["ready"] is True
+        assert result["dataset"]["version"] == "abc"
+        assert result["dataset"]["age_seconds"] < 60
+
+    @pytest.mark.asyncio
+    async def test_warmup_backs_off_while_upstream_fails(self, state):
+        """测试上游故障期间频繁探测不会每次都触发下载，连续失败时间隔加倍"""
+        checker = HealthChecker()
+        checker._recipe_repo = FailingRepository()
+
+        for _ in range(10):
+            checker.check_readiness()
+            await checker._warmup
+        assert checker._recipe_repo.calls == 1
+
+        interval = (
+            health_checker_module.get_config().monitoring.readiness_warmup_interval
+        )
+        checker._warmup_started_at -= interval
+        checker.check_readiness()
+        await checker._warmup
+        assert checker._recipe_repo.calls == 1
+
+        checker._warmup_started_at -= interval
+        checker.check_readiness()
+        await checker._warmup
+        assert checker._recipe_repo.calls == 2
+        assert checker._warmup_failures == 2
+
+    def test_open_breaker_is_degraded(self, checker, state, monkeypatch):
+        """测试二级缓存熔断时仍就绪但标记为降级"""
+        state.mark_loaded("v1", 3)
+        monkeypatch.setattr(
+            health_checker_module, "get_cache", lambda: FakeCache({"available": False})
+        )
+        monkeypatch.setattr(health_checker_module, "get_result_cache", FakeCache)
+
+        result = checker.check_readiness()
+
+        assert result["ready"] is True
+        assert result["status"] == "degraded"
+        assert result["circuit_breakers"] == {"cache": "open"}
+
+
+class TestHealthRoutes:
+    """健康检查 HTTP 端点测试类"""
+
+    def test_readiness_status_codes(self, state, monkeypatch):
+        """测试就绪端点在未就绪时返回 503"""
+        from src.core.app import create_app
+
+        monkeypatch.setattr(HealthChecker, "_schedule_warmup", lambda self: None)
+        client = TestClient(create_app().http_app())
+
+        assert client.get("/healthz").json()["status"] == "alive"
+        assert client.get("/readyz").status_code == 503
+
+        state.mark_loaded("v1", 3)
+        assert client.get("/readyz").status_code == 200
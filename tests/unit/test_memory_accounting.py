@@ -0,0 +1,99 @@
+"""
+子系统内存统计单元测试
+"""
+
+import pytest
+from unittest.mock import patch
+from src.domain.models.recipe import Recipe
+from src.domain.repositories.recipe_repository import DatasetSnapshot
+from src.infrastructure.cache import sizing
+from src.infrastructure.cache.memory_cache import MemoryCache, _Computed
+from src.infrastructure.cache.sizing import estimate_size, estimate_size_async
+from src.infrastructure.monitoring.memory import MemoryAccountant, read_rss_bytes
+
+
+def make_dataset(count: int):
+    """构造嵌套的测试数据"""
+    return [
+        {"name": f"菜谱{i}", "ingredients": [f"食材{j}" for j in range(5)]}
+        for i in range(count)
+    ]
+
+
+class TestMemoryAccountant:
+    """MemoryAccountant 测试类"""
+
+    @pytest.mark.asyncio
+    async def test_async_estimate_matches_sync(self):
+        """测试分批让出事件循环的估算结果与同步估算一致"""
+        dataset = make_dataset(500)
+
+        assert await estimate_size_async(dataset, batch_size=100) == estimate_size(
+            dataset
+        )
+
+    @pytest.mark.asyncio
+    async def test_snapshot_size_computed_once(self):
+        """测试数据集快照使用拉取时估算的大小，写入缓存时不再遍历菜谱"""
+        recipes = [
+            Recipe(
+                id=f"recipe-{i}",
+                name=f"菜谱{i}",
+                description="测试",
+                source_path="test/path",
+                category="素菜",
+                difficulty=1,
+                tags=[],
+                servings=2,
+                ingredients=[],
+                steps=[],
+            )
+            for i in range(50)
+        ]
+        size = await estimate_size_async(recipes)
+        snapshot = DatasetSnapshot("abc", 1.5, recipes, size)
+        cache = MemoryCache(enabled=True, default_ttl=60)
+
+        with patch.object(sizing, "_referents", wraps=sizing._referents) as referents:
+            await cache.set("dataset", _Computed(snapshot, 0.1))
+
+        # 只展开 _Computed 和其中的计算耗时，快照使用预先计算的大小
+        assert [call.args[0] for call in referents.call_args_list] == [
+            _Computed(snapshot, 0.1),
+            0.1,
+        ]
+        assert size <= cache.get_stats()["total_bytes"] < size + 1024
+        # 大小未知的快照仍按引用对象逐个估算
+        assert estimate_size(DatasetSnapshot("abc", 1.5, recipes)) > size
+
+    @pytest.mark.asyncio
+    async def test_shared_objects_counted_once(self):
+        """测试多个子系统共享的对象只计入先注册的子系统"""
+        dataset = make_dataset(200)
+        accountant = MemoryAccountant(interval=0)
+        accountant.register("dataset", lambda: dataset)
+        accountant.register("alias", lambda: {"same": dataset})
+        accountant.register("missing", lambda: None)
+
+        usage = await accountant.measure()
+
+        assert usage["dataset"] == estimate_size(dataset)
+        assert usage["alias"] < usage["dataset"] / 10
+        assert usage["missing"] == 0
+        assert {"cache_index", "cache_entries", "metrics"} <= set(usage)
+
+    @pytest.mark.asyncio
+    async def test_stats_report_last_measurement(self):
+        """测试统计结果只在估算后更新"""
+        accountant = MemoryAccountant(interval=0)
+        assert accountant.get_stats()["updated_at"] is None
+
+        accountant.start()
+        assert not accountant.running
+
+        await accountant.measure()
+        stats = accountant.get_stats()
+        assert stats["updated_at"] is not None
+        assert stats["total_bytes"] == sum(stats["subsystems"].values())
+        # 不支持读取常驻内存的平台上为 None
+        assert (stats["rss_bytes"] is None) == (read_rss_bytes() is None)
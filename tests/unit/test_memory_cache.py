@@ -0,0 +1,580 @@
+"""
+MemoryCache 单元测试
+"""
+
+import time
+import asyncio
+import pytest
+from starlette.testclient import TestClient
+from src.core.app import create_app
+from src.core.lifespan import app_lifespan, http_middleware
+from src.infrastructure.cache.backend import CacheBackend
+from src.infrastructure.cache.memory_cache import MemoryCache
+from src.infrastructure.cache.sizing import estimate_size
+from src.infrastructure.cache.sqlite_cache import SQLiteCache
+from src.infrastructure.cache.sweeper import CacheSweeper, get_sweeper
+
+
+class GatedBackend(CacheBackend):
+    """字典实现的二级缓存，读写在 gate 打开前挂起，用于构造并发交错"""
+
+    name = "gated"
+
+    def __init__(self):
+        self.data = {}
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.waiting = 0
+
+    async def _wait(self):
+        self.waiting += 1
+        try:
+            await self.gate.wait()
+        finally:
+            self.waiting -= 1
+
+    async def wait_for_waiters(self, count):
+        """等待指定数量的操作挂起"""
+        while self.waiting < count:
+            await asyncio.sleep(0)
+
+    async def get(self, key):
+        # 读取的是挂起前的数据，模拟在并发写入之前完成的远程读取
+        result = self.data.get(key)
+        await self._wait()
+        return result
+
+    async def set(self, key, value, expires_at):
+        await self._wait()
+        self.data[key] = (value, expires_at)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def clear(self):
+        self.data.clear()
+
+    def get_stats(self):
+        return {"backend": self.name}
+
+
+class TestMemoryCache:
+    """MemoryCache 测试类"""
+
+    @pytest.mark.asyncio
+    async def test_lru_evicts_least_recently_used(self):
+        """测试 LRU 策略淘汰最久未访问的缓存项"""
+        cache = MemoryCache(
+            enabled=True, default_ttl=60, max_entries=2, eviction_policy="lru"
+        )
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")
+        await cache.set("c", 3)
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == 1
+        assert await cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lfu_evicts_least_frequently_used(self):
+        """测试 LFU 策略淘汰访问次数最少的缓存项"""
+        cache = MemoryCache(
+            enabled=True, default_ttl=60, max_entries=2, eviction_policy="lfu"
+        )
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")
+        await cache.get("a")
+        await cache.get("b")
+        await cache.set("c", 3)
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == 1
+        assert await cache.get("c") == 3
+
+    @pytest.mark.asyncio
+    async def test_lfu_after_delete(self):
+        """测试删除最低频次缓存项后仍能正确淘汰"""
+        cache = MemoryCache(
+            enabled=True, default_ttl=60, max_entries=2, eviction_policy="lfu"
+        )
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("b")
+        await cache.delete("a")
+        await cache.set("c", 3)
+        await cache.get("c")
+        await cache.get("c")
+        await cache.set("d", 4)
+
+        assert await cache.get("b") is None
+        assert await cache.get("c") == 3
+        assert await cache.get("d") == 4
+
+    @pytest.mark.asyncio
+    async def test_max_bytes_budget(self):
+        """测试估算内存上限"""
+        value = "x" * 100
+        cache = MemoryCache(
+            enabled=True, default_ttl=60, max_bytes=estimate_size(value) * 3
+        )
+        for index in range(5):
+            await cache.set(f"key{index}", value)
+
+        stats = cache.get_stats()
+        assert stats["total_items"] == 3
+        assert stats["total_bytes"] <= stats["max_bytes"]
+        assert stats["evictions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_overwrite_updates_accounting(self):
+        """测试覆盖写入时内存统计保持准确"""
+        cache = MemoryCache(enabled=True, default_ttl=60)
+        await cache.set("a", "x" * 100)
+        await cache.set("a", "y")
+
+        assert cache.get_stats()["total_bytes"] == estimate_size("y")
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_counts_as_miss(self):
+        """测试过期缓存项视为未命中"""
+        cache = MemoryCache(enabled=True, default_ttl=60)
+        await cache.set("a", 1)
+        cache._cache["a"].expires_at = time.time() - 1
+
+        assert await cache.get("a") is None
+        stats = cache.get_stats()
+        assert stats["expirations"] == 1
+        assert stats["misses"] == 1
+        assert stats["total_items"] == 0
+
+    def test_invalid_policy(self):
+        """测试不支持的淘汰策略"""
+        with pytest.raises(ValueError):
+            MemoryCache(enabled=True, eviction_policy="fifo")
+
+    @pytest.mark.asyncio
+    async def test_cleanup_expired_in_batches(self):
+        """测试分批清理过期缓存项"""
+        cache = MemoryCache(enabled=True, default_ttl=60)
+        for index in range(10):
+            await cache.set(f"old{index}", index)
+        await cache.set("fresh", "value")
+        for index in range(10):
+            cache._cache[f"old{index}"].expires_at = time.time() - 1
+        cache._rebuild_expiry_heap()
+
+        reclaimed = await cache.cleanup_expired(batch_size=3)
+
+        assert reclaimed == 10
+        assert await cache.get("fresh") == "value"
+        assert cache.get_stats()["total_items"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cleanup_skips_overwritten_entries(self):
+        """测试覆盖写入后旧的过期记录不会删除新值"""
+        cache = MemoryCache(enabled=True, default_ttl=60)
+        await cache.set("a", 1, ttl=1)
+        await cache.set("a", 2, ttl=60)
+        cache._expiry_heap = [(time.time() - 1, "a")] + cache._expiry_heap
+
+        assert await cache.cleanup_expired() == 0
+        assert await cache.get("a") == 2
+
+
+class TestTwoTierCache:
+    """本地缓存 + SQLite 二级缓存测试类"""
+
+    @staticmethod
+    def make_worker(path, ttl=60):
+        """模拟一个工作进程中的缓存实例"""
+        return MemoryCache(enabled=True, default_ttl=ttl, l2=SQLiteCache(str(path)))
+
+    @pytest.mark.asyncio
+    async def test_read_through_from_other_worker(self, tmp_path):
+        """测试一个工作进程写入的结果可被另一个工作进程读取并回填本地缓存"""
+        path = tmp_path / "cache.sqlite3"
+        first = self.make_worker(path)
+        second = self.make_worker(path)
+
+        await first.set("recipes", ["红烧肉"])
+
+        assert await second.get("recipes") == ["红烧肉"]
+        assert "recipes" in second._cache
+        assert second._l2.hits == 1
+        # 回填后直接命中本地缓存，不再访问二级缓存
+        assert await second.get("recipes") == ["红烧肉"]
+        assert second._l2.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_read_through_keeps_remaining_ttl(self, tmp_path):
+        """测试回填本地缓存时沿用二级缓存中的过期时间"""
+        path = tmp_path / "cache.sqlite3"
+        first = self.make_worker(path)
+        second = self.make_worker(path, ttl=3600)
+
+        await first.set("a", 1, ttl=10)
+        await second.get("a")
+
+        assert second._cache["a"].expires_at <= time.time() + 10
+
+    @pytest.mark.asyncio
+    async def test_expired_l2_entry_is_miss(self, tmp_path):
+        """测试二级缓存中已过期的项视为未命中"""
+        path = tmp_path / "cache.sqlite3"
+        first = self.make_worker(path)
+        second = self.make_worker(path)
+
+        await first.set("a", 1, ttl=-1)
+
+        assert await second.get("a") is None
+        assert await second._l2.cleanup_expired() == 1
+
+    @pytest.mark.asyncio
+    async def test_delete_and_clear_apply_to_both_tiers(self, tmp_path):
+        """测试删除和清空同时作用于两级缓存"""
+        path = tmp_path / "cache.sqlite3"
+        first = self.make_worker(path)
+        second = self.make_worker(path)
+        other = MemoryCache(
+            enabled=True, default_ttl=60, l2=SQLiteCache(str(path), namespace="other")
+        )
+
+        await first.set("a", 1)
+        await first.set("b", 2)
+        await other.set("a", "other")
+        await first.delete("a")
+        assert await second.get("a") is None
+
+        await first.clear()
+        assert await second.get("b") is None
+        # 其他命名空间不受影响
+        assert await other.get("a") == "other"
+
+    @pytest.mark.asyncio
+    async def test_batch_read_through(self, tmp_path):
+        """测试批量读取时本地未命中的键一次性从二级缓存读取"""
+        path = tmp_path / "cache.sqlite3"
+        first = self.make_worker(path)
+        second = self.make_worker(path)
+        await first.set_many({"a": 1, "b": 2})
+        await second.set("c", 3)
+
+        assert await second.get_many(["a", "b", "c", "d"]) == {"a": 1, "b": 2, "c": 3}
+        assert second._l2.hits == 2
+        assert second._l2.misses == 1
+
+    @pytest.mark.asyncio
+    async def test_l2_failure_falls_back_to_miss(self, tmp_path):
+        """测试二级缓存不可用时退化为本地缓存"""
+        cache = self.make_worker(tmp_path / "missing" / "cache.sqlite3")
+
+        await cache.set("a", 1)
+
+        assert await cache.get("a") == 1
+        assert await cache.get("b") is None
+        assert cache.get_stats()["l2"]["errors"] == 2
+
+
+class TestConcurrency:
+    """读不加锁与分段写锁测试类"""
+
+    @staticmethod
+    def keys_by_stripe(cache):
+        """按所在分段对一批键分组"""
+        stripes = {}
+        for index in range(100):
+            key = f"key{index}"
+            stripes.setdefault(cache._stripe(key), []).append(key)
+        return stripes
+
+    @pytest.mark.asyncio
+    async def test_get_does_not_wait_for_write_lock(self):
+        """测试持有写锁期间读操作仍立即返回"""
+        cache = MemoryCache(enabled=True, default_ttl=60, lock_stripes=1)
+        await cache.set("a", 1)
+
+        async with cache._write_lock("a"):
+            assert await asyncio.wait_for(cache.get("a"), 0.1) == 1
+            assert await asyncio.wait_for(cache.get_many(["a"]), 0.1) == {"a": 1}
+
+    @pytest.mark.asyncio
+    async def test_writes_to_different_stripes_do_not_serialize(self):
+        """测试不同分段的写入同时等待二级缓存，同一分段的写入按顺序排队"""
+        backend = GatedBackend()
+        cache = MemoryCache(enabled=True, default_ttl=60, lock_stripes=2, l2=backend)
+        stripes = self.keys_by_stripe(cache)
+        first, same = stripes[0][:2]
+        second = stripes[1][0]
+        backend.gate.clear()
+
+        tasks = [
+            asyncio.create_task(cache.set(first, 1)),
+            asyncio.create_task(cache.set(second, 2)),
+        ]
+        await backend.wait_for_waiters(2)
+        queued = asyncio.create_task(cache.set(same, 3))
+        await asyncio.sleep(0.01)
+
+        # 两个分段的写穿同时进行，同分段的第三个写入仍在等待写锁
+        assert backend.waiting == 2
+        assert not queued.done()
+        assert same not in cache._cache
+
+        backend.gate.set()
+        await asyncio.gather(*tasks, queued)
+        assert {key: value for key, (value, _) in backend.data.items()} == {
+            first: 1,
+            second: 2,
+            same: 3,
+        }
+
+    @pytest.mark.asyncio
+    async def test_read_through_fills_without_write_lock(self):
+        """测试同一分段有写入等待二级缓存时，其他键仍能读穿并回填本地缓存"""
+        backend = GatedBackend()
+        cache = MemoryCache(enabled=True, default_ttl=60, lock_stripes=1, l2=backend)
+        backend.data["b"] = ("remote", time.time() + 60)
+        backend.gate.clear()
+        writer = asyncio.create_task(cache.set("a", 1))
+        await backend.wait_for_waiters(1)
+
+        reader = asyncio.create_task(cache.get("b"))
+        await backend.wait_for_waiters(2)
+        backend.gate.set()
+
+        assert await asyncio.wait_for(reader, 0.1) == "remote"
+        assert cache._cache["b"].value == "remote"
+        await writer
+
+    @pytest.mark.asyncio
+    async def test_read_through_does_not_restore_deleted_key(self):
+        """测试读穿期间键被删除时，读到的旧值不回填本地缓存"""
+        backend = GatedBackend()
+        cache = MemoryCache(enabled=True, default_ttl=60, l2=backend)
+        backend.data["a"] = ("old", time.time() + 60)
+        backend.gate.clear()
+
+        reader = asyncio.create_task(cache.get("a"))
+        await backend.wait_for_waiters(1)
+        await cache.delete("a")
+        backend.gate.set()
+
+        assert await reader == "old"
+        assert "a" not in cache._cache
+        assert await cache.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_read_through_does_not_overwrite_newer_write(self):
+        """测试读穿期间键被写入新值时，读到的旧值不覆盖本地缓存"""
+        backend = GatedBackend()
+        cache = MemoryCache(enabled=True, default_ttl=60, l2=backend)
+        backend.data["a"] = ("old", time.time() + 60)
+        backend.gate.clear()
+
+        reader = asyncio.create_task(cache.get_many(["a"]))
+        await backend.wait_for_waiters(1)
+        writer = asyncio.create_task(cache.set("a", "new"))
+        await backend.wait_for_waiters(2)
+        backend.gate.set()
+        await asyncio.gather(reader, writer)
+
+        assert cache._cache["a"].value == "new"
+        assert await cache.get("a") == "new"
+
+
+class TestTagInvalidation:
+    """按标签失效测试类"""
+
+    @pytest.mark.asyncio
+    async def test_invalidate_tag_only_removes_tagged_entries(self):
+        """测试按标签失效只删除带该标签的缓存项"""
+        cache = MemoryCache(enabled=True, default_ttl=60)
+        await cache.set("a", 1, tags=["dataset:v1", "tool:search"])
+        await cache.set("b", 2, tags=["dataset:v1"])
+        await cache.set("c", 3, tags=["dataset:v2"])
+        await cache.set("d", 4)
+
+        assert await cache.invalidate_tag("dataset:v1") == 2
+        assert await cache.invalidate_tag("dataset:v1") == 0
+
+        assert await cache.get("a") is None
+        assert await cache.get("b") is None
+        assert await cache.get("c") == 3
+        assert await cache.get("d") == 4
+        # 被删除项的其他标签也同步清理
+        assert "tool:search" not in cache._tags
+        assert cache.get_stats()["invalidations"] == 2
+
+    @pytest.mark.asyncio
+    async def test_tag_index_follows_overwrite_and_eviction(self):
+        """测试覆盖写入和淘汰后标签索引保持一致"""
+        cache = MemoryCache(
+            enabled=True, default_ttl=60, max_entries=2, eviction_policy="lru"
+        )
+        await cache.set("a", 1, tags=["old"])
+        await cache.set("a", 1, tags=["new"])
+        await cache.set("b", 2, tags=["new"])
+        await cache.set("c", 3, tags=["new"])
+
+        assert "old" not in cache._tags
+        assert cache._tags["new"] == {"b", "c"}
+        assert await cache.invalidate_tag("new") == 2
+        assert cache.get_stats()["total_items"] == 0
+
+    @pytest.mark.asyncio
+    async def test_tags_survive_l2_read_through(self, tmp_path):
+        """测试从二级缓存回填的缓存项保留标签"""
+        path = tmp_path / "cache.sqlite3"
+        first = MemoryCache(enabled=True, default_ttl=60, l2=SQLiteCache(str(path)))
+        second = MemoryCache(enabled=True, default_ttl=60, l2=SQLiteCache(str(path)))
+        await first.set("a", {"name": "红烧肉"}, tags=["dataset:v1"])
+
+        assert await second.get("a") == {"name": "红烧肉"}
+        assert await second.invalidate_tag("dataset:v1") == 1
+
+
+class TestStampedeProtection:
+    """缓存击穿保护测试类"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_compute_once(self):
+        """测试并发未命中只计算一次"""
+        cache = MemoryCache(enabled=True, default_ttl=60)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(
+            *(cache.get_or_compute("hot", compute) for _ in range(10))
+        )
+
+        assert results == ["value"] * 10
+        assert len(calls) == 1
+        assert cache.get_stats()["coalesced"] == 9
+        assert cache.get_stats()["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_leader_cancellation_does_not_cancel_followers(self):
+        """测试发起计算的调用方被取消后其他等待方仍能拿到结果"""
+        cache = MemoryCache(enabled=True, default_ttl=60)
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return "value"
+
+        leader = asyncio.ensure_future(cache.get_or_compute("hot", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.get_or_compute("hot", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        release.set()
+
+        assert await follower == "value"
+        assert await cache.get("hot") is not None
+
+    @pytest.mark.asyncio
+    async def test_early_refresh_single_caller(self, monkeypatch):
+        """测试提前刷新时只有一个调用方重新计算，其余调用方拿到当前值"""
+        cache = MemoryCache(enabled=True, default_ttl=60)
+        await cache.get_or_compute("hot", self._constant("old"))
+        entry = cache._cache["hot"]
+        # 计算耗时 1 秒、距过期 0.5 秒，rand=0.5 时 delta*beta*ln(rand)≈0.69 秒，触发刷新
+        entry.value = entry.value._replace(delta=1.0)
+        entry.expires_at = time.time() + 0.5
+        monkeypatch.setattr("random.random", lambda: 0.5)
+        release = asyncio.Event()
+        calls = []
+
+        async def refresh():
+            calls.append(1)
+            await release.wait()
+            return "new"
+
+        refresher = asyncio.ensure_future(cache.get_or_compute("hot", refresh))
+        await asyncio.sleep(0)
+        others = [await cache.get_or_compute("hot", refresh) for _ in range(5)]
+        release.set()
+
+        assert others == ["old"] * 5
+        assert await refresher == "new"
+        assert len(calls) == 1
+        assert cache.get_stats()["early_refreshes"] == 1
+        assert await cache.get_or_compute("hot", refresh) == "new"
+
+    @pytest.mark.asyncio
+    async def test_early_refresh_disabled_and_failure(self, monkeypatch):
+        """测试 beta=0 时不提前刷新，刷新失败时继续返回当前值"""
+        cache = MemoryCache(enabled=True, default_ttl=60)
+        await cache.get_or_compute("hot", self._constant("old"))
+        entry = cache._cache["hot"]
+        entry.value = entry.value._replace(delta=1.0)
+        entry.expires_at = time.time() + 0.5
+        monkeypatch.setattr("random.random", lambda: 0.5)
+
+        async def failing():
+            raise RuntimeError("数据源不可用")
+
+        assert await cache.get_or_compute("hot", failing, beta=0) == "old"
+        assert await cache.get_or_compute("hot", failing) == "old"
+        assert cache.get_stats()["early_refreshes"] == 1
+
+    @staticmethod
+    def _constant(value):
+        async def compute():
+            return value
+
+        return compute
+
+
+class TestCacheSweeper:
+    """CacheSweeper 测试类"""
+
+    @pytest.mark.asyncio
+    async def test_run_once_reports_reclaimed(self):
+        """测试单轮清理统计回收数量"""
+        cache = MemoryCache(enabled=True, default_ttl=60)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        cache._cache["a"].expires_at = time.time() - 1
+        cache._rebuild_expiry_heap()
+        sweeper = CacheSweeper({"test": cache}, interval=60, batch_size=10)
+
+        reclaimed = await sweeper.run_once()
+
+        assert reclaimed == {"test": 1}
+        stats = sweeper.get_stats()
+        assert stats["cycles"] == 1
+        assert stats["total_reclaimed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lifespan_starts_and_stops_sweeper(self):
+        """测试应用生命周期启动和停止后台清理"""
+        sweeper = get_sweeper()
+        async with app_lifespan(None):
+            async with app_lifespan(None):
+                assert sweeper.running
+            assert sweeper.running
+        assert not sweeper.running
+
+    def test_http_lifespan_runs_tasks_once_per_process(self):
+        """测试 HTTP 服务在应用生命周期中启停后台任务，会话结束时不停止"""
+        sweeper = get_sweeper()
+        http_app = create_app().http_app(middleware=http_middleware())
+
+        with TestClient(http_app) as client:
+            assert sweeper.running
+
+            async def session():
+                async with app_lifespan(None):
+                    pass
+
+            client.portal.call(session)
+            assert sweeper.running
+        assert not sweeper.running
@@ -0,0 +1,155 @@
+"""
+OpenMetrics 指标导出单元测试
+"""
+
+import time
+import asyncio
+import pytest
+from starlette.testclient import TestClient
+import src.infrastructure.dataset.dataset_state as dataset_state
+import src.infrastructure.monitoring.loop_lag as loop_lag
+import src.infrastructure.monitoring.performance_monitor as performance_monitor
+from src.infrastructure.monitoring.histogram import LatencyHistogram
+from src.infrastructure.monitoring.metrics_exporter import (
+    CONTENT_TYPE,
+    render_openmetrics,
+)
+
+
+@pytest.fixture
+def isolated_metrics(monkeypatch):
+    """替换全局监控器和数据集状态，避免受其他测试影响"""
+    monitor = performance_monitor.PerformanceMonitor()
+    state = dataset_state.DatasetState()
+    lag_monitor = loop_lag.LoopLagMonitor(interval=0)
+    monkeypatch.setattr(performance_monitor, "_monitor", monitor)
+    monkeypatch.setattr(dataset_state, "_dataset_state", state)
+    monkeypatch.setattr(loop_lag, "_loop_lag_monitor", lag_monitor)
+    return monitor, state, lag_monitor
+
+
+def sample_lines(text):
+    """提取样本行"""
+    return [line for line in text.splitlines() if not line.startswith("#")]
+
+
+class TestCumulativeCounts:
+    """LatencyHistogram.cumulative_counts 测试类"""
+
+    def test_counts_are_cumulative(self):
+        """测试各边界的累计计数"""
+        histogram = LatencyHistogram()
+        for value in (0.002, 0.02, 0.02, 0.2, 2.0):
+            histogram.record(value)
+
+        assert histogram.cumulative_counts((0.001, 0.01, 0.1, 1.0, 10.0)) == [
+            0,
+            1,
+            3,
+            4,
+            5,
+        ]
+
+
+class TestRenderOpenMetrics:
+    """render_openmetrics 测试类"""
+
+    def test_tool_histogram_and_counters(self, isolated_metrics):
+        """测试工具直方图、调用和失败计数"""
+        monitor, _, _ = isolated_metrics
+        monitor.record("search_recipes", 0.02)
+        monitor.record("search_recipes", 0.3, success=False, error_message="超时")
+
+        lines = sample_lines(render_openmetrics())
+
+        assert (
+            'howtocook_tool_duration_seconds_bucket{tool="search_recipes",le="0.025"} 1'
+            in lines
+        )
+        assert (
+            'howtocook_tool_duration_seconds_bucket{tool="search_recipes",le="+Inf"} 2'
+            in lines
+        )
+        assert 'howtocook_tool_duration_seconds_count{tool="search_recipes"} 2' in lines
+        assert 'howtocook_tool_calls_total{tool="search_recipes"} 2' in lines
+        assert 'howtocook_tool_errors_total{tool="search_recipes"} 1' in lines
+
+    def test_dataset_and_loop_lag(self, isolated_metrics):
+        """测试数据集版本、年龄和事件循环延迟"""
+        _, state, lag_monitor = isolated_metrics
+        state.mark_loaded("abc123", 42)
+        lag_monitor.record(0.05)
+
+        text = render_openmetrics()
+        lines = sample_lines(text)
+
+        assert "# TYPE howtocook_dataset info" in text
+        assert 'howtocook_dataset_info{version="abc123"} 1' in lines
+        assert "howtocook_dataset_recipes 42" in lines
+        assert any(line.startswith("howtocook_dataset_age_seconds ") for line in lines)
+        assert "howtocook_event_loop_lag_seconds_count 1" in lines
+        assert "howtocook_event_loop_lag_max_seconds 0.05" in lines
+        assert text.endswith("# EOF\n")
+
+    def test_label_values_are_escaped(self, isolated_metrics):
+        """测试标签值中的引号、反斜杠和换行被转义"""
+        monitor, _, _ = isolated_metrics
+        monitor.record('a"b\\c\nd', 0.01)
+
+        assert (
+            'howtocook_tool_calls_total{tool="a\\"b\\\\c\\nd"} 1'
+            in render_openmetrics()
+        )
+
+
+class TestLoopLagMonitor:
+    """LoopLagMonitor 测试类"""
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_is_measured(self):
+        """测试同步阻塞导致的调度延迟被记录"""
+        monitor = loop_lag.LoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+
+        assert not monitor.running
+        assert monitor.max_lag >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_stall_attributed_to_tool(self, isolated_metrics):
+        """测试阻塞超过阈值时采集调用栈并归属到被跟踪的工具"""
+
+        @performance_monitor.performance_tracked("slow_tool")
+        async def slow_tool():
+            await asyncio.sleep(0)
+            time.sleep(0.2)
+
+        monitor = loop_lag.LoopLagMonitor(interval=0.01, threshold=0.05)
+        monitor.start()
+        await asyncio.sleep(0.02)
+        await slow_tool()
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+
+        assert monitor.stalls_by_tool == {"slow_tool": 1}
+        (stall,) = monitor.recent_stalls
+        assert stall["lag"] >= 0.15
+        assert any("in slow_tool" in line for line in stall["stack"])
+
+
+class TestMetricsRoute:
+    """指标 HTTP 端点测试类"""
+
+    def test_metrics_endpoint(self, isolated_metrics):
+        """测试 streamable-http 应用上的指标端点"""
+        from src.core.app import create_app
+
+        client = TestClient(create_app().http_app())
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == CONTENT_TYPE
+        assert response.text.endswith("# EOF\n")
@@ -0,0 +1,92 @@
+"""
+工具响应大小统计单元测试
+"""
+
+import json
+import pytest
+from fastmcp import Client, FastMCP
+from mcp.types import ImageContent, TextContent
+import src.infrastructure.monitoring.payload as payload
+from src.infrastructure.middleware import PayloadSizeMiddleware
+from src.infrastructure.middleware.payload_size import encoded_size
+from src.infrastructure.monitoring.metrics_exporter import render_openmetrics
+from src.infrastructure.monitoring.payload import PayloadStats, count_items
+
+
+class FakeResult:
+    """模拟的工具结果"""
+
+    def __init__(self, content, structured_content=None):
+        self.content = content
+        self.structured_content = structured_content
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    """每次调用都统计条目数的响应大小统计"""
+    stats = PayloadStats(item_sample_rate=1.0)
+    monkeypatch.setattr(payload, "_payload_stats", stats)
+    return stats
+
+
+class TestPayloadSize:
+    """响应大小统计测试类"""
+
+    def test_count_items(self):
+        """测试按顶层数组或最长的数组字段统计条目数"""
+        assert count_items("[1, 2, 3]") == 3
+        assert count_items('{"recipes": [1, 2], "tags": [1, 2, 3], "n": 3}') == 3
+        assert count_items('{"recipe": {"name": "番茄炒蛋"}}') == 1
+        assert count_items("未找到菜谱") is None
+
+    def test_encoded_size(self):
+        """测试文本按 UTF-8 字节数计算，其他内容按 JSON 长度计算"""
+        text = TextContent(type="text", text="番茄")
+        image = ImageContent(type="image", data="aGk=", mimeType="image/png")
+
+        assert encoded_size(FakeResult([text])) == 6
+        assert encoded_size(FakeResult([image])) == len(
+            image.model_dump_json(exclude_none=True)
+        )
+        assert encoded_size(FakeResult([text], {"result": "番茄"})) == 6 + len(
+            json.dumps({"result": "番茄"}, ensure_ascii=False).encode()
+        )
+
+    @pytest.mark.asyncio
+    async def test_middleware_records_per_tool(self, stats):
+        """测试中间件按工具记录字节数和条目数，并按响应大小排序"""
+        server = FastMCP("payload-test")
+        server.add_middleware(PayloadSizeMiddleware())
+
+        @server.tool()
+        async def small():
+            return json.dumps({"recipes": ["番茄炒蛋"]}, ensure_ascii=False)
+
+        @server.tool()
+        async def large(count: int):
+            return json.dumps({"recipes": ["菜"] * count}, ensure_ascii=False)
+
+        async with Client(server) as client:
+            await client.call_tool("small", {})
+            await client.call_tool("large", {"count": 500})
+            await client.call_tool("large", {"count": 1000})
+
+        largest = stats.get_stats()["largest"]
+        assert [item["tool"] for item in largest] == ["large", "small"]
+        assert largest[0]["count"] == 2
+        assert largest[0]["max_items"] == 1000
+        assert largest[1]["max_bytes"] == len(
+            json.dumps({"recipes": ["番茄炒蛋"]}, ensure_ascii=False).encode()
+        )
+        assert 'howtocook_tool_response_bytes_count{tool="large"} 2' in (
+            render_openmetrics()
+        )
+
+    def test_items_not_sampled(self):
+        """测试未采样时只记录字节数"""
+        stats = PayloadStats(item_sample_rate=0.0)
+
+        assert not stats.sample_items()
+        stats.record("tool", 100)
+
+        assert stats.get_stats()["largest"][0]["max_items"] == 0.0
@@ -0,0 +1,131 @@
+"""
+PerformanceMonitor 和 LatencyHistogram 单元测试
+"""
+
+import random
+import pytest
+from src.infrastructure.monitoring.histogram import LatencyHistogram
+from src.infrastructure.monitoring.performance_monitor import (
+    PerformanceMonitor,
+    get_monitor,
+    performance_tracked,
+)
+
+
+def exact_quantile(values, q):
+    """与直方图相同取整方式的精确分位数"""
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class TestLatencyHistogram:
+    """LatencyHistogram 测试类"""
+
+    def test_percentiles_within_relative_accuracy(self):
+        """测试分位数估计满足相对误差上限"""
+        rng = random.Random(42)
+        values = [rng.lognormvariate(-4, 1.5) for _ in range(20000)]
+        histogram = LatencyHistogram(relative_accuracy=0.01)
+        for value in values:
+            histogram.record(value)
+
+        for q in (0.5, 0.95, 0.99):
+            expected = exact_quantile(values, q)
+            assert abs(histogram.quantile(q) - expected) <= expected * 0.01 + 1e-12
+
+        stats = histogram.get_stats()
+        assert stats["count"] == 20000
+        assert stats["min"] == min(values)
+        assert stats["max"] == max(values)
+
+    def test_memory_is_fixed(self):
+        """测试记录样本不会增加桶数量"""
+        histogram = LatencyHistogram()
+        buckets = histogram.bucket_count
+        for value in (0, 1e-9, 0.5, 10, 1e6):
+            histogram.record(value)
+
+        assert histogram.bucket_count == buckets
+        assert histogram.quantile(1.0) == 1e6
+        assert histogram.quantile(0.0) == 0
+
+    def test_merge_matches_combined_recording(self):
+        """测试合并结果与直接记录全部样本一致"""
+        rng = random.Random(7)
+        first, second, combined = (LatencyHistogram() for _ in range(3))
+        for index in range(5000):
+            value = rng.expovariate(20)
+            (first if index % 2 else second).record(value)
+            combined.record(value)
+
+        first.merge(second)
+
+        assert first.count == combined.count
+        assert first.percentiles() == combined.percentiles()
+
+    def test_merge_rejects_different_layout(self):
+        """测试分桶参数不同的直方图不能合并"""
+        with pytest.raises(ValueError):
+            LatencyHistogram(relative_accuracy=0.01).merge(
+                LatencyHistogram(relative_accuracy=0.02)
+            )
+
+
+class TestPerformanceMonitor:
+    """PerformanceMonitor 测试类"""
+
+    @pytest.mark.asyncio
+    async def test_stats_include_percentiles(self):
+        """测试统计信息包含分位数和成功率"""
+        monitor = PerformanceMonitor()
+        for index in range(100):
+            await monitor.record_metric("search", (index + 1) / 1000)
+        await monitor.record_metric("search", 1.0, success=False, error_message="超时")
+
+        stats = await monitor.get_stats("search")
+
+        assert stats["count"] == 101
+        assert stats["success_rate"] == pytest.approx(100 / 101 * 100)
+        assert stats["p50_duration"] == pytest.approx(0.051, rel=0.01)
+        assert stats["p99_duration"] == pytest.approx(0.1, rel=0.01)
+        assert stats["max_duration"] == 1.0
+        assert stats["recent_errors"] == ["超时"]
+
+    @pytest.mark.asyncio
+    async def test_overall_latency_merges_metrics(self):
+        """测试整体延迟分布合并所有指标"""
+        monitor = PerformanceMonitor()
+        await monitor.record_metric("a", 0.01)
+        await monitor.record_metric("b", 0.02)
+
+        overall = await monitor.get_overall_latency()
+
+        assert overall["count"] == 2
+        assert overall["max"] == 0.02
+        assert (await monitor.get_stats("missing"))["count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_tracked_records_success_and_failure(self):
+        """测试装饰器同步记录成功和失败调用，并保留函数元数据"""
+
+        @performance_tracked("test_tracked")
+        async def tool(fail=False):
+            """测试工具"""
+            if fail:
+                raise ValueError("参数错误")
+            return "ok"
+
+        assert tool.__name__ == "tool"
+        assert await tool() == "ok"
+        with pytest.raises(ValueError):
+            await tool(fail=True)
+
+        stats = await get_monitor().get_stats("test_tracked")
+        assert stats["count"] == 2
+        assert stats["success_rate"] == 50.0
+        assert stats["recent_errors"] == ["参数错误"]
+
+        # 清空后装饰器持有的统计对象仍然有效
+        await get_monitor().clear_metrics("test_tracked")
+        await tool()
+        assert (await get_monitor().get_stats("test_tracked"))["count"] == 1
@@ -0,0 +1,151 @@
+"""
+按需性能分析单元测试
+"""
+
+import json
+import time
+import asyncio
+import pytest
+import src.core.config as config_module
+import src.infrastructure.monitoring.performance_monitor as performance_monitor
+from src.core.config import AdminConfig, AppConfig
+from src.infrastructure.monitoring.profiler import Profiler
+
+
+def busy_work(n: int) -> int:
+    """供分析器捕获的计算函数"""
+    return sum(i * i for i in range(n))
+
+
+@pytest.fixture
+def tracked_tool(monkeypatch):
+    """使用独立监控器的被跟踪工具"""
+    monkeypatch.setattr(
+        performance_monitor, "_monitor", performance_monitor.PerformanceMonitor()
+    )
+
+    @performance_monitor.performance_tracked("busy_tool")
+    async def busy_tool():
+        await asyncio.sleep(0)
+        return busy_work(20000)
+
+    return busy_tool
+
+
+class TestProfiler:
+    """Profiler 测试类"""
+
+    @pytest.mark.asyncio
+    async def test_cprofile_for_n_tool_calls(self, tracked_tool):
+        """测试分析指定工具的 N 次调用后自动停止并给出热点"""
+        profiler = Profiler()
+        profiler.start("cprofile", tool="busy_tool", calls=2)
+
+        await tracked_tool()
+        assert profiler.active
+        await tracked_tool()
+
+        assert not profiler.active
+        report = profiler.last_report
+        assert report["tool"] == "busy_tool"
+        functions = [row["function"] for row in report["cumulative"]]
+        assert any(function.startswith("busy_work ") for function in functions)
+        assert performance_monitor.get_monitor().series("busy_tool").profiler is None
+
+    @pytest.mark.asyncio
+    async def test_sampling_for_duration(self):
+        """测试采样模式在指定时长后自动停止"""
+        profiler = Profiler(sample_interval=0.001)
+        profiler.start("sampling", seconds=0.1)
+
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            busy_work(1000)
+        await asyncio.sleep(0.1)
+
+        assert not profiler.active
+        report = profiler.last_report
+        assert report["samples"] > 0
+        # 忙循环期间最内层的栈帧位于 busy_work 的生成器表达式中
+        assert any("test_profiler.py" in row["function"] for row in report["self"])
+
+    @pytest.mark.asyncio
+    async def test_invalid_requests(self):
+        """测试重复开始、参数不合法和未开始时停止"""
+        profiler = Profiler()
+        with pytest.raises(RuntimeError):
+            profiler.stop()
+        with pytest.raises(ValueError):
+            profiler.start("perf")
+        with pytest.raises(ValueError):
+            profiler.start(calls=3)
+
+        profiler.start()
+        with pytest.raises(RuntimeError):
+            profiler.start()
+        profiler.stop()
+
+    def test_memory_snapshot(self):
+        """测试内存快照返回分配最多的代码行和增长"""
+        profiler = Profiler()
+        with pytest.raises(RuntimeError):
+            profiler.memory_snapshot()
+
+        profiler.start_memory_tracing()
+        try:
+            first = profiler.memory_snapshot(top=5)
+            retained = [bytearray(1024) for _ in range(1000)]
+            second = profiler.memory_snapshot(top=5)
+        finally:
+            profiler.stop_memory_tracing()
+
+        assert first["top_growth"] is None
+        assert len(second["top_allocations"]) == 5
+        assert second["top_growth"][0]["size_diff"] >= 1024 * 1000
+        assert len(retained) == 1000
+
+
+class TestAdminTools:
+    """管理工具注册测试类"""
+
+    @pytest.mark.asyncio
+    async def test_not_registered_by_default(self):
+        """测试默认不注册管理工具"""
+        from src.core.app import create_app
+
+        tools = await create_app().get_tools()
+
+        assert "admin_profile" not in tools
+
+    @pytest.mark.asyncio
+    async def test_token_required(self, monkeypatch):
+        """测试开启后需要正确的管理令牌"""
+        from fastmcp import FastMCP
+        from src.mcp.tools import register_admin_tools
+
+        monkeypatch.setattr(
+            config_module,
+            "_config",
+            AppConfig(admin=AdminConfig(enabled=True, token="secret")),
+        )
+        server = FastMCP("admin-test")
+        register_admin_tools(server)
+        tool = (await server.get_tools())["admin_profile"]
+
+        denied = await tool.fn(action="status", token="wrong")
+        allowed = await tool.fn(action="status", token="secret")
+
+        assert json.loads(denied) == {"error": "管理令牌无效"}
+        assert json.loads(allowed)["active"] is False
+
+    def test_refuses_to_register_without_token(self, monkeypatch):
+        """测试开启管理工具但未配置令牌时拒绝注册"""
+        from fastmcp import FastMCP
+        from src.mcp.tools import register_admin_tools
+
+        monkeypatch.setattr(
+            config_module, "_config", AppConfig(admin=AdminConfig(enabled=True))
+        )
+
+        with pytest.raises(ValueError, match="ADMIN_TOKEN"):
+            register_admin_tools(FastMCP("admin-test"))
@@ -0,0 +1,191 @@
+"""
+按客户端限速中间件单元测试
+"""
+
+import asyncio
+from types import SimpleNamespace
+import pytest
+from fastmcp import Client, FastMCP
+from src.infrastructure.middleware import ClientRateLimitMiddleware
+import src.infrastructure.middleware.rate_limit as rate_limit
+from src.infrastructure.middleware.rate_limit import TokenBucket, client_identifier
+
+
+class FakeServer:
+    """只注册了部分工具的服务器替身"""
+
+    async def get_tools(self):
+        return {"lookup": None, "recommend": None}
+
+
+def tool_context(name: str, session_id: str, client_id: str = None):
+    """构造工具调用的中间件上下文"""
+    return SimpleNamespace(
+        method="tools/call",
+        message=SimpleNamespace(name=name, arguments={}),
+        fastmcp_context=SimpleNamespace(
+            client_id=client_id, session_id=session_id, fastmcp=FakeServer()
+        ),
+    )
+
+
+async def call_next(context):
+    return "ok"
+
+
+class TestTokenBucket:
+    """TokenBucket 测试类"""
+
+    def test_consume_and_refill(self):
+        """测试令牌耗尽后返回等待时间，并按速率补充"""
+        bucket = TokenBucket(capacity=2, rate=1, now=0.0)
+
+        assert bucket.consume(1, 0.0) == 0.0
+        assert bucket.consume(1, 0.0) == 0.0
+        assert bucket.consume(1, 0.0) == pytest.approx(1.0)
+        assert bucket.consume(1, 1.0) == 0.0
+        # 补充不超过容量
+        assert bucket.consume(3, 100.0) == pytest.approx(1.0)
+
+
+class TestClientRateLimitMiddleware:
+    """ClientRateLimitMiddleware 测试类"""
+
+    @pytest.mark.asyncio
+    async def test_clients_are_isolated(self):
+        """测试一个客户端耗尽令牌不影响其他客户端"""
+        middleware = ClientRateLimitMiddleware(
+            rate=0.001, burst=2, tool_costs={}, max_concurrent=0
+        )
+
+        for _ in range(2):
+            await middleware.on_request(tool_context("lookup", "a"), call_next)
+        with pytest.raises(Exception, match="请求过于频繁"):
+            await middleware.on_request(tool_context("lookup", "a"), call_next)
+
+        assert await middleware.on_request(tool_context("lookup", "b"), call_next)
+        assert middleware.get_stats()["rejected_by_tool"] == {"lookup": 1}
+
+    @pytest.mark.asyncio
+    async def test_client_id_from_request_does_not_reset_bucket(self):
+        """测试更换请求元数据中的 client_id 不会得到新的令牌桶"""
+        middleware = ClientRateLimitMiddleware(
+            rate=0.001, burst=2, tool_costs={}, max_concurrent=0
+        )
+
+        for index in range(2):
+            await middleware.on_request(
+                tool_context("lookup", "a", client_id=f"fake-{index}"), call_next
+            )
+        with pytest.raises(Exception, match="请求过于频繁"):
+            await middleware.on_request(
+                tool_context("lookup", "a", client_id="fake-2"), call_next
+            )
+
+        assert middleware.get_stats()["clients"] == 1
+
+    def test_authenticated_client_id_is_used(self, monkeypatch):
+        """测试认证后按访问令牌中的 client_id 区分客户端，跨会话共用令牌桶"""
+        monkeypatch.setattr(
+            rate_limit, "get_access_token", lambda: SimpleNamespace(client_id="user")
+        )
+
+        assert client_identifier(tool_context("lookup", "a")) == "auth:user"
+        assert client_identifier(tool_context("lookup", "b")) == "auth:user"
+
+    @pytest.mark.asyncio
+    async def test_rejections_of_unknown_tools_share_one_key(self):
+        """测试未注册的工具名被拒绝时统一计入 unknown"""
+        middleware = ClientRateLimitMiddleware(
+            rate=0.001, burst=1, tool_costs={}, max_concurrent=0
+        )
+
+        await middleware.on_request(tool_context("lookup", "a"), call_next)
+        for index in range(5):
+            with pytest.raises(Exception, match="请求过于频繁"):
+                await middleware.on_request(
+                    tool_context(f"random-{index}", "a"), call_next
+                )
+
+        assert middleware.get_stats()["rejected_by_tool"] == {"unknown": 5}
+
+    @pytest.mark.asyncio
+    async def test_tool_costs(self):
+        """测试开销大的工具按配置消耗更多令牌，桶容量不小于最大消耗"""
+        middleware = ClientRateLimitMiddleware(
+            rate=0.001, burst=1, tool_costs={"recommend": 3}, max_concurrent=0
+        )
+        assert middleware.burst == 3
+
+        await middleware.on_request(tool_context("recommend", "a"), call_next)
+        with pytest.raises(Exception, match="请求过于频繁"):
+            await middleware.on_request(tool_context("lookup", "a"), call_next)
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_clients(self):
+        """测试客户端数量超过上限时淘汰最久未使用的令牌桶"""
+        middleware = ClientRateLimitMiddleware(
+            rate=0.001, burst=1, tool_costs={}, max_concurrent=0, max_clients=2
+        )
+
+        for client in ("a", "b", "c"):
+            await middleware.on_request(tool_context("lookup", client), call_next)
+
+        assert middleware.get_stats()["clients"] == 2
+        # a 已被淘汰，重新从满桶开始
+        assert await middleware.on_request(tool_context("lookup", "a"), call_next)
+
+    @pytest.mark.asyncio
+    async def test_zero_rate_disables_limit(self):
+        """测试速率为 0 时不限速"""
+        middleware = ClientRateLimitMiddleware(
+            rate=0, burst=1, tool_costs={}, max_concurrent=0
+        )
+
+        for _ in range(10):
+            await middleware.on_request(tool_context("lookup", "a"), call_next)
+
+        assert middleware.get_stats()["clients"] == 0
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrency(self):
+        """测试同时执行的工具调用不超过并发上限"""
+        server = FastMCP("rate-limit-test")
+        middleware = ClientRateLimitMiddleware(
+            rate=0, burst=1, tool_costs={}, max_concurrent=2
+        )
+        server.add_middleware(middleware)
+        peak = {"running": 0, "max": 0}
+
+        @server.tool()
+        async def slow():
+            peak["running"] += 1
+            peak["max"] = max(peak["max"], peak["running"])
+            await asyncio.sleep(0.01)
+            peak["running"] -= 1
+            return "done"
+
+        async with Client(server) as client:
+            await asyncio.gather(*(client.call_tool("slow", {}) for _ in range(6)))
+
+        assert peak["max"] == 2
+        assert middleware.get_stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_rejection_reaches_client(self):
+        """测试被拒绝的请求以错误返回给客户端，列表等请求同样消耗令牌"""
+        server = FastMCP("rate-limit-test")
+        server.add_middleware(
+            ClientRateLimitMiddleware(
+                rate=0.001, burst=3, tool_costs={}, max_concurrent=0
+            )
+        )
+
+        @server.tool()
+        async def lookup():
+            return "ok"
+
+        async with Client(server) as client:
+            await client.call_tool("lookup", {})
+            with pytest.raises(Exception, match="请求过于频繁"):
+                await client.call_tool("lookup", {})
@@ -0,0 +1,258 @@
+"""
+RedisCache 单元测试
+
+使用进程内的 RESP 服务替身，不依赖真实的 Redis 服务。
+"""
+
+import json
+import time
+import pickle
+import asyncio
+import fnmatch
+import pytest
+import pytest_asyncio
+from src.infrastructure.cache.memory_cache import MemoryCache
+from src.infrastructure.cache.redis_cache import (
+    RedisCache,
+    encode_command,
+    read_reply,
+)
+
+
+class FakeRedisServer:
+    """实现测试所需命令子集的进程内 RESP 服务"""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+        self.connections = 0
+        self._server = None
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.port}/0"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _lookup(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at < time.time():
+            del self.data[key]
+            return None
+        return value
+
+    @staticmethod
+    def _bulk(value):
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def _dispatch(self, command):
+        name = command[0].decode().upper()
+        args = command[1:]
+        self.commands.append(name)
+        if name == "PING":
+            return b"+PONG\r\n"
+        if name == "GET":
+            return self._bulk(self._lookup(args[0]))
+        if name == "MGET":
+            return b"*%d\r\n" % len(args) + b"".join(
+                self._bulk(self._lookup(key)) for key in args
+            )
+        if name == "SET":
+            expires_at = None
+            if len(args) == 4 and args[2].upper() == b"PX":
+                expires_at = time.time() + int(args[3]) / 1000
+            self.data[args[0]] = (args[1], expires_at)
+            return b"+OK\r\n"
+        if name == "DEL":
+            removed = sum(self.data.pop(key, None) is not None for key in args)
+            return b":%d\r\n" % removed
+        if name == "SCAN":
+            pattern = args[args.index(b"MATCH") + 1].decode()
+            keys = [
+                key for key in self.data if fnmatch.fnmatchcase(key.decode(), pattern)
+            ]
+            return (
+                b"*2\r\n$1\r\n0\r\n"
+                + b"*%d\r\n" % len(keys)
+                + b"".join(self._bulk(key) for key in keys)
+            )
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                command = await read_reply(reader)
+                writer.write(self._dispatch(command))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+@pytest_asyncio.fixture
+async def server():
+    """启动进程内 RESP 服务"""
+    fake = FakeRedisServer()
+    await fake.start()
+    yield fake
+    await fake.stop()
+
+
+@pytest_asyncio.fixture
+async def backend(server):
+    """连接到进程内服务的 RedisCache"""
+    cache = RedisCache(server.url, namespace="test", max_connections=2, timeout=1)
+    yield cache
+    await cache.close()
+
+
+class TestRedisProtocol:
+    """RESP 编解码测试类"""
+
+    def test_encode_command(self):
+        """测试命令编码"""
+        assert (
+            encode_command("GET", "键") == b"*2\r\n$3\r\nGET\r\n$3\r\n\xe9\x94\xae\r\n"
+        )
+
+    @pytest.mark.asyncio
+    async def test_read_nested_reply(self):
+        """测试解析嵌套数组、空值和错误响应"""
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"*3\r\n$2\r\nab\r\n$-1\r\n-ERR boom\r\n")
+
+        value, missing, error = await read_reply(reader)
+
+        assert value == b"ab"
+        assert missing is None
+        assert str(error) == "ERR boom"
+
+
+class TestRedisCache:
+    """RedisCache 测试类"""
+
+    @pytest.mark.asyncio
+    async def test_set_get_and_delete(self, backend):
+        """测试基本读写和删除"""
+        expires_at = time.time() + 60
+        await backend.set("a", {"name": "红烧肉"}, expires_at)
+
+        assert await backend.get("a") == ({"name": "红烧肉"}, expires_at)
+
+        await backend.delete("a")
+        assert await backend.get("a") is None
+        assert backend.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_values_are_json(self, backend, server):
+        """测试写入 JSON 数据，服务中被写入的 pickle 数据不会被反序列化"""
+        expires_at = time.time() + 60
+        await backend.set("a", ("红烧肉", 1), expires_at)
+
+        payload, _ = server.data[b"test:a"]
+        assert json.loads(payload)["items"][1] == expires_at
+
+        server.data[b"test:a"] = (pickle.dumps((("红烧肉", 1), expires_at)), None)
+        assert await backend.get("a") is None
+        assert backend.get_stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_server_side_expiry(self, backend, server):
+        """测试写入时设置服务端过期时间，已过期的值不写入"""
+        await backend.set("a", 1, time.time() + 60)
+        await backend.set("b", 2, time.time() - 1)
+
+        ((_, expires_at),) = [server.data[b"test:a"]]
+        assert expires_at is not None
+        assert b"test:b" not in server.data
+
+    @pytest.mark.asyncio
+    async def test_batch_operations_are_pipelined(self, backend, server):
+        """测试批量读写分别只占用一次往返"""
+        expires_at = time.time() + 60
+        await backend.set_many((f"k{i}", i, expires_at) for i in range(20))
+        server.commands.clear()
+
+        found = await backend.get_many([f"k{i}" for i in range(25)])
+
+        assert {key: value for key, (value, _) in found.items()} == {
+            f"k{i}": i for i in range(20)
+        }
+        assert server.commands == ["MGET"]
+        assert backend.get_stats()["misses"] == 5
+
+    @pytest.mark.asyncio
+    async def test_connection_pool_reuse(self, backend, server):
+        """测试并发请求复用连接且不超过连接池上限"""
+        expires_at = time.time() + 60
+        await asyncio.gather(*(backend.set(f"k{i}", i, expires_at) for i in range(50)))
+        await asyncio.gather(*(backend.get(f"k{i}") for i in range(50)))
+
+        assert server.connections <= 2
+        assert backend.get_stats()["pool"]["created"] == server.connections
+
+    @pytest.mark.asyncio
+    async def test_clear_is_namespace_scoped(self, backend, server):
+        """测试清空只影响当前命名空间"""
+        other = RedisCache(server.url, namespace="other")
+        expires_at = time.time() + 60
+        await backend.set("a", 1, expires_at)
+        await other.set("a", 2, expires_at)
+
+        await backend.clear()
+
+        assert await backend.get("a") is None
+        assert (await other.get("a"))[0] == 2
+        await other.close()
+
+    @pytest.mark.asyncio
+    async def test_unreachable_server_falls_back(self, server):
+        """测试服务不可达时进入本地降级状态，重试间隔内不再尝试连接"""
+        url = server.url
+        await server.stop()
+        cache = MemoryCache(
+            enabled=True,
+            default_ttl=60,
+            l2=RedisCache(url, timeout=0.2, retry_interval=60),
+        )
+
+        await cache.set("a", 1)
+        assert await cache.get("a") == 1
+        assert await cache.get("b") is None
+
+        stats = cache.get_stats()["l2"]
+        assert stats["available"] is False
+        assert stats["errors"] == 1
+        assert stats["fallbacks"] == 1
+        await server.start()
+
+    @pytest.mark.asyncio
+    async def test_two_tier_read_through(self, server):
+        """测试两个副本通过共享服务读取彼此写入的结果"""
+        first = MemoryCache(enabled=True, default_ttl=60, l2=RedisCache(server.url))
+        second = MemoryCache(enabled=True, default_ttl=60, l2=RedisCache(server.url))
+
+        await first.set_many({"a": 1, "b": 2})
+
+        assert await second.get_many(["a", "b", "c"]) == {"a": 1, "b": 2}
+        assert await second.get("a") == 1
+        assert second.get_stats()["hits"] == 1
+
+        await first.close()
+        await second.close()
@@ -0,0 +1,116 @@
+"""
+响应缓存中间件单元测试
+"""
+
+from types import SimpleNamespace
+import pytest
+from fastmcp import Client, FastMCP
+import src.infrastructure.dataset.dataset_state as dataset_state
+from src.infrastructure.cache import MemoryCache
+from src.infrastructure.middleware import ResponseCacheMiddleware
+from src.infrastructure.middleware.response_cache import CACHE_STATUS_KEY
+
+
+@pytest.fixture
+def state(monkeypatch):
+    """替换全局数据集状态"""
+    instance = dataset_state.DatasetState()
+    monkeypatch.setattr(dataset_state, "_dataset_state", instance)
+    return instance
+
+
+@pytest.fixture
+def app():
+    """带响应缓存中间件和计数工具的服务器"""
+    server = FastMCP("response-cache-test")
+    calls = {"lookup": 0, "random": 0, "stats": 0}
+    middleware = ResponseCacheMiddleware(
+        tools=["lookup"],
+        resources=["test://stats"],
+        cache=MemoryCache(enabled=True, max_entries=100, l2=None),
+    )
+    server.add_middleware(middleware)
+
+    @server.tool()
+    async def lookup(names: list[str], limit: int = 10):
+        calls["lookup"] += 1
+        return f"{names}:{limit}"
+
+    @server.tool()
+    async def random():
+        calls["random"] += 1
+        return str(calls["random"])
+
+    @server.resource("test://stats")
+    async def stats():
+        calls["stats"] += 1
+        return "stats"
+
+    return SimpleNamespace(server=server, calls=calls, middleware=middleware)
+
+
+def cache_status(result):
+    """读取工具结果第一个内容块的缓存状态"""
+    meta = result.content[0].meta
+    return meta.get(CACHE_STATUS_KEY) if meta else None
+
+
+class TestResponseCacheMiddleware:
+    """ResponseCacheMiddleware 测试类"""
+
+    @pytest.mark.asyncio
+    async def test_short_circuits_allowed_tools(self, app, state):
+        """测试允许列表中的工具命中时不执行工具函数，并标记缓存状态"""
+        state.mark_loaded("v1", 3)
+
+        async with Client(app.server) as client:
+            first = await client.call_tool("lookup", {"names": ["a"], "limit": 5})
+            second = await client.call_tool("lookup", {"limit": 5, "names": ["a"]})
+            other = await client.call_tool("lookup", {"names": ["b"], "limit": 5})
+
+        assert app.calls["lookup"] == 2
+        assert cache_status(first) == "miss"
+        assert cache_status(second) == "hit"
+        assert cache_status(other) == "miss"
+        assert second.content[0].text == first.content[0].text
+        assert app.middleware.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_keyed_on_dataset_version(self, app, state):
+        """测试数据集版本变化后不再命中，数据集未加载时不缓存"""
+        async with Client(app.server) as client:
+            await client.call_tool("lookup", {"names": ["a"]})
+            await client.call_tool("lookup", {"names": ["a"]})
+            assert app.calls["lookup"] == 2
+
+            state.mark_loaded("v1", 3)
+            await client.call_tool("lookup", {"names": ["a"]})
+            state.mark_loaded("v2", 3)
+            result = await client.call_tool("lookup", {"names": ["a"]})
+
+        assert app.calls["lookup"] == 4
+        assert cache_status(result) == "miss"
+
+    @pytest.mark.asyncio
+    async def test_other_tools_pass_through(self, app, state):
+        """测试不在允许列表中的工具每次都执行且不带缓存状态"""
+        state.mark_loaded("v1", 3)
+
+        async with Client(app.server) as client:
+            await client.call_tool("random", {})
+            result = await client.call_tool("random", {})
+
+        assert result.content[0].text == "2"
+        assert cache_status(result) is None
+
+    @pytest.mark.asyncio
+    async def test_caches_allowed_resources(self, app, state):
+        """测试允许列表中的资源命中时不执行资源函数"""
+        state.mark_loaded("v1", 3)
+
+        async with Client(app.server) as client:
+            first = await client.read_resource("test://stats")
+            second = await client.read_resource("test://stats")
+
+        assert app.calls["stats"] == 1
+        assert first[0].text == second[0].text == "stats"
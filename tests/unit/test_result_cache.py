@@ -0,0 +1,207 @@
+"""
+ResultCache 单元测试
+"""
+
+import json
+import time
+from unittest.mock import AsyncMock, patch
+import pytest
+import pytest_asyncio
+import src.domain.repositories.recipe_repository as recipe_repository
+from src.domain.models.recipe import Ingredient, Recipe
+from src.domain.services.recipe_service import RecipeService
+import src.infrastructure.dataset.dataset_state as dataset_state
+from src.domain.repositories.recipe_repository import DatasetSnapshot, RecipeRepository
+from src.infrastructure.cache.result_cache import (
+    ResultCache,
+    result_cached,
+    get_result_cache,
+    normalize_terms,
+)
+from src.infrastructure.cache.invalidation import invalidate_dataset, invalidate_tool
+from src.infrastructure.cache.sizing import estimate_size
+from src.infrastructure.dataset import DatasetState, get_dataset_state
+
+
+@pytest_asyncio.fixture
+async def dataset_version():
+    """设置数据集版本，测试结束后恢复"""
+    state = get_dataset_state()
+    previous = state.version
+    state.version = "test-version"
+    await get_result_cache().clear()
+    yield state
+    state.version = previous
+    await get_result_cache().clear()
+
+
+class TestResultCache:
+    """ResultCache 测试类"""
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_by_bytes(self):
+        """测试按估算内存占用淘汰最久未使用的结果"""
+        cache = ResultCache(enabled=True, max_bytes=estimate_size("aaaa") * 2)
+        await cache.set("a", "aaaa")
+        await cache.set("b", "bbbb")
+        assert await cache.get("a") == "aaaa"
+
+        await cache.set("c", "cccc")
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == "aaaa"
+        assert await cache.get("c") == "cccc"
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["total_items"] == 2
+
+    @pytest.mark.asyncio
+    async def test_oversized_value_not_cached(self):
+        """测试超过容量的结果不会被缓存"""
+        cache = ResultCache(enabled=True, max_bytes=8)
+        await cache.set("a", "toolarge")
+
+        assert await cache.get("a") is None
+        assert cache.get_stats()["total_items"] == 0
+
+    def test_normalize_terms(self):
+        """测试食材/标签列表规范化"""
+        assert normalize_terms(["土豆", "Beef", "鸡肉"]) == ["beef", "土豆", "鸡肉"]
+        assert normalize_terms(None) is None
+
+    @pytest.mark.asyncio
+    async def test_decorator_hits_with_normalized_arguments(self, dataset_version):
+        """测试参数顺序和大小写不同的调用共享缓存结果，方法收到原始参数"""
+        calls = []
+
+        @result_cached("search", normalizers={"tags": normalize_terms})
+        async def search(tags):
+            calls.append(tags)
+            return f"result:{tags}"
+
+        first = await search(["B", "a"])
+        second = await search(["A", "b"])
+
+        assert first == second
+        assert calls == [["B", "a"]]
+        assert get_result_cache().hits == 1
+
+    @pytest.mark.asyncio
+    async def test_search_echoes_original_terms(self, dataset_version):
+        """测试搜索结果回显调用方传入的食材和标签，而不是规范化后的值"""
+        service = RecipeService()
+        recipe = Recipe(
+            id="recipe-1",
+            name="土豆炖牛肉",
+            description="家常",
+            source_path="test/path",
+            category="荤菜",
+            difficulty=2,
+            tags=["Spicy"],
+            servings=2,
+            ingredients=[Ingredient(name="牛肉", text_quantity="500g")],
+            steps=[],
+        )
+
+        with patch.object(
+            service.repository, "fetch_all_recipes", return_value=[recipe]
+        ):
+            by_ingredients = json.loads(
+                await service.search_recipes_by_ingredients(["牛肉", "Beef"])
+            )
+            by_tags = json.loads(await service.search_recipes_by_tags(["Spicy"]))
+
+        assert by_ingredients["searched_ingredients"] == ["牛肉", "Beef"]
+        assert by_tags["searched_tags"] == ["Spicy"]
+
+    @pytest.mark.asyncio
+    async def test_decorator_keys_on_dataset_version(self, dataset_version):
+        """测试数据集版本变化后不再命中旧结果"""
+        calls = []
+
+        @result_cached("lookup")
+        async def lookup(name):
+            calls.append(name)
+            return name
+
+        await lookup("x")
+        dataset_version.version = "new-version"
+        await lookup("x")
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_decorator_skips_without_dataset(self, dataset_version):
+        """测试数据集未加载时不缓存"""
+        dataset_version.version = None
+        calls = []
+
+        @result_cached("lookup")
+        async def lookup(name):
+            calls.append(name)
+            return name
+
+        await lookup("x")
+        await lookup("x")
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_results_tagged_by_dataset_and_tool(self, dataset_version):
+        """测试工具结果按数据集版本和工具名失效"""
+        calls = []
+
+        @result_cached("lookup")
+        async def lookup(name):
+            calls.append(name)
+            return name
+
+        @result_cached("other")
+        async def other(name):
+            calls.append(name)
+            return name
+
+        await lookup("x")
+        await other("y")
+        assert (await invalidate_tool("lookup"))["result"] == 1
+        await other("y")
+        assert calls == ["x", "y"]
+
+        assert (await invalidate_dataset("test-version"))["result"] == 1
+        await other("y")
+        assert calls == ["x", "y", "y"]
+
+    def test_mark_loaded_reports_replaced_version(self):
+        """测试数据集刷新时返回被替换的版本，中间加载失败不影响"""
+        state = DatasetState()
+
+        assert state.mark_loaded("v1", 10) is None
+        assert state.mark_loaded("v1", 10) is None
+        state.mark_failed("timeout")
+        assert state.mark_loaded("v2", 12) == "v1"
+
+    @pytest.mark.asyncio
+    async def test_refetch_same_version_refreshes_age(self, monkeypatch):
+        """测试重新拉取到相同版本时更新加载时间，只有版本变化时才失效缓存"""
+        state = DatasetState()
+        monkeypatch.setattr(dataset_state, "_dataset_state", state)
+        invalidate = AsyncMock()
+        monkeypatch.setattr(recipe_repository, "invalidate_dataset", invalidate)
+        repository = RecipeRepository()
+        fetched_at = time.time()
+
+        snapshots = [
+            DatasetSnapshot("abc", fetched_at - 3 * 3600, []),
+            DatasetSnapshot("abc", fetched_at, []),
+            DatasetSnapshot("def", fetched_at, []),
+        ]
+        with patch.object(repository, "_fetch_dataset", side_effect=snapshots):
+            await repository.fetch_all_recipes()
+            assert state.loaded_at == fetched_at - 3 * 3600
+
+            await repository.fetch_all_recipes()
+            assert state.loaded_at == fetched_at
+            invalidate.assert_not_awaited()
+
+            await repository.fetch_all_recipes()
+            invalidate.assert_awaited_once_with("abc")
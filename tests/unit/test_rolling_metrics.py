@@ -0,0 +1,96 @@
+"""
+滑动窗口统计单元测试
+"""
+
+import pytest
+from src.infrastructure.monitoring.histogram import LatencyHistogram
+from src.infrastructure.monitoring.rolling import RELATIVE_ACCURACY, RollingMetrics
+
+BUCKETS = LatencyHistogram()
+# 全量直方图与滑动窗口粗分桶的误差之和
+TOLERANCE = RELATIVE_ACCURACY + BUCKETS.relative_accuracy
+
+
+def make_metrics() -> RollingMetrics:
+    """创建从时间 0 开始统计的滑动窗口"""
+    metrics = RollingMetrics()
+    metrics.started_at = 0.0
+    return metrics
+
+
+def add(metrics, duration, now, failed=False):
+    metrics.add(BUCKETS.bucket_index(duration), failed, now)
+
+
+class TestRollingMetrics:
+    """RollingMetrics 测试类"""
+
+    def test_one_minute_window_slides(self):
+        """测试 1 分钟窗口只包含最近 60 秒内的样本"""
+        metrics = make_metrics()
+        add(metrics, 0.01, now=1000)
+        add(metrics, 0.02, now=1030)
+
+        assert metrics.get_stats(now=1035)["1m"]["count"] == 2
+        stats = metrics.get_stats(now=1075)["1m"]
+        assert stats["count"] == 1
+        assert stats["p50"] == pytest.approx(0.02, rel=TOLERANCE)
+
+    def test_five_and_fifteen_minute_windows(self):
+        """测试 5 分钟和 15 分钟窗口覆盖不同时间范围"""
+        metrics = make_metrics()
+        add(metrics, 0.1, now=6000)
+        add(metrics, 0.2, now=6000 + 4 * 60)
+        add(metrics, 0.3, now=6000 + 10 * 60, failed=True)
+
+        stats = metrics.get_stats(now=6000 + 10 * 60 + 30)
+
+        assert stats["5m"]["count"] == 1
+        assert stats["15m"]["count"] == 3
+        assert stats["15m"]["error_rate"] == pytest.approx(100 / 3)
+        assert stats["15m"]["p50"] == pytest.approx(0.2, rel=TOLERANCE)
+        assert stats["1m"]["count"] == 1
+
+    def test_throughput_uses_covered_time(self):
+        """测试吞吐量按窗口实际覆盖的时长计算"""
+        metrics = make_metrics()
+        for second in range(60):
+            add(metrics, 0.01, now=1200 + second)
+
+        stats = metrics.get_stats(now=1260)["1m"]
+
+        assert stats["throughput"] == pytest.approx(1.0)
+        assert stats["error_rate"] == 0.0
+
+    def test_memory_is_constant(self):
+        """测试长时间运行后槽被循环复用，旧数据全部滑出"""
+        metrics = make_metrics()
+        slots = len(metrics.fine._slots) + len(metrics.coarse._slots)
+        for second in range(0, 3600, 5):
+            add(metrics, 0.01, now=10000 + second)
+
+        assert len(metrics.fine._slots) + len(metrics.coarse._slots) == slots
+        assert metrics.get_stats(now=10000 + 3600 + 900)["15m"]["count"] == 0
+
+    def test_slots_reused_in_place(self):
+        """测试进入新时间段时原地清零槽的计数数组，不重新分配"""
+        metrics = make_metrics()
+        add(metrics, 0.01, now=1000)
+        slots = metrics.fine._slots + metrics.coarse._slots
+        arrays = [slot.counts for slot in slots]
+
+        add(metrics, 0.5, now=1000 + 15 * 60)
+
+        assert all(slot.counts is array for slot, array in zip(slots, arrays))
+        stats = metrics.get_stats(now=1000 + 15 * 60 + 1)["15m"]
+        assert stats["count"] == 1
+        assert stats["p99"] == pytest.approx(0.5, rel=TOLERANCE)
+
+    def test_coarse_buckets(self):
+        """测试滑动窗口的槽使用比全量直方图更粗的分桶"""
+        metrics = make_metrics()
+
+        assert len(metrics.fine._slots[0].counts) * 4 < BUCKETS.bucket_count
+        for duration in (1e-6, 0.001, 0.25, 3600.0, 7200.0):
+            add(metrics, duration, now=100)
+        assert metrics.get_stats(now=101)["1m"]["count"] == 5
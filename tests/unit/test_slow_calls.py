@@ -0,0 +1,144 @@
+"""
+慢调用日志单元测试
+"""
+
+import json
+import asyncio
+import pytest
+import src.core.config as config_module
+import src.infrastructure.monitoring.performance_monitor as performance_monitor
+import src.infrastructure.monitoring.slow_calls as slow_calls
+from src.core.config import AdminConfig, AppConfig
+from src.infrastructure.monitoring.slow_calls import SlowCallLog, normalize_arguments
+from src.infrastructure.monitoring.tracing import get_tracer, span
+
+
+class SearchService:
+    """模拟的服务"""
+
+    @performance_monitor.performance_tracked("slow_search")
+    async def search(self, ingredients, delay: float = 0.0):
+        with span("fetch"):
+            await asyncio.sleep(delay)
+        with span("score"):
+            pass
+        return json.dumps({"ingredients": sorted(ingredients)}, ensure_ascii=False)
+
+
+@pytest.fixture
+def slow_log(monkeypatch):
+    """每次调用都采样、前 20 次调用之后开始判定的慢调用日志"""
+    monkeypatch.setattr(
+        performance_monitor, "_monitor", performance_monitor.PerformanceMonitor()
+    )
+    log = SlowCallLog(
+        enabled=True,
+        percentile=0.9,
+        min_samples=20,
+        capacity=5,
+        sample_rate=1.0,
+        refresh_every=1,
+    )
+    monkeypatch.setattr(slow_calls, "_slow_call_log", log)
+    return log
+
+
+class TestSlowCallLog:
+    """SlowCallLog 测试类"""
+
+    @pytest.mark.asyncio
+    async def test_records_calls_above_percentile(self, slow_log):
+        """测试只记录超过分位数阈值的调用，并包含参数、结果大小和阶段耗时"""
+        service = SearchService()
+        for _ in range(30):
+            await service.search(["鸡蛋"])
+        assert slow_log.recorded <= 3
+
+        slow_log.clear()
+        await service.search({"番茄", "鸡蛋"}, delay=0.05)
+
+        entry = slow_log.get_entries("slow_search")[0]
+        assert entry["duration"] >= 0.05 > entry["threshold"]
+        assert entry["arguments"] == {"ingredients": ["番茄", "鸡蛋"], "delay": 0.05}
+        assert entry["result_bytes"] == len(
+            json.dumps({"ingredients": ["番茄", "鸡蛋"]}, ensure_ascii=False).encode()
+        )
+        assert entry["stages"]["fetch"] >= 0.05
+        assert set(entry["stages"]) == {"fetch", "score"}
+
+    @pytest.mark.asyncio
+    async def test_not_sampled_and_disabled(self, slow_log):
+        """测试未被采样的慢调用不含阶段耗时，本地 span 不计入阶段直方图"""
+        service = SearchService()
+        for _ in range(20):
+            await service.search(["鸡蛋"])
+        stage_paths = set(get_tracer().stages)
+
+        slow_log.sample_rate = 0.0
+        await service.search(["鸡蛋"], delay=0.05)
+        assert slow_log.get_entries()[0]["stages"] is None
+        assert set(get_tracer().stages) == stage_paths
+
+        slow_log.enabled = False
+        slow_log.clear()
+        await service.search(["鸡蛋"], delay=0.05)
+        assert slow_log.get_entries() == []
+
+    def test_bounded_and_truncated(self):
+        """测试日志条数有上限，过长的参数被截断"""
+        log = SlowCallLog(enabled=True, capacity=2)
+
+        def tool(query):
+            return query
+
+        for i in range(3):
+            log.record("tool", 1.0, 0.5, tool, (f"查询{i}" * 100,), {})
+
+        entries = log.get_entries()
+        assert [entry["arguments"]["query"][:4] for entry in entries] == [
+            '"查询2',
+            '"查询1',
+        ]
+        assert entries[0]["arguments"]["query"].endswith("...")
+        assert log.get_stats()["recorded"] == 3
+
+    def test_normalize_arguments(self):
+        """测试参数规范化去掉 self 并处理无法序列化的值"""
+
+        def method(self, names, option=None):
+            return names
+
+        arguments = normalize_arguments(method, (object(), ("b", "a")), {"option": 1})
+
+        assert arguments == {"names": ["b", "a"], "option": 1}
+        assert isinstance(normalize_arguments(method, (1, object()), {})["names"], str)
+
+
+class TestSlowCallTool:
+    """慢调用日志管理工具测试类"""
+
+    @pytest.mark.asyncio
+    async def test_tool_requires_token(self, monkeypatch, slow_log):
+        """测试工具需要管理令牌，并可按工具过滤，令牌不出现在资源 URI 中"""
+        from fastmcp import FastMCP
+        from src.mcp.tools import register_admin_tools
+
+        monkeypatch.setattr(
+            config_module,
+            "_config",
+            AppConfig(admin=AdminConfig(enabled=True, token="secret")),
+        )
+        slow_log.record("a", 1.0, 0.5, lambda: None, (), {})
+        slow_log.record("b", 1.0, 0.5, lambda: None, (), {})
+        server = FastMCP("admin-test")
+        register_admin_tools(server)
+        tool = (await server.get_tools())["admin_slow_calls"]
+
+        denied = json.loads(await tool.fn(token="wrong"))
+        listed = json.loads(await tool.fn(token="secret"))
+        filtered = json.loads(await tool.fn(tool="a", token="secret"))
+
+        assert denied == {"error": "管理令牌无效"}
+        assert [entry["tool"] for entry in listed["entries"]] == ["b", "a"]
+        assert [entry["tool"] for entry in filtered["entries"]] == ["a"]
+        assert await server.get_resource_templates() == {}
@@ -0,0 +1,107 @@
+"""
+阶段级追踪单元测试
+"""
+
+import pytest
+import src.infrastructure.monitoring.tracing as tracing
+import src.infrastructure.monitoring.performance_monitor as performance_monitor
+from src.infrastructure.monitoring.tracing import OTLPExporter, Tracer, span
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    """替换全局追踪器为开启状态的新实例"""
+    instance = Tracer(enabled=True)
+    monkeypatch.setattr(tracing, "_tracer", instance)
+    monkeypatch.setattr(
+        performance_monitor, "_monitor", performance_monitor.PerformanceMonitor()
+    )
+    return instance
+
+
+class TestTracer:
+    """Tracer 测试类"""
+
+    def test_disabled_tracer_returns_shared_noop(self):
+        """测试关闭时返回共享的空操作对象且不记录"""
+        disabled = Tracer(enabled=False)
+
+        with disabled.span("fetch") as first, disabled.span("filter") as second:
+            first.set_attribute("recipes", 1)
+
+        assert first is second
+        assert disabled.stages == {}
+
+    @pytest.mark.asyncio
+    async def test_stages_nested_under_tool(self, tracer):
+        """测试服务内部的阶段挂在工具根 span 下"""
+
+        @performance_monitor.performance_tracked("search")
+        async def search():
+            with span("fetch"):
+                pass
+            with span("filter", recipes=3):
+                pass
+            return "ok"
+
+        assert await search() == "ok"
+
+        assert set(tracer.stages) == {"search", "search/fetch", "search/filter"}
+        assert tracer.stages["search/fetch"].count == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_recorded_on_span(self, tracer):
+        """测试阶段内抛出的异常被记录且继续向上抛出"""
+
+        @performance_monitor.performance_tracked("broken")
+        async def broken():
+            with span("score"):
+                raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await broken()
+
+        stats = tracer.get_stats()["stages"]
+        assert stats["broken/score"]["errors"] == 1
+        assert stats["broken"]["errors"] == 1
+
+
+class TestOTLPExporter:
+    """OTLPExporter 测试类"""
+
+    def test_encode_links_parent_and_child(self):
+        """测试编码结果符合 OTLP JSON 结构并保留父子关系"""
+        exporter = OTLPExporter("http://collector:4318/", service_name="howtocook")
+        tracer = Tracer(enabled=True, exporter=exporter)
+
+        with tracer.span("search"):
+            with tracer.span("fetch", recipes=2):
+                pass
+
+        assert exporter.url == "http://collector:4318/v1/traces"
+        payload = exporter.encode(list(exporter._queue))
+        resource_spans = payload["resourceSpans"][0]
+        assert resource_spans["resource"]["attributes"][0] == {
+            "key": "service.name",
+            "value": {"stringValue": "howtocook"},
+        }
+        child, root = resource_spans["scopeSpans"][0]["spans"]
+        assert child["traceId"] == root["traceId"]
+        assert len(root["traceId"]) == 32
+        assert child["parentSpanId"] == root["spanId"]
+        assert "parentSpanId" not in root
+        assert child["attributes"] == [{"key": "recipes", "value": {"intValue": "2"}}]
+
+    @pytest.mark.asyncio
+    async def test_failed_export_drops_batch(self):
+        """测试收集器不可达时丢弃这一批而不抛出异常"""
+        exporter = OTLPExporter("http://127.0.0.1:9", "howtocook", timeout=0.5)
+        tracer = Tracer(enabled=True, exporter=exporter)
+        with tracer.span("search"):
+            pass
+
+        assert await exporter.flush() == 0
+        stats = exporter.get_stats()
+        assert stats["queued"] == 0
+        assert stats["dropped"] == 1
+        assert stats["failures"] == 1